@@ -5,22 +5,35 @@ import logging
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import Platform
 from homeassistant.core import HomeAssistant
+from homeassistant.helpers.storage import Store
 
-from .api import TuyaSmartScaleAPI
 from .const import (
-    CONF_ACCESS_ID,
-    CONF_ACCESS_KEY,
+    ANALYSIS_MODE_CLOUD,
+    CONF_ANALYSIS_MODE,
+    CONF_BATCH_POLL,
     CONF_BIRTHDATE,
     CONF_DEVICE_ID,
+    CONF_DIAGNOSTICS,
+    CONF_ENDPOINT,
+    CONF_LOCAL_HOST,
+    CONF_MAX_SCAN_INTERVAL,
+    CONF_PROFILES,
+    CONF_PUSH,
     CONF_REGION,
+    CONF_SCAN_INTERVAL,
     CONF_SEX,
     DEFAULT_BIRTHDATE,
-    DEFAULT_REGION,
     DEFAULT_SEX,
     DOMAIN,
     PLATFORMS,
+    STORAGE_VERSION,
 )
 from .coordinator import IntelarScaleDataCoordinator
+from .profiles import profiles_from_options
+from .project import async_get_project, async_release_project
+from .regions import region_for_endpoint
+from .services import async_setup_services
+from .timeseries import MeasurementStore
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -28,35 +41,90 @@ _LOGGER = logging.getLogger(__name__)
 async def async_setup(hass: HomeAssistant, config: dict) -> bool:
     """Set up the integration via YAML (not supported)."""
 
+    async_setup_services(hass)
     return True
 
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Set up Intelar scale from a config entry."""
 
-    api_client = TuyaSmartScaleAPI(
-        access_id=entry.data[CONF_ACCESS_ID],
-        access_key=entry.data[CONF_ACCESS_KEY],
+    project = async_get_project(hass, entry)
+    api_client = project.create_client(
         device_id=entry.data[CONF_DEVICE_ID],
-        region=entry.data.get(CONF_REGION, DEFAULT_REGION),
         birthdate=entry.data.get(CONF_BIRTHDATE, DEFAULT_BIRTHDATE),
         sex=entry.data.get(CONF_SEX, DEFAULT_SEX),
+        analysis_mode=entry.options.get(CONF_ANALYSIS_MODE, ANALYSIS_MODE_CLOUD),
+        profiles=profiles_from_options(entry.options.get(CONF_PROFILES)),
     )
-
-    coordinator = IntelarScaleDataCoordinator(hass, api_client)
-
-    await coordinator.async_config_entry_first_refresh()
+    if entry.options.get(CONF_DIAGNOSTICS):
+        # Time each stage of every poll for the diagnostics download.
+        api_client.stage_hook = api_client.metrics.record_stage
+
+    coordinator = IntelarScaleDataCoordinator(
+        hass,
+        api_client,
+        update_seconds=entry.options.get(CONF_SCAN_INTERVAL),
+        max_update_seconds=entry.options.get(CONF_MAX_SCAN_INTERVAL),
+    )
+    await coordinator.async_load()
+
+    if coordinator.data:
+        # Sensors start from the stored snapshot; the cloud catches up in the background.
+        entry.async_create_background_task(
+            hass, coordinator.async_refresh(), f"{DOMAIN} initial refresh {entry.entry_id}"
+        )
+    else:
+        try:
+            await coordinator.async_config_entry_first_refresh()
+        except Exception:
+            async_release_project(hass, entry)
+            raise
 
     hass.data.setdefault(DOMAIN, {})
     hass.data[DOMAIN][entry.entry_id] = coordinator
 
+    if entry.options.get(CONF_PUSH):
+        entry.async_on_unload(coordinator.async_enable_push(project))
+    if local_host := entry.options.get(CONF_LOCAL_HOST):
+        entry.async_on_unload(coordinator.async_enable_local(local_host))
+    if entry.options.get(CONF_BATCH_POLL):
+        entry.async_on_unload(project.async_join_poller(coordinator))
+
     await hass.config_entries.async_forward_entry_setups(entry, [Platform.SENSOR])
+    entry.async_on_unload(entry.add_update_listener(_async_update_listener))
+    return True
+
+
+async def async_migrate_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
+    """Move entries detected on an alternate data center to that data center's region."""
+
+    if entry.version == 1 and entry.minor_version < 2:
+        data = dict(entry.data)
+        if (endpoint := data.get(CONF_ENDPOINT)) and (region := region_for_endpoint(endpoint)):
+            data[CONF_REGION] = region
+        hass.config_entries.async_update_entry(entry, data=data, minor_version=2)
     return True
 
 
+async def _async_update_listener(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Reload the entry when its options change."""
+
+    await hass.config_entries.async_reload(entry.entry_id)
+
+
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Unload a config entry."""
 
     if unload_ok := await hass.config_entries.async_unload_platforms(entry, [Platform.SENSOR]):
         hass.data[DOMAIN].pop(entry.entry_id, None)
+        async_release_project(hass, entry)
     return unload_ok
+
+
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Delete the stored measurements, snapshot and backfill checkpoint of a removed scale."""
+
+    device_id = entry.data[CONF_DEVICE_ID]
+    await MeasurementStore(hass, device_id).async_remove()
+    for key in (f"{DOMAIN}.{device_id}", f"{DOMAIN}.{device_id}.backfill"):
+        await Store(hass, STORAGE_VERSION, key).async_remove()
@@ -1,23 +1,124 @@
 """API client for Tuya Smart Scale integration."""
 from __future__ import annotations
 
+import asyncio
 import hashlib
 import hmac
 import json
 import logging
 import time
-from datetime import date, datetime
-from typing import Any, Dict, List
+from contextlib import contextmanager
+from typing import Any, AsyncIterator, Callable, Dict, Iterable, Iterator, List
+
+import aiohttp
+
+from .bia import compute_body_composition, report_differences
+from .cache import AnalysisKey, AnalysisReportCache
+from .const import (
+    ANALYSIS_CACHE_SIZE,
+    ANALYSIS_CONCURRENCY,
+    ANALYSIS_MAX_RECORDS,
+    ANALYSIS_MODE_CLOUD,
+    ANALYSIS_MODE_LOCAL_FIRST,
+    BATCH_STATUS_PATH,
+    BIA_RECONCILE_TOLERANCE,
+    CONF_ACCESS_ID,
+    CONF_ACCESS_KEY,
+    HISTORY_MAX_PAGES,
+    HISTORY_PAGE_SIZE,
+    REGIONS,
+    REQUEST_MAX_ATTEMPTS,
+    REQUEST_TIMEOUT,
+    TOKEN_GRANT_PATH,
+    TUYA_RATE_LIMIT_CODES,
+    TUYA_TOKEN_INVALID_CODES,
+)
+from .exceptions import (
+    TuyaApiError,
+    TuyaRateLimitError,
+    TuyaTokenInvalidError,
+    TuyaTransientError,
+)
+from .metrics import ApiMetrics
+from .profiles import UserProfile
+from .ratelimit import RateBudget, backoff_delay
 
-import requests
+_LOGGER = logging.getLogger(__name__)
 
-from .const import CONF_ACCESS_ID, CONF_ACCESS_KEY, REGIONS
 
-_LOGGER = logging.getLogger(__name__)
+class TuyaToken:
+    """Access token state, shared by every client of the same Tuya cloud project."""
+
+    def __init__(self) -> None:
+        self.access_token: str | None = None
+        self.refresh_token: str | None = None
+        self.expires = 0.0
+        # Serialises refreshes so concurrent requests never fetch a token twice.
+        self.lock = asyncio.Lock()
+        self._listeners: list[Callable[[], None]] = []
+
+    def valid(self) -> bool:
+        return bool(self.access_token) and time.time() < self.expires - 60
+
+    def invalidate(self, access_token: str | None) -> None:
+        """Forget ``access_token`` if it is still the current one."""
+
+        if access_token is not None and access_token == self.access_token:
+            self.access_token = None
+            self.expires = 0.0
+
+    def add_listener(self, listener: Callable[[], None]) -> Callable[[], None]:
+        """Call ``listener`` whenever a new token is stored; return a remover."""
+
+        self._listeners.append(listener)
+        return lambda: self._listeners.remove(listener)
+
+    def update(self, result: Dict[str, Any]) -> None:
+        """Store the ``result`` of a token or refresh-token grant."""
+
+        self.access_token = result.get("access_token")
+        self.refresh_token = result.get("refresh_token") or self.refresh_token
+        self.expires = time.time() + result.get("expire_time", 0)
+        for listener in list(self._listeners):
+            listener()
+
 
+class _HistoryScan:
+    """Accumulate the newest record per user while paging through history.
 
-class TuyaSmartScaleAPI:
-    """API client for Tuya Smart Scale."""
+    Every valid record seen is also kept in ``records`` for the local store.
+    ``exhausted`` is set once a page without a successor shows the whole
+    history was read.
+    """
+
+    def __init__(self, start_time: int | None, known_users: Iterable[str] | None, newest: int) -> None:
+        self.start_time = start_time
+        self.pending = set() if start_time else set(known_users or ())
+        self.newest = newest
+        self.latest: dict[str, dict[str, Any]] = {}
+        self.with_resistance: dict[str, dict[str, Any]] = {}
+        self.records: list[dict[str, Any]] = []
+        self.exhausted = False
+
+    def add_page(self, records: List[Dict[str, Any]], has_next: bool) -> bool:
+        """Consume one page of records; return True once no more pages are needed."""
+
+        self.exhausted = not has_next
+        for rec in records:
+            self.newest = max(self.newest, _record_time(rec))
+            user_id = rec.get("user_id")
+            if not _is_valid_user_id(user_id):
+                continue
+            self.records.append(rec)
+            self.latest.setdefault(user_id, rec)
+            if user_id not in self.with_resistance and _has_resistance(rec):
+                self.with_resistance[user_id] = rec
+        self.pending.difference_update(self.latest)
+        return self.start_time is None and bool(self.latest) and not self.pending
+
+
+class _TuyaSmartScaleBase:
+    """Transport-independent state and request building for the scale client."""
 
     def __init__(
         self,
@@ -27,6 +128,8 @@ class TuyaSmartScaleAPI:
         region: str = "us",
         birthdate: str = "1990-01-01",
         sex: int = 1,
+        token: TuyaToken | None = None,
+        metrics: ApiMetrics | None = None,
     ) -> None:
         self.access_id = access_id
         self.access_key = access_key
@@ -34,32 +137,53 @@ class TuyaSmartScaleAPI:
         self.region = region
         self.birthdate = birthdate
         self.sex = sex
+        self.default_profile = UserProfile(birthdate, sex)
+        # Per-user overrides of the entry-wide profile, keyed by user_id.
+        self.profiles: Dict[str, UserProfile] = {}
         self.endpoint = REGIONS.get(region, REGIONS["us"])["endpoint"]
-        self.access_token: str | None = None
-        self.token_expires = 0.0
+        self.token = token if token is not None else TuyaToken()
+        # Newest record create_time (ms) seen so far; polls only ask for newer records.
+        self.high_water_mark = 0
+        # Every valid record returned by the last history scan, newest first.
+        self.new_records: List[Dict[str, Any]] = []
+        # Known users a full scan read the whole history without finding.
+        self.gone_users: set[str] = set()
+        self.analysis_cache = AnalysisReportCache(ANALYSIS_CACHE_SIZE)
+        self.analysis_mode = ANALYSIS_MODE_CLOUD
+        # Local-vs-cloud reconciliations so far and the summed |cloud - local| per field.
+        self.reconciled = 0
+        self.deviation_sums: Dict[str, float] = {}
         self.sign_method = "HMAC-SHA256"
+        # This scale's request metrics, also counted in the project's ``metrics``.
+        self.metrics = ApiMetrics(parent=metrics)
+        # Optional profiling hook called with (stage, seconds) for each poll stage.
+        self.stage_hook: Callable[[str, float], None] | None = None
 
         _LOGGER.info(
-            "Initialized TuyaSmartScaleAPI with region: %s, endpoint: %s, device_id: %s",
+            "Initialized %s with region: %s, endpoint: %s, device_id: %s",
+            type(self).__name__,
             region,
             self.endpoint,
             device_id,
         )
 
-    def _calculate_age(self) -> int:
-        """Calculate current age from stored birthdate."""
+    @contextmanager
+    def _stage(self, name: str) -> Iterator[None]:
+        """Time a stage of ``get_latest_data`` when a profiling hook is set."""
 
+        if self.stage_hook is None:
+            yield
+            return
+        start = time.perf_counter()
         try:
-            birth_date = datetime.strptime(self.birthdate, "%Y-%m-%d").date()
-            today = date.today()
-            return today.year - birth_date.year - (
-                (today.month, today.day) < (birth_date.month, birth_date.day)
-            )
-        except (ValueError, TypeError):
-            _LOGGER.warning(
-                "Invalid birthdate format: %s, using default age 30", self.birthdate
-            )
-            return 30
+            yield
+        finally:
+            self.stage_hook(name, time.perf_counter() - start)
+
+    def profile_for(self, user_id: str | None) -> UserProfile:
+        """Return the user's profile, or the entry-wide birthdate and sex."""
+
+        return self.profiles.get(user_id or "", self.default_profile)
 
     def _sign_request(
         self,
@@ -93,13 +217,17 @@ class TuyaSmartScaleAPI:
 
         return sign, timestamp, canonical_path
 
-    def get_access_token(self) -> str:
-        """Get access token from Tuya API using v2.0 signature logic."""
+    @property
+    def access_token(self) -> str | None:
+        return self.token.access_token
 
-        if self.access_token and time.time() < self.token_expires - 60:
-            return self.access_token
+    @property
+    def token_expires(self) -> float:
+        return self.token.expires
+
+    def _token_request(self, path: str = TOKEN_GRANT_PATH) -> tuple[str, dict[str, str]]:
+        """Return the signed URL and headers for a token or refresh-token grant."""
 
-        path = "/v1.0/token?grant_type=1"
         sign, timestamp, canonical_path = self._sign_request(
             "GET", path, access_token=None, params=None
         )
@@ -111,43 +239,69 @@ class TuyaSmartScaleAPI:
             "sign": sign,
         }
         _LOGGER.debug("Requesting token: url=%s headers=%s", url, headers)
-        response = requests.get(url, headers=headers, timeout=15)
-        if response.status_code != 200:
-            raise Exception(f"Failed to get access token: {response.text}")
+        return url, headers
+
+    @staticmethod
+    def _raise_for_status(
+        method: str, path: str, status: int, text: str, retry_after: str | None = None
+    ) -> None:
+        """Raise the exception matching a non-200 HTTP response."""
 
-        data = response.json()
+        message = f"{method} {path} failed with HTTP {status}: {text}"
+        if status == 429:
+            try:
+                delay = float(retry_after or 0)
+            except ValueError:
+                delay = 0.0
+            raise TuyaRateLimitError(message, retry_after=delay)
+        if status >= 500:
+            raise TuyaTransientError(message)
+        raise TuyaApiError(message)
+
+    @staticmethod
+    def _check_response(method: str, path: str, data: Any) -> dict[str, Any]:
+        """Raise for Tuya's ``success: false`` envelopes, which arrive as HTTP 200."""
+
+        if not isinstance(data, dict) or data.get("success", True):
+            return data
+        code = data.get("code")
+        message = f"{method} {path} failed with code {code}: {data.get('msg')}"
+        if code in TUYA_RATE_LIMIT_CODES:
+            raise TuyaRateLimitError(message, code)
+        if code in TUYA_TOKEN_INVALID_CODES:
+            raise TuyaTokenInvalidError(message, code)
+        raise TuyaApiError(message, code)
+
+    def _store_token(self, data: Any) -> str:
         if not isinstance(data, dict) or "result" not in data:
-            raise Exception(
+            raise TuyaApiError(
                 f"Unexpected response structure for access token (missing 'result'): {data}"
             )
 
-        self.access_token = data["result"].get("access_token")
-        self.token_expires = time.time() + data["result"].get("expire_time", 0)
-        return self.access_token or ""
+        result = data["result"]
+        if not isinstance(result, dict) or not result.get("access_token"):
+            raise TuyaApiError(f"Token response without an access token: {result}")
+        expire_time = result.get("expire_time")
+        if not isinstance(expire_time, (int, float)) or expire_time <= 0:
+            # A token without a lifetime would be renewed again right away.
+            raise TuyaApiError(f"Token response without a valid expire_time: {result}")
+
+        self.token.update(result)
+        self.metrics.record_token_refresh()
+        return self.token.access_token or ""
+
+    def _signed_request(
+        self,
+        method: str,
+        path: str,
+        token: str,
+        params: dict[str, Any] | None = None,
+        body: str | None = None,
+    ) -> tuple[str, dict[str, str]]:
+        """Return the signed URL and headers for an authenticated request."""
 
-    def _get(self, path: str, params: dict[str, Any] | None = None) -> dict[str, Any]:
-        token = self.get_access_token()
-        sign, timestamp, canonical_path = self._sign_request(
-            "GET", path, access_token=token, params=params
-        )
-        url = f"{self.endpoint}{canonical_path}"
-        headers = {
-            "client_id": self.access_id,
-            "access_token": token,
-            "t": timestamp,
-            "sign": sign,
-            "sign_method": self.sign_method,
-        }
-        response = requests.get(url, headers=headers, timeout=15)
-        if response.status_code != 200:
-            raise Exception(f"GET {path} failed: {response.text}")
-        return response.json()
-
-    def _post(self, path: str, body: dict[str, Any]) -> dict[str, Any]:
-        token = self.get_access_token()
-        body_json = json.dumps(body, separators=(",", ":"))
         sign, timestamp, canonical_path = self._sign_request(
-            "POST", path, access_token=token, params=None, body=body_json
+            method, path, access_token=token, params=params, body=body
         )
         url = f"{self.endpoint}{canonical_path}"
         headers = {
@@ -156,109 +310,639 @@ class TuyaSmartScaleAPI:
             "t": timestamp,
             "sign": sign,
             "sign_method": self.sign_method,
-            "Content-Type": "application/json",
         }
-        response = requests.post(url, headers=headers, data=body_json, timeout=15)
-        if response.status_code != 200:
-            raise Exception(f"POST {path} failed: {response.text}")
-        return response.json()
-
-    def get_device_info(self) -> Dict[str, Any]:
-        """Get device information."""
+        if body is not None:
+            headers["Content-Type"] = "application/json"
+        return url, headers
 
-        data = self._get(f"/v1.0/devices/{self.device_id}")
-        return data.get("result", {})
+    def _history_path(self) -> str:
+        return f"/v1.0/scales/{self.device_id}/datas/history"
 
-    def get_scale_records(
-        self,
-        start_time: int | None = None,
-        end_time: int | None = None,
-        limit: int = 10,
-        user_id: str | None = None,
-    ) -> List[Dict[str, Any]]:
-        """Get scale measurement records."""
+    def _analysis_path(self) -> str:
+        return f"/v1.0/scales/{self.device_id}/analysis-reports"
 
-        params: dict[str, Any] = {"page_size": limit, "page_no": 1}
+    @staticmethod
+    def _history_params(
+        page_no: int, page_size: int, start_time: int | None, end_time: int | None
+    ) -> dict[str, Any]:
+        params: dict[str, Any] = {"page_size": page_size, "page_no": page_no}
         if start_time:
             params["start_time"] = start_time
-        data = self._get(f"/v1.0/scales/{self.device_id}/datas/history", params=params)
+            params["end_time"] = end_time or int(time.time() * 1000)
+        elif end_time:
+            params["end_time"] = end_time
+        return params
+
+    @staticmethod
+    def _parse_history_page(data: Dict[str, Any], page_size: int) -> tuple[List[Dict[str, Any]], bool]:
+        """Return the records of a history page and whether another page follows."""
+
         result = data.get("result", {})
         records = result.get("records", []) if isinstance(result, dict) else []
-        if user_id:
-            records = [rec for rec in records if rec.get("user_id") == user_id]
-        return records
-
-    def get_scale_users(self) -> List[Dict[str, Any]]:
-        """Get users for this scale device by extracting from measurement records."""
+        has_next = result.get("has_next") if isinstance(result, dict) else None
+        return records, not (has_next is False or len(records) < page_size)
 
-        records = self.get_scale_records(limit=100)
+    @staticmethod
+    def _users_from_records(records: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         users: dict[str, dict[str, Any]] = {}
         for rec in records:
             user_id = rec.get("user_id")
             nickname = rec.get("nick_name") or rec.get("nickname")
-            if user_id and user_id != "0" and user_id.strip() and user_id not in users:
+            if _is_valid_user_id(user_id) and user_id not in users:
                 users[user_id] = {"user_id": user_id, "nickname": nickname}
         return list(users.values())
 
-    def get_analysis_report(
-        self, height: float, weight: float, age: int, sex: int, resistance: str
+    def _start_scan(self, known_users: Iterable[str] | None, full_scan: bool) -> _HistoryScan:
+        start_time = self.high_water_mark + 1 if self.high_water_mark and not full_scan else None
+        return _HistoryScan(start_time, known_users, self.high_water_mark)
+
+    def _analysis_records(self, scan: _HistoryScan) -> Dict[str, Dict[str, Any]]:
+        """Return the record to analyse for each user found by ``scan``."""
+
+        self.high_water_mark = scan.newest
+        self.new_records = scan.records
+        # Only a scan that read the whole history proves a known user is gone.
+        self.gone_users = set(scan.pending) if scan.start_time is None and scan.exhausted else set()
+        if not scan.latest and scan.start_time is None:
+            _LOGGER.warning("No users found for this scale device.")
+        return {
+            user_id: scan.with_resistance.get(user_id, latest_record)
+            for user_id, latest_record in scan.latest.items()
+        }
+
+    def _plan_analyses(
+        self, scan: _HistoryScan, analysis_records: Dict[str, Dict[str, Any]]
+    ) -> Dict[AnalysisKey, List[tuple[str, Dict[str, Any]]]]:
+        """Collect the records to analyse this poll, grouped by analysis input.
+
+        Besides the per-user record, incremental polls analyse every new
+        weigh-in with a resistance reading (up to ``ANALYSIS_MAX_RECORDS``), so
+        the local measurement store gets body composition for each of them.
+        Cache hits are attached to their records right away; the rest are
+        grouped by key so identical inputs are analysed once.
+        """
+
+        records = {id(record): record for record in analysis_records.values()}
+        if scan.start_time is not None:
+            for record in scan.records[:ANALYSIS_MAX_RECORDS]:
+                if _has_resistance(record):
+                    records.setdefault(id(record), record)
+        return self._group_analyses(records.values())
+
+    def _group_analyses(
+        self, records: Iterable[Dict[str, Any]]
+    ) -> Dict[AnalysisKey, List[tuple[str, Dict[str, Any]]]]:
+        pending: dict[AnalysisKey, list[tuple[str, dict[str, Any]]]] = {}
+        for record in records:
+            report, key, record_key = self._cached_analysis(record)
+            if report is not None:
+                record["analysis_report"] = report
+            elif key is not None:
+                pending.setdefault(key, []).append((record_key, record))
+        return pending
+
+    def _fan_out(
+        self,
+        key: AnalysisKey,
+        targets: List[tuple[str, Dict[str, Any]]],
+        report: Dict[str, Any] | None,
+    ) -> None:
+        """Attach one analysis result to every record that shares its input."""
+
+        if not report:
+            return
+        for record_key, record in targets:
+            record["analysis_report"] = report
+            if self.analysis_cache.get(key) is report:
+                self.analysis_cache.link_record(record_key, key)
+
+    @staticmethod
+    def _finish_scan(
+        scan: _HistoryScan, analysis_records: Dict[str, Dict[str, Any]]
+    ) -> Dict[str, Dict[str, Any]]:
+        result: dict[str, dict[str, Any]] = {}
+        for user_id, latest_record in scan.latest.items():
+            nickname = latest_record.get("nick_name") or latest_record.get("nickname")
+            analysis_report = analysis_records[user_id].get("analysis_report")
+            if analysis_report is not None:
+                latest_record["analysis_report"] = analysis_report
+            latest_record.update({"nickname": nickname})
+            result[user_id] = latest_record
+        return result
+
+    def _cached_analysis(
+        self, record: Dict[str, Any]
+    ) -> tuple[Dict[str, Any] | None, AnalysisKey | None, str]:
+        """Look up a record's analysis in the cache.
+
+        Returns ``(report, key, record_key)``. ``key`` is None when the report
+        came from the cache or the record cannot be analysed; otherwise the
+        caller must POST ``key`` and store the result with :meth:`_cache_analysis`.
+        """
+
+        record_key = self._linked_record_key(record)
+        report = self.analysis_cache.get_for_record(record_key)
+        if report is not None:
+            self.metrics.record_cache_lookup(True)
+            return report, None, record_key
+
+        key = self._analysis_key(record)
+        if key is None:
+            return None, None, record_key
+        report = self.analysis_cache.get(key)
+        if report is not None:
+            self.metrics.record_cache_lookup(True)
+            self.analysis_cache.link_record(record_key, key)
+            return report, None, record_key
+        self.metrics.record_cache_lookup(False)
+        return None, key, record_key
+
+    def _linked_record_key(self, record: Dict[str, Any]) -> str:
+        """Return the cache link for a record under its user's current profile.
+
+        The link survives birthdays, so an unchanged measurement is not
+        re-analysed when the age ticks over, but not a change of the user's
+        birthdate, sex or height.
+        """
+
+        return f"{_record_key(record)}|{self.profile_for(record.get('user_id')).fingerprint}"
+
+    def _analysis_key(self, record: Dict[str, Any]) -> AnalysisKey | None:
+        """Return the analysis input of a record, or None if it cannot be analysed."""
+
+        profile = self.profile_for(record.get("user_id"))
+        height = profile.height or float(record.get("height", 0) or 0)
+        weight = float(record.get("wegith", 0) or 0)
+        resistance = record.get("body_r", "0")
+        if not (height > 0 and weight > 0 and resistance and resistance != "0"):
+            return None
+        # Age and sex come from the record's user, so each family member gets
+        # their own report and cache entry.
+        return (height, weight, profile.age(), profile.sex, str(resistance))
+
+    def offline_analysis(self, record: Dict[str, Any]) -> Dict[str, Any] | None:
+        """Return a report for a record without any request.
+
+        A cached cloud report for the record or its inputs is preferred;
+        otherwise the local BIA estimate is returned.
+        """
+
+        report = self.analysis_cache.get_for_record(self._linked_record_key(record))
+        if report is not None:
+            return report
+        if (key := self._analysis_key(record)) is None:
+            return None
+        return self.analysis_cache.get(key) or self._local_analysis(key)
+
+    def _cache_analysis(
+        self, key: AnalysisKey, record_key: str, report: Dict[str, Any]
     ) -> Dict[str, Any]:
-        """Get body analysis report."""
+        if report:
+            self.analysis_cache.put(key, report, record_key=record_key)
+        return report
+
+    @staticmethod
+    def _local_analysis(key: AnalysisKey) -> Dict[str, Any] | None:
+        height, weight, age, sex, resistance = key
+        try:
+            return compute_body_composition(height, weight, age, sex, float(resistance))
+        except ValueError:
+            return None
 
-        body_data = {
+    def _reconcile(
+        self, key: AnalysisKey, local: Dict[str, Any] | None, cloud: Dict[str, Any]
+    ) -> None:
+        """Log how far the local estimate was from the cloud report."""
+
+        if not local or not cloud:
+            return
+        differences = report_differences(local, cloud)
+        self.reconciled += 1
+        for field, difference in differences.items():
+            self.deviation_sums[field] = self.deviation_sums.get(field, 0.0) + abs(difference)
+        if abs(differences.get("body_fat", 0.0)) > BIA_RECONCILE_TOLERANCE:
+            _LOGGER.warning(
+                "Local body composition for %s differs from the cloud report: %s",
+                key,
+                differences,
+            )
+        else:
+            _LOGGER.debug("Cloud minus local analysis for %s: %s", key, differences)
+
+    def mean_deviations(self) -> Dict[str, float]:
+        """Return the mean |cloud - local| per field over all reconciliations."""
+
+        if not self.reconciled:
+            return {}
+        return {
+            field: round(total / self.reconciled, 2) for field, total in self.deviation_sums.items()
+        }
+
+    @staticmethod
+    def _analysis_body(key: AnalysisKey) -> Dict[str, Any]:
+        height, weight, age, sex, resistance = key
+        return {
             "height": height,
             "weight": weight,
             "age": age,
             "sex": sex,
             "resistance": resistance,
         }
-        data = self._post(f"/v1.0/scales/{self.device_id}/analysis-reports", body_data)
-        return data.get("result", {})
 
-    def get_latest_data(self) -> Dict[str, Dict[str, Any]]:
-        """Get latest measurement data for all users of this scale, including analysis report."""
 
-        users = self.get_scale_users()
-        if not users:
-            _LOGGER.warning("No users found for this scale device.")
-            return {}
+class AsyncTuyaSmartScaleAPI(_TuyaSmartScaleBase):
+    """Asyncio API client for Tuya Smart Scale built on a shared aiohttp session."""
 
-        result: dict[str, dict[str, Any]] = {}
-        for user in users:
-            user_id = user.get("user_id")
-            if not user_id:
-                continue
-            records = self.get_scale_records(user_id=user_id, limit=10)
-            if not records:
-                continue
+    def __init__(
+        self,
+        session: aiohttp.ClientSession,
+        access_id: str,
+        access_key: str,
+        device_id: str,
+        region: str = "us",
+        birthdate: str = "1990-01-01",
+        sex: int = 1,
+        token: TuyaToken | None = None,
+        budget: RateBudget | None = None,
+        analysis_slots: asyncio.Semaphore | None = None,
+        metrics: ApiMetrics | None = None,
+    ) -> None:
+        super().__init__(access_id, access_key, device_id, region, birthdate, sex, token, metrics)
+        self.budget = budget
+        # Bounds concurrent analysis requests; shared by every scale of a project.
+        self.analysis_slots = analysis_slots or asyncio.Semaphore(ANALYSIS_CONCURRENCY)
+        self._session = session
+        self._timeout = aiohttp.ClientTimeout(total=REQUEST_TIMEOUT)
+        self._background_tasks: set[asyncio.Task] = set()
+
+    async def get_access_token(self) -> str:
+        """Get access token from Tuya API using v2.0 signature logic."""
 
-            latest_record = records[0]
-            record_with_resistance = next(
-                (rec for rec in records if rec.get("body_r") and rec.get("body_r") != "0"),
-                None,
-            )
+        if self.token.valid():
+            return self.access_token or ""
+
+        async with self.token.lock:
+            # Another request may have refreshed the token while we waited.
+            if self.token.valid():
+                return self.access_token or ""
+            return await self._renew_token()
+
+    async def async_refresh_token(self) -> str:
+        """Renew the token ahead of expiry, whether or not it is still valid."""
 
+        async with self.token.lock:
+            return await self._renew_token()
+
+    async def _renew_token(self) -> str:
+        """Use the refresh_token grant when possible, falling back to a full grant."""
+
+        if self.token.refresh_token:
             try:
-                analysis_record = record_with_resistance or latest_record
-                height = float(analysis_record.get("height", 0) or 0)
-                weight = float(analysis_record.get("wegith", 0) or 0)
-                resistance = analysis_record.get("body_r", "0")
-                if height > 0 and weight > 0 and resistance and resistance != "0":
-                    age = self._calculate_age()
-                    analysis_report = self.get_analysis_report(
-                        height=height,
-                        weight=weight,
-                        age=age,
-                        sex=self.sex,
-                        resistance=resistance,
-                    )
-                    latest_record["analysis_report"] = analysis_report
+                return await self._fetch_token(f"/v1.0/token/{self.token.refresh_token}")
             except Exception as err:  # pylint: disable=broad-except
-                _LOGGER.warning(
-                    "Could not fetch analysis report for user %s: %s", user_id, err
+                _LOGGER.debug("Refresh token grant failed, requesting a new token: %s", err)
+        return await self._fetch_token(TOKEN_GRANT_PATH)
+
+    async def _fetch_token(self, path: str) -> str:
+        return self._store_token(await self._request("GET", path, auth=False))
+
+    async def _get(self, path: str, params: dict[str, Any] | None = None) -> dict[str, Any]:
+        return await self._request("GET", path, params=params)
+
+    async def _post(self, path: str, body: dict[str, Any]) -> dict[str, Any]:
+        return await self._request("POST", path, body=json.dumps(body, separators=(",", ":")))
+
+    async def _request(
+        self,
+        method: str,
+        path: str,
+        params: dict[str, Any] | None = None,
+        body: str | None = None,
+        auth: bool = True,
+    ) -> dict[str, Any]:
+        """Send a request within the project budget, retrying transient failures.
+
+        Rate-limit responses are never retried here: they open the budget's
+        circuit breaker so that every client of the project backs off together.
+        Token grants (``auth=False``) are sent once; the authenticated request
+        that needed the token retries the grant along with itself, so a call
+        makes at most ``REQUEST_MAX_ATTEMPTS`` token attempts.
+        """
+
+        attempts = REQUEST_MAX_ATTEMPTS if auth else 1
+        for attempt in range(1, attempts + 1):
+            if self.budget is not None:
+                await self.budget.acquire()
+            # The token this attempt is signed with; only it may be invalidated.
+            token: str | None = None
+            try:
+                if auth:
+                    token = await self.get_access_token()
+                data = await self._send(method, path, params, body, token)
+            except TuyaRateLimitError as err:
+                if self.budget is not None:
+                    err.retry_after = self.budget.throttled(err.retry_after)
+                raise
+            except TuyaTokenInvalidError:
+                if not auth or attempt == attempts:
+                    raise
+                _LOGGER.debug("Access token rejected for %s %s, renewing", method, path)
+                self.token.invalidate(token)
+                self.metrics.record_retry(path)
+                continue
+            except (TuyaTransientError, aiohttp.ClientError, asyncio.TimeoutError) as err:
+                if attempt == attempts:
+                    raise
+                delay = backoff_delay(attempt)
+                _LOGGER.debug(
+                    "%s %s failed (%s), retry %d in %.1fs", method, path, err, attempt, delay
                 )
+                self.metrics.record_retry(path)
+                await asyncio.sleep(delay)
+                continue
+            if self.budget is not None:
+                self.budget.succeeded()
+            return data
+        raise TuyaApiError(f"{method} {path} failed after {attempts} attempts")
 
-            latest_record.update({"nickname": user.get("nickname")})
-            result[user_id] = latest_record
+    async def _send(
+        self,
+        method: str,
+        path: str,
+        params: dict[str, Any] | None,
+        body: str | None,
+        token: str | None,
+    ) -> dict[str, Any]:
+        """Send one request signed with ``token``, or a token grant when it is None."""
+
+        if token is not None:
+            url, headers = self._signed_request(method, path, token, params=params, body=body)
+        else:
+            url, headers = self._token_request(path)
+        start = time.monotonic()
+        try:
+            async with self._session.request(
+                method, url, headers=headers, data=body, timeout=self._timeout
+            ) as response:
+                raw = await response.read()
+            self.metrics.record_request(path, time.monotonic() - start, len(raw))
+            if response.status != 200:
+                self._raise_for_status(
+                    method,
+                    path,
+                    response.status,
+                    raw.decode("utf-8", "replace"),
+                    response.headers.get("Retry-After"),
+                )
+            return self._check_response(method, path, json.loads(raw))
+        except Exception as err:
+            self.metrics.record_error(method, path, err)
+            raise
 
-        return result
+    async def get_device_info(self) -> Dict[str, Any]:
+        """Get device information."""
+
+        data = await self._get(f"/v1.0/devices/{self.device_id}")
+        return data.get("result", {})
+
+    async def get_devices_status(self, device_ids: Iterable[str]) -> Dict[str, List[Dict[str, Any]]]:
+        """Return ``{device_id: status}`` for up to ``BATCH_STATUS_MAX_DEVICES`` devices at once."""
+
+        data = await self._get(BATCH_STATUS_PATH, {"device_ids": ",".join(device_ids)})
+        return {
+            item["id"]: item.get("status") or []
+            for item in data.get("result") or []
+            if isinstance(item, dict) and item.get("id")
+        }
+
+    async def get_local_config(self) -> Dict[str, Any]:
+        """Return the device's LAN ``local_key`` and ``{dp_id: {code, scale}}`` map.
+
+        The DP map comes from the device's thing model, whose properties carry
+        the DP id (``abilityId``), code and numeric scale.
+        """
+
+        device = await self.get_device_info()
+        data = await self._get(f"/v2.0/cloud/thing/{self.device_id}/model")
+        model = json.loads((data.get("result") or {}).get("model") or "{}")
+        dps: dict[str, dict[str, Any]] = {}
+        for service in model.get("services", []):
+            for prop in service.get("properties", []):
+                spec = prop.get("typeSpec") or {}
+                dps[str(prop["abilityId"])] = {
+                    "code": prop.get("code"),
+                    "scale": int(spec.get("scale") or 0),
+                }
+        return {"local_key": device.get("local_key"), "dps": dps}
+
+    async def iter_history_pages(
+        self,
+        start_time: int | None = None,
+        end_time: int | None = None,
+        page_size: int = HISTORY_PAGE_SIZE,
+        max_pages: int = HISTORY_MAX_PAGES,
+    ) -> AsyncIterator[tuple[List[Dict[str, Any]], bool]]:
+        """Yield ``(records, has_next)`` pages, newest first, until history is exhausted.
+
+        ``has_next`` is False on the last page, including a full last page
+        that Tuya marks with ``has_next: false``.
+        """
+
+        for page_no in range(1, max_pages + 1):
+            params = self._history_params(page_no, page_size, start_time, end_time)
+            records, has_next = self._parse_history_page(
+                await self._get(self._history_path(), params=params), page_size
+            )
+            yield records, has_next
+            if not has_next:
+                return
+
+    async def iter_history_records(
+        self,
+        start_time: int,
+        end_time: int,
+        page_size: int = HISTORY_PAGE_SIZE,
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Yield every record between ``start_time`` and ``end_time``, newest first.
+
+        Pages are walked by moving ``end_time`` back to the oldest record seen
+        rather than by page number, so records arriving meanwhile do not shift
+        the window and only one page is held in memory at a time.
+        """
+
+        cursor = end_time
+        seen_at_cursor: set[str] = set()
+        while cursor >= start_time:
+            params = self._history_params(1, page_size, start_time, cursor)
+            records, _ = self._parse_history_page(
+                await self._get(self._history_path(), params=params), page_size
+            )
+            fresh = [rec for rec in records if _record_key(rec) not in seen_at_cursor]
+            for rec in fresh:
+                yield rec
+            if len(records) < page_size:
+                return
+
+            oldest = min(_record_time(rec) for rec in records)
+            if not fresh or oldest == cursor:
+                # A full page within one millisecond; step past it.
+                cursor, seen_at_cursor = oldest - 1, set()
+            else:
+                cursor = oldest
+                seen_at_cursor = {
+                    _record_key(rec) for rec in records if _record_time(rec) == oldest
+                }
+
+    async def get_scale_records(
+        self,
+        start_time: int | None = None,
+        end_time: int | None = None,
+        limit: int = 10,
+        user_id: str | None = None,
+    ) -> List[Dict[str, Any]]:
+        """Get scale measurement records."""
+
+        records, _ = await anext(
+            self.iter_history_pages(
+                start_time=start_time, end_time=end_time, page_size=limit, max_pages=1
+            ),
+            ([], False),
+        )
+        if user_id:
+            records = [rec for rec in records if rec.get("user_id") == user_id]
+        return records
+
+    async def get_scale_users(self) -> List[Dict[str, Any]]:
+        """Get users for this scale device by extracting from measurement records."""
+
+        return self._users_from_records(
+            await self.get_scale_records(limit=HISTORY_PAGE_SIZE)
+        )
+
+    async def get_analysis_report(
+        self, height: float, weight: float, age: int, sex: int, resistance: str
+    ) -> Dict[str, Any]:
+        """Get body analysis report."""
+
+        data = await self._post(
+            self._analysis_path(),
+            self._analysis_body((height, weight, age, sex, resistance)),
+        )
+        return data.get("result", {})
+
+    async def _analyse_key(self, key: AnalysisKey, record_key: str) -> Dict[str, Any] | None:
+        """Return the analysis for one input according to ``analysis_mode``."""
+
+        if self.analysis_mode == ANALYSIS_MODE_CLOUD:
+            return self._cache_analysis(key, record_key, await self.get_analysis_report(*key))
+        local = self._local_analysis(key)
+        if self.analysis_mode == ANALYSIS_MODE_LOCAL_FIRST:
+            # Answer now; the cloud report is cached for later polls once it arrives.
+            task = asyncio.create_task(self._async_reconcile(key, record_key, local))
+            self._background_tasks.add(task)
+            task.add_done_callback(self._background_tasks.discard)
+        return local
+
+    async def _async_reconcile(
+        self, key: AnalysisKey, record_key: str, local: Dict[str, Any] | None
+    ) -> None:
+        try:
+            # Wait for a free analysis slot like any other analysis of the project.
+            async with self.analysis_slots:
+                report = await self.get_analysis_report(*key)
+        except Exception as err:  # pylint: disable=broad-except
+            _LOGGER.debug("Cloud analysis for reconciliation failed: %s", err)
+            return
+        self._reconcile(key, local, self._cache_analysis(key, record_key, report))
+
+    def cancel_background_tasks(self) -> None:
+        """Cancel pending background reconciliations, e.g. when the entry unloads."""
+
+        for task in self._background_tasks:
+            task.cancel()
+
+    async def get_latest_data(
+        self, known_users: Iterable[str] | None = None, full_scan: bool = False
+    ) -> Dict[str, Dict[str, Any]]:
+        """Get latest measurement data for all users of this scale, including analysis report.
+
+        History is read in a single paged pass: the newest record seen for each
+        user is their latest measurement. Paging stops as soon as every user in
+        ``known_users`` (typically the users from the previous poll) has been
+        seen, so the request count does not grow with the number of users.
+
+        Once ``high_water_mark`` is set only records newer than it are
+        requested, so the result holds just the users with new measurements
+        and is usually empty. ``full_scan`` ignores the mark and returns the
+        latest record of every user found; known users missing from a
+        history read to the end are left in ``gone_users``.
+
+        Distinct analysis inputs across all users run concurrently, at most
+        ``analysis_slots`` at a time, and each result is fanned out to every
+        record that shares it.
+        """
+
+        scan = self._start_scan(known_users, full_scan)
+        with self._stage("history"):
+            async for records, has_next in self.iter_history_pages(start_time=scan.start_time):
+                if scan.add_page(records, has_next):
+                    break
+
+        with self._stage("plan"):
+            analysis_records = self._analysis_records(scan)
+            pending = self._plan_analyses(scan, analysis_records)
+        with self._stage("analysis"):
+            await self._run_analyses(pending)
+        with self._stage("finish"):
+            return self._finish_scan(scan, analysis_records)
+
+    async def analyse_records(self, records: Iterable[Dict[str, Any]]) -> None:
+        """Attach analysis reports to records obtained outside a history scan."""
+
+        await self._run_analyses(self._group_analyses(records))
+
+    async def _run_analyses(
+        self, pending: Dict[AnalysisKey, List[tuple[str, Dict[str, Any]]]]
+    ) -> None:
+        outcomes = await asyncio.gather(
+            *(self._pooled_analysis(key, targets[0][0]) for key, targets in pending.items()),
+            return_exceptions=True,
+        )
+        for (key, targets), outcome in zip(pending.items(), outcomes):
+            if isinstance(outcome, Exception):
+                _LOGGER.warning("Could not fetch analysis report for %s: %s", key, outcome)
+                continue
+            self._fan_out(key, targets, outcome)
+
+    async def _pooled_analysis(self, key: AnalysisKey, record_key: str) -> Dict[str, Any] | None:
+        async with self.analysis_slots:
+            return await self._analyse_key(key, record_key)
+
+
+def _is_valid_user_id(user_id: Any) -> bool:
+    """Return True for real scale users (Tuya reports unassigned weigh-ins as "0")."""
+
+    return isinstance(user_id, str) and bool(user_id.strip()) and user_id != "0"
+
+
+def _record_time(record: Dict[str, Any]) -> int:
+    """Return the record create_time in milliseconds, or 0 if missing."""
+
+    try:
+        return int(record.get("create_time") or 0)
+    except (TypeError, ValueError):
+        return 0
+
+
+def _record_key(record: Dict[str, Any]) -> str:
+    """Return a stable identifier for a measurement record."""
+
+    if record.get("id"):
+        return str(record["id"])
+    return f"{record.get('user_id')}:{record.get('create_time')}"
+
+
+def _has_resistance(record: Dict[str, Any]) -> bool:
+    """Return True if the record carries a bio-impedance reading."""
+
+    return bool(record.get("body_r")) and record.get("body_r") != "0"
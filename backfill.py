@@ -0,0 +1,192 @@
+"""Import the scale's full measurement history into long-term statistics."""
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections import defaultdict
+from typing import Any, AsyncIterator, Dict, List
+
+from homeassistant.components import persistent_notification
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.storage import Store
+from homeassistant.util import dt as dt_util
+from homeassistant.util import slugify
+
+from .const import (
+    BACKFILL_BATCH_RECORDS,
+    BACKFILL_EARLIEST,
+    DOMAIN,
+    MEASUREMENT_FIELDS,
+    SENSOR_DISPLAY_NAMES,
+    SENSOR_TYPES,
+    STORAGE_VERSION,
+)
+from .exceptions import TuyaRateLimitError
+from .snapshot import FIELD_RESOLVERS
+
+_LOGGER = logging.getLogger(__name__)
+
+HOUR_MS = 3_600_000
+
+
+class HistoryBackfill:
+    """Stream a device's history into external statistics, resumably.
+
+    Records are read newest first in pages and aggregated into hourly
+    mean/min/max buckets per (user, field). History records carry no analysis
+    report, so body composition comes from the cached cloud report for the
+    record or, failing that, the local BIA estimate. Every
+    ``BACKFILL_BATCH_RECORDS`` records the completed buckets are imported and
+    the checkpoint (the end of the oldest hour not yet imported) is saved, so
+    an interrupted run resumes where it stopped without holding more than one
+    batch in memory. A run that fails saves its checkpoint and raises a
+    persistent notification asking to resume.
+    """
+
+    def __init__(self, hass: HomeAssistant, coordinator: Any) -> None:
+        self.hass = hass
+        self.coordinator = coordinator
+        self.api = coordinator.api
+        self._store: Store = Store(
+            hass, STORAGE_VERSION, f"{DOMAIN}.{self.api.device_id}.backfill"
+        )
+        self._nicknames: dict[str, str] = {}
+        self.imported = 0
+
+    async def async_run(self, restart: bool = False) -> None:
+        start_time = int(BACKFILL_EARLIEST.timestamp() * 1000)
+        checkpoint = None if restart else await self._store.async_load()
+        if checkpoint and checkpoint.get("done"):
+            _LOGGER.info("History of %s already imported", self.api.device_id)
+            return
+        end_time = (checkpoint or {}).get("cursor") or int(time.time() * 1000)
+
+        buckets: dict[tuple[str, str, int], list[float]] = {}
+        pending: list[Dict[str, Any]] = []
+        try:
+            async for record in self._iter_records(start_time, end_time):
+                self._add(buckets, record)
+                pending.append(record)
+                if len(pending) >= BACKFILL_BATCH_RECORDS:
+                    await self.coordinator.timeseries.async_add_records(pending)
+                    await self._flush(buckets, keep_oldest=True)
+                    pending = []
+        except Exception as err:  # pylint: disable=broad-except
+            # Keep what was read so far; the next run resumes from the checkpoint.
+            await self.coordinator.timeseries.async_add_records(pending)
+            await self._flush(buckets, keep_oldest=True)
+            _LOGGER.error("History backfill of %s stopped: %s", self.api.device_id, err)
+            persistent_notification.async_create(
+                self.hass,
+                f"Importing the measurement history of scale {self.api.device_id} stopped "
+                f"after {self.imported} measurements: {err}. Call the "
+                f"`{DOMAIN}.backfill_history` service again to resume from where it stopped.",
+                title="Intelar scale history import stopped",
+                notification_id=self._notification_id,
+            )
+            return
+        await self.coordinator.timeseries.async_add_records(pending)
+        await self._flush(buckets, keep_oldest=False)
+        await self._store.async_save({"cursor": start_time, "done": True})
+        persistent_notification.async_dismiss(self.hass, self._notification_id)
+        _LOGGER.info(
+            "Imported %d historical measurements for %s", self.imported, self.api.device_id
+        )
+
+    @property
+    def _notification_id(self) -> str:
+        return f"{DOMAIN}_backfill_{self.api.device_id}"
+
+    async def _iter_records(self, start_time: int, end_time: int) -> AsyncIterator[Dict[str, Any]]:
+        """Yield history records, waiting out throttling instead of aborting."""
+
+        cursor = end_time
+        seen_at_cursor: set[str] = set()
+        while True:
+            try:
+                async for record in self.api.iter_history_records(start_time, cursor):
+                    create_time = int(record.get("create_time") or cursor)
+                    key = f"{record.get('id')}:{record.get('user_id')}:{create_time}"
+                    if create_time != cursor:
+                        cursor, seen_at_cursor = create_time, set()
+                    elif key in seen_at_cursor:
+                        continue
+                    seen_at_cursor.add(key)
+                    yield record
+                return
+            except TuyaRateLimitError as err:
+                _LOGGER.debug("Backfill throttled, resuming in %.0fs", err.retry_after)
+                await asyncio.sleep(max(err.retry_after, 1))
+
+    def _add(self, buckets: dict[tuple[str, str, int], list[float]], record: Dict[str, Any]) -> None:
+        user_id = record.get("user_id")
+        create_time = int(record.get("create_time") or 0)
+        if not user_id or user_id == "0" or not create_time:
+            return
+        if nickname := record.get("nick_name") or record.get("nickname"):
+            self._nicknames.setdefault(user_id, nickname)
+        if "analysis_report" not in record and (report := self.api.offline_analysis(record)):
+            record["analysis_report"] = report
+        hour = create_time - create_time % HOUR_MS
+        self.imported += 1
+        for field in MEASUREMENT_FIELDS:
+            value = FIELD_RESOLVERS[field](record)
+            if isinstance(value, float):
+                buckets.setdefault((user_id, field, hour), []).append(value)
+
+    async def _flush(
+        self, buckets: dict[tuple[str, str, int], list[float]], keep_oldest: bool
+    ) -> None:
+        """Import completed buckets and save the checkpoint.
+
+        The oldest hour may continue in the next page, so with ``keep_oldest``
+        it stays in ``buckets`` and the checkpoint points at its last millisecond.
+        """
+
+        if not buckets:
+            return
+        oldest_hour = min(hour for _, _, hour in buckets)
+        series: dict[tuple[str, str], List[dict[str, Any]]] = defaultdict(list)
+        for (user_id, field, hour), values in list(buckets.items()):
+            if keep_oldest and hour == oldest_hour:
+                continue
+            del buckets[(user_id, field, hour)]
+            series[(user_id, field)].append(
+                {
+                    "start": dt_util.utc_from_timestamp(hour / 1000),
+                    "mean": sum(values) / len(values),
+                    "min": min(values),
+                    "max": max(values),
+                }
+            )
+
+        self._import(series)
+        if keep_oldest:
+            await self._store.async_save({"cursor": oldest_hour + HOUR_MS - 1, "done": False})
+
+    @callback
+    def _import(self, series: dict[tuple[str, str], List[dict[str, Any]]]) -> None:
+        # Imported lazily so the integration loads without the recorder.
+        from homeassistant.components.recorder.statistics import (  # pylint: disable=import-outside-toplevel
+            async_add_external_statistics,
+        )
+
+        for (user_id, field), statistics in series.items():
+            statistics.sort(key=lambda row: row["start"])
+            display_name = SENSOR_DISPLAY_NAMES.get(field, field.replace("_", " ").title())
+            metadata = {
+                "has_mean": True,
+                "has_sum": False,
+                "name": f"{display_name} ({self._nicknames.get(user_id, user_id)})",
+                "source": DOMAIN,
+                "statistic_id": statistic_id(self.api.device_id, user_id, field),
+                "unit_of_measurement": SENSOR_TYPES[field]["unit"],
+            }
+            async_add_external_statistics(self.hass, metadata, statistics)
+
+
+def statistic_id(device_id: str, user_id: str, field: str) -> str:
+    """Return the external statistic id for one user's field."""
+
+    return f"{DOMAIN}:{slugify(f'{device_id}_{user_id}_{field}')}"
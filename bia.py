@@ -0,0 +1,95 @@
+"""Local bioelectrical impedance analysis (BIA) body-composition estimates.
+
+Used instead of, or ahead of, the cloud ``analysis-reports`` endpoint. The
+result has the same keys as a Tuya analysis report so it can be stored and
+rendered the same way. The equations are published single-frequency BIA
+regressions that only need height, weight, age, sex and whole-body
+resistance:
+
+* fat-free mass and total body water: Sun et al., Am J Clin Nutr 2003
+* skeletal muscle mass: Janssen et al., J Appl Physiol 2000
+* basal metabolic rate: Katch-McArdle, from fat-free mass
+
+Bone mass (a fixed share of fat-free mass) and the visceral fat rating are
+heuristics. None of the estimates has been validated against recorded cloud
+reports yet; see ``tools/validate_bia.py``.
+"""
+from __future__ import annotations
+
+from typing import Any, Dict
+
+# Tuya sex codes
+MALE = 1
+
+# Fields compared when reconciling a local report with the cloud one.
+RECONCILED_FIELDS = ("body_fat", "ffm", "water", "muscle", "bones", "metabolism", "visceral_fat", "bmi")
+
+# BMI upper bounds for the Tuya body_type codes 0-3; anything above is 4.
+_BODY_TYPE_BMI = (18.5, 25.0, 30.0, 35.0)
+
+
+def compute_body_composition(
+    height: float, weight: float, age: int, sex: int, resistance: float
+) -> Dict[str, Any]:
+    """Return an analysis report computed locally from one weigh-in.
+
+    ``height`` is in cm, ``weight`` in kg and ``resistance`` in ohm. Raises
+    ValueError if an input is not positive.
+    """
+
+    height, weight, resistance = float(height), float(weight), float(resistance)
+    if height <= 0 or weight <= 0 or resistance <= 0:
+        raise ValueError("height, weight and resistance must be positive")
+    male = int(sex) == MALE
+    impedance_index = height * height / resistance
+    height_m = height / 100
+    bmi = weight / (height_m * height_m)
+
+    if male:
+        ffm = -10.68 + 0.65 * impedance_index + 0.26 * weight + 0.02 * resistance
+        water = 1.20 + 0.45 * impedance_index + 0.18 * weight
+    else:
+        ffm = -9.53 + 0.69 * impedance_index + 0.17 * weight + 0.02 * resistance
+        water = 3.75 + 0.45 * impedance_index + 0.11 * weight
+    ffm = _clamp(ffm, weight * 0.4, weight * 0.97)
+    water = _clamp(water, ffm * 0.6, ffm * 0.8)
+    body_fat = (weight - ffm) / weight * 100
+
+    muscle = 0.401 * impedance_index + (3.825 if male else 0.0) - 0.071 * age + 5.102
+    muscle = _clamp(muscle, 0.0, ffm * 0.9)
+    bones = ffm * 0.05
+    protein = max(ffm - water - bones, 0.0) / weight * 100
+    metabolism = 370 + 21.6 * ffm
+
+    # Heuristic 1-59 visceral fat rating: grows with excess body fat, BMI and age.
+    excess_fat = body_fat - (15 if male else 25)
+    visceral_fat = _clamp(round(6 + 0.4 * excess_fat + 0.5 * (bmi - 22) + 0.1 * (age - 30)), 1, 59)
+
+    return {
+        "bmi": round(bmi, 1),
+        "body_fat": round(body_fat, 1),
+        "ffm": round(ffm, 1),
+        "water": round(water / weight * 100, 1),
+        "muscle": round(muscle, 1),
+        "bones": round(bones, 1),
+        "protein": round(protein, 1),
+        "metabolism": int(round(metabolism)),
+        "visceral_fat": int(visceral_fat),
+        "body_type": sum(bmi >= bound for bound in _BODY_TYPE_BMI),
+    }
+
+
+def report_differences(local: Dict[str, Any], cloud: Dict[str, Any]) -> Dict[str, float]:
+    """Return ``cloud - local`` for every reconciled field present in both reports."""
+
+    differences = {}
+    for field in RECONCILED_FIELDS:
+        try:
+            differences[field] = round(float(cloud[field]) - float(local[field]), 2)
+        except (KeyError, TypeError, ValueError):
+            continue
+    return differences
+
+
+def _clamp(value: float, low: float, high: float) -> float:
+    return min(max(value, low), high)
@@ -0,0 +1,80 @@
+"""In-memory caches for the Intelar scale integration."""
+from __future__ import annotations
+
+from collections import OrderedDict
+from typing import Any, Dict, Tuple
+
+AnalysisKey = Tuple[float, float, int, int, str]
+
+
+class AnalysisReportCache:
+    """Bounded LRU cache of analysis reports keyed by the exact request inputs.
+
+    Reports are stored once per (height, weight, age, sex, resistance) tuple.
+    Records that have already been analysed are linked to their key so that an
+    unchanged measurement is never re-analysed, even after the user's age ticks
+    over.
+    """
+
+    def __init__(self, max_size: int) -> None:
+        self.max_size = max_size
+        self._reports: OrderedDict[AnalysisKey, Dict[str, Any]] = OrderedDict()
+        self._records: OrderedDict[str, AnalysisKey] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._reports)
+
+    def get(self, key: AnalysisKey) -> Dict[str, Any] | None:
+        """Return the cached report for ``key`` and mark it recently used."""
+
+        report = self._reports.get(key)
+        if report is not None:
+            self._reports.move_to_end(key)
+        return report
+
+    def get_for_record(self, record_key: str) -> Dict[str, Any] | None:
+        """Return the report previously linked to ``record_key``, if still cached."""
+
+        key = self._records.get(record_key)
+        if key is None:
+            return None
+        return self.get(key)
+
+    def put(self, key: AnalysisKey, report: Dict[str, Any], record_key: str | None = None) -> None:
+        """Store ``report`` under ``key`` and optionally link ``record_key`` to it."""
+
+        self._reports[key] = report
+        self._reports.move_to_end(key)
+        while len(self._reports) > self.max_size:
+            self._reports.popitem(last=False)
+        if record_key is not None:
+            self.link_record(record_key, key)
+
+    def link_record(self, record_key: str, key: AnalysisKey) -> None:
+        """Remember that ``record_key`` was analysed with inputs ``key``."""
+
+        self._records[record_key] = key
+        self._records.move_to_end(record_key)
+        while len(self._records) > self.max_size:
+            self._records.popitem(last=False)
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Return a JSON-serialisable snapshot for Home Assistant storage."""
+
+        return {
+            "reports": [[list(key), report] for key, report in self._reports.items()],
+            "records": [[record_key, list(key)] for record_key, key in self._records.items()],
+        }
+
+    def load(self, stored: Dict[str, Any]) -> None:
+        """Restore entries saved by :meth:`as_dict`, oldest first."""
+
+        for key, report in stored.get("reports", []):
+            self.put(_as_key(key), report)
+        for record_key, key in stored.get("records", []):
+            self.link_record(record_key, _as_key(key))
+
+
+def _as_key(value: Any) -> AnalysisKey:
+    height, weight, age, sex, resistance = value
+    return (float(height), float(weight), int(age), int(sex), str(resistance))
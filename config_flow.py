@@ -1,40 +1,69 @@
 from __future__ import annotations
 
 import logging
+from datetime import datetime
 from typing import Any
 
 import voluptuous as vol
 from homeassistant import config_entries
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.data_entry_flow import FlowResult
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
 
-from .api import TuyaSmartScaleAPI
+from .api import AsyncTuyaSmartScaleAPI
 from .const import (
+    ANALYSIS_MODE_CLOUD,
+    ANALYSIS_MODES,
     CONF_ACCESS_ID,
     CONF_ACCESS_KEY,
+    CONF_ANALYSIS_MODE,
+    CONF_BATCH_POLL,
     CONF_BIRTHDATE,
     CONF_DEVICE_ID,
+    CONF_DIAGNOSTICS,
+    CONF_ENDPOINT,
+    CONF_HEIGHT,
+    CONF_LOCAL_HOST,
+    CONF_MAX_SCAN_INTERVAL,
+    CONF_POOL_SIZE,
+    CONF_PROFILES,
+    CONF_PUSH,
     CONF_REGION,
+    CONF_SCAN_INTERVAL,
     CONF_SEX,
+    CONF_USER_ID,
     DEFAULT_BIRTHDATE,
+    DEFAULT_MAX_SCAN_INTERVAL,
+    DEFAULT_POOL_SIZE,
     DEFAULT_REGION,
     DEFAULT_SEX,
     DOMAIN,
+    MAX_POOL_SIZE,
+    MAX_SCAN_INTERVAL,
+    MIN_SCAN_INTERVAL,
+    REGION_AUTO,
     REGIONS,
     SEX_OPTIONS,
+    UPDATE_INTERVAL,
 )
+from .regions import async_detect_region
 
 _LOGGER = logging.getLogger(__name__)
 
 
 def _region_options() -> dict[str, str]:
-    return {code: data["name"] for code, data in REGIONS.items()}
+    return {
+        REGION_AUTO: "Detect automatically",
+        **{code: data["name"] for code, data in REGIONS.items()},
+    }
 
 
 class IntelarConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
     """Handle a config flow for Intelar scale."""
 
     VERSION = 1
+    # 1.2: alternate data centers got region codes of their own.
+    MINOR_VERSION = 2
 
     async def async_step_user(self, user_input: dict[str, Any] | None = None) -> FlowResult:
         errors: dict[str, str] = {}
@@ -45,34 +74,47 @@ class IntelarConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                 if entry.data.get(CONF_DEVICE_ID) == user_input.get(CONF_DEVICE_ID):
                     return self.async_abort(reason="already_configured")
 
-            # Validate credentials and device access
-            try:
-                api = TuyaSmartScaleAPI(
-                    access_id=user_input[CONF_ACCESS_ID],
-                    access_key=user_input[CONF_ACCESS_KEY],
-                    device_id=user_input[CONF_DEVICE_ID],
-                    region=user_input.get(CONF_REGION, DEFAULT_REGION),
-                    birthdate=user_input.get(CONF_BIRTHDATE, DEFAULT_BIRTHDATE),
-                    sex=user_input.get(CONF_SEX, DEFAULT_SEX),
-                )
-                device_info = await self.hass.async_add_executor_job(api.get_device_info)
-                if not device_info:
-                    errors["base"] = "cannot_connect"
+            if user_input.get(CONF_REGION) == REGION_AUTO:
+                if (detected := await self._async_detect_region(user_input)) is None:
+                    errors["base"] = "region_not_found"
                 else:
-                    title = device_info.get("name") or "Intelar Scale"
-                    return self.async_create_entry(title=title, data=user_input)
-            except ValueError:
-                errors[CONF_BIRTHDATE] = "invalid_date"
-            except Exception as ex:  # pylint: disable=broad-except
-                _LOGGER.error("Failed to connect to Tuya API: %s", ex)
-                errors["base"] = "cannot_connect"
+                    data = {
+                        **user_input,
+                        CONF_REGION: detected["region"],
+                        CONF_ENDPOINT: detected["endpoint"],
+                    }
+                    title = detected["device"].get("name") or "Intelar Scale"
+                    return self.async_create_entry(title=title, data=data)
+            else:
+                # Validate credentials and device access
+                try:
+                    api = AsyncTuyaSmartScaleAPI(
+                        session=async_get_clientsession(self.hass),
+                        access_id=user_input[CONF_ACCESS_ID],
+                        access_key=user_input[CONF_ACCESS_KEY],
+                        device_id=user_input[CONF_DEVICE_ID],
+                        region=user_input.get(CONF_REGION, DEFAULT_REGION),
+                        birthdate=user_input.get(CONF_BIRTHDATE, DEFAULT_BIRTHDATE),
+                        sex=user_input.get(CONF_SEX, DEFAULT_SEX),
+                    )
+                    device_info = await api.get_device_info()
+                    if not device_info:
+                        errors["base"] = "cannot_connect"
+                    else:
+                        title = device_info.get("name") or "Intelar Scale"
+                        return self.async_create_entry(title=title, data=user_input)
+                except ValueError:
+                    errors[CONF_BIRTHDATE] = "invalid_date"
+                except Exception as ex:  # pylint: disable=broad-except
+                    _LOGGER.error("Failed to connect to Tuya API: %s", ex)
+                    errors["base"] = "cannot_connect"
 
         data_schema = vol.Schema(
             {
                 vol.Required(CONF_ACCESS_ID): str,
                 vol.Required(CONF_ACCESS_KEY): str,
                 vol.Required(CONF_DEVICE_ID): str,
-                vol.Optional(CONF_REGION, default=DEFAULT_REGION): vol.In(_region_options()),
+                vol.Optional(CONF_REGION, default=REGION_AUTO): vol.In(_region_options()),
                 vol.Optional(CONF_BIRTHDATE, default=DEFAULT_BIRTHDATE): str,
                 vol.Optional(CONF_SEX, default=DEFAULT_SEX): vol.In(SEX_OPTIONS),
             }
@@ -84,5 +126,172 @@ class IntelarConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
             errors=errors,
         )
 
+    async def _async_detect_region(self, user_input: dict[str, Any]) -> dict[str, Any] | None:
+        """Probe the Tuya data centers for the device; endpoints of the same project first.
+
+        The detected region and endpoint are stored in the entry, so setting
+        it up never probes again.
+        """
+
+        preferred = [
+            (
+                entry.data[CONF_REGION],
+                entry.data.get(CONF_ENDPOINT) or REGIONS[entry.data[CONF_REGION]]["endpoint"],
+            )
+            for entry in self._async_current_entries()
+            if entry.data.get(CONF_ACCESS_ID) == user_input[CONF_ACCESS_ID]
+            and entry.data.get(CONF_REGION) in REGIONS
+        ]
+        detected = await async_detect_region(
+            async_get_clientsession(self.hass),
+            user_input[CONF_ACCESS_ID],
+            user_input[CONF_ACCESS_KEY],
+            user_input[CONF_DEVICE_ID],
+            preferred,
+        )
+        if detected is not None:
+            _LOGGER.info(
+                "Scale %s found in region %s through %s",
+                user_input[CONF_DEVICE_ID],
+                detected["region"],
+                detected["endpoint"],
+            )
+        return detected
+
     async def async_step_import(self, user_input: dict[str, Any]) -> FlowResult:
         return await self.async_step_user(user_input)
+
+    @staticmethod
+    @callback
+    def async_get_options_flow(
+        config_entry: config_entries.ConfigEntry,
+    ) -> IntelarOptionsFlow:
+        return IntelarOptionsFlow(config_entry)
+
+
+class IntelarOptionsFlow(config_entries.OptionsFlow):
+    """Handle options for an Intelar scale entry."""
+
+    def __init__(self, config_entry: config_entries.ConfigEntry) -> None:
+        self.config_entry = config_entry
+        self._user_id: str | None = None
+
+    async def async_step_init(self, user_input: dict[str, Any] | None = None) -> FlowResult:
+        return self.async_show_menu(step_id="init", menu_options=["settings", "profiles"])
+
+    async def async_step_settings(self, user_input: dict[str, Any] | None = None) -> FlowResult:
+        errors: dict[str, str] = {}
+        options = self.config_entry.options
+
+        if user_input is not None:
+            if user_input[CONF_MAX_SCAN_INTERVAL] < user_input[CONF_SCAN_INTERVAL]:
+                errors[CONF_MAX_SCAN_INTERVAL] = "max_below_scan_interval"
+            else:
+                return self.async_create_entry(title="", data={**options, **user_input})
+
+        interval_range = vol.All(
+            vol.Coerce(int), vol.Range(min=MIN_SCAN_INTERVAL, max=MAX_SCAN_INTERVAL)
+        )
+        data_schema = vol.Schema(
+            {
+                vol.Optional(
+                    CONF_SCAN_INTERVAL,
+                    default=options.get(CONF_SCAN_INTERVAL, UPDATE_INTERVAL),
+                ): interval_range,
+                vol.Optional(
+                    CONF_MAX_SCAN_INTERVAL,
+                    default=options.get(CONF_MAX_SCAN_INTERVAL, DEFAULT_MAX_SCAN_INTERVAL),
+                ): interval_range,
+                vol.Optional(
+                    CONF_ANALYSIS_MODE,
+                    default=options.get(CONF_ANALYSIS_MODE, ANALYSIS_MODE_CLOUD),
+                ): vol.In(ANALYSIS_MODES),
+                vol.Optional(CONF_PUSH, default=options.get(CONF_PUSH, False)): bool,
+                vol.Optional(CONF_LOCAL_HOST, default=options.get(CONF_LOCAL_HOST, "")): str,
+                vol.Optional(CONF_BATCH_POLL, default=options.get(CONF_BATCH_POLL, False)): bool,
+                vol.Optional(
+                    CONF_DIAGNOSTICS, default=options.get(CONF_DIAGNOSTICS, False)
+                ): bool,
+                vol.Optional(
+                    CONF_POOL_SIZE, default=options.get(CONF_POOL_SIZE, DEFAULT_POOL_SIZE)
+                ): vol.All(vol.Coerce(int), vol.Range(min=1, max=MAX_POOL_SIZE)),
+            }
+        )
+
+        return self.async_show_form(
+            step_id="settings",
+            data_schema=data_schema,
+            errors=errors,
+        )
+
+    async def async_step_profiles(self, user_input: dict[str, Any] | None = None) -> FlowResult:
+        """Pick the scale user whose profile to edit."""
+
+        users = self._known_users()
+        if not users:
+            return self.async_abort(reason="no_users")
+        if user_input is not None:
+            self._user_id = user_input[CONF_USER_ID]
+            return await self.async_step_profile()
+
+        return self.async_show_form(
+            step_id="profiles",
+            data_schema=vol.Schema({vol.Required(CONF_USER_ID): vol.In(users)}),
+        )
+
+    async def async_step_profile(self, user_input: dict[str, Any] | None = None) -> FlowResult:
+        """Edit birthdate, sex and height override for the selected user."""
+
+        errors: dict[str, str] = {}
+        options = self.config_entry.options
+        profiles = dict(options.get(CONF_PROFILES) or {})
+        current = profiles.get(self._user_id) or {}
+
+        if user_input is not None:
+            try:
+                datetime.strptime(user_input[CONF_BIRTHDATE], "%Y-%m-%d")
+            except ValueError:
+                errors[CONF_BIRTHDATE] = "invalid_date"
+            else:
+                profiles[self._user_id] = {
+                    CONF_BIRTHDATE: user_input[CONF_BIRTHDATE],
+                    CONF_SEX: user_input[CONF_SEX],
+                    CONF_HEIGHT: user_input.get(CONF_HEIGHT) or None,
+                }
+                return self.async_create_entry(title="", data={**options, CONF_PROFILES: profiles})
+
+        data = self.config_entry.data
+        data_schema = vol.Schema(
+            {
+                vol.Required(
+                    CONF_BIRTHDATE,
+                    default=current.get(CONF_BIRTHDATE, data.get(CONF_BIRTHDATE, DEFAULT_BIRTHDATE)),
+                ): str,
+                vol.Required(
+                    CONF_SEX, default=current.get(CONF_SEX, data.get(CONF_SEX, DEFAULT_SEX))
+                ): vol.In(SEX_OPTIONS),
+                # 0 keeps the height reported by the scale.
+                vol.Optional(CONF_HEIGHT, default=current.get(CONF_HEIGHT) or 0): vol.All(
+                    vol.Coerce(float), vol.Range(min=0, max=250)
+                ),
+            }
+        )
+
+        return self.async_show_form(
+            step_id="profile",
+            data_schema=data_schema,
+            errors=errors,
+            description_placeholders={
+                "user": self._known_users().get(self._user_id, self._user_id)
+            },
+        )
+
+    def _known_users(self) -> dict[str, str]:
+        """Return ``{user_id: label}`` for users seen by the scale or with a profile."""
+
+        users = {user_id: user_id for user_id in self.config_entry.options.get(CONF_PROFILES) or {}}
+        coordinator = self.hass.data.get(DOMAIN, {}).get(self.config_entry.entry_id)
+        for user_id, record in (getattr(coordinator, "data", None) or {}).items():
+            nickname = record.get("nickname")
+            users[user_id] = f"{nickname} ({user_id})" if nickname else user_id
+        return users
@@ -1,32 +1,207 @@
 from __future__ import annotations
 
+from datetime import datetime, timezone
+
 from homeassistant.components.sensor import SensorDeviceClass
 
 DOMAIN = "intelar_scale"
 PLATFORMS = ["sensor"]
 
+# hass.data[DOMAIN] key for the (access_id, region) -> TuyaProject registry
+DATA_PROJECTS = "projects"
+
 # API / auth fields
 CONF_ACCESS_ID = "access_id"
 CONF_ACCESS_KEY = "access_key"
 CONF_DEVICE_ID = "device_id"
 CONF_REGION = "region"
+CONF_ENDPOINT = "endpoint"  # OpenAPI endpoint chosen by region auto-detection
 CONF_BIRTHDATE = "birthdate"
 CONF_SEX = "sex"
+CONF_HEIGHT = "height"
+
+# Options
+CONF_SCAN_INTERVAL = "scan_interval"
+CONF_MAX_SCAN_INTERVAL = "max_scan_interval"
+CONF_ANALYSIS_MODE = "analysis_mode"
+CONF_PUSH = "push"
+CONF_LOCAL_HOST = "local_host"
+CONF_BATCH_POLL = "batch_poll"
+CONF_DIAGNOSTICS = "diagnostic_sensors"
+CONF_POOL_SIZE = "pool_size"
+CONF_PROFILES = "profiles"  # {user_id: {birthdate, sex, height}}
+CONF_USER_ID = "user_id"
 
 # Defaults
 DEFAULT_REGION = "us"
 DEFAULT_BIRTHDATE = "1990-01-01"
 DEFAULT_SEX = 1  # 1 = male, 2 = female per Tuya API
 UPDATE_INTERVAL = 300  # seconds
+DEFAULT_MAX_SCAN_INTERVAL = 1800  # seconds, idle back-off ceiling
+MIN_SCAN_INTERVAL = 30
+MAX_SCAN_INTERVAL = 3600
+DEFAULT_POOL_SIZE = 4  # keep-alive connections per Tuya project
+MAX_POOL_SIZE = 20
+REQUEST_TIMEOUT = 15  # seconds
+
+# Request budget, retries and circuit breaker (per Tuya project)
+REQUEST_RATE = 2.0  # sustained requests per second
+REQUEST_BURST = 10
+REQUEST_MAX_ATTEMPTS = 3
+RETRY_BASE_DELAY = 1.0  # seconds
+RETRY_MAX_DELAY = 30.0  # seconds
+BREAKER_BASE_COOLDOWN = 60  # seconds
+BREAKER_MAX_COOLDOWN = 900  # seconds
+ERROR_RETRY_INTERVAL = 60  # seconds until the next poll after a failed one
+# Tuya "success": false codes
+TUYA_TOKEN_INVALID_CODES = {1010, 1011}
+TUYA_RATE_LIMIT_CODES = {40000309, 40000310}
+
+# Token lifecycle
+TOKEN_GRANT_PATH = "/v1.0/token?grant_type=1"
+TOKEN_REFRESH_LEAD = 300  # renew this many seconds before expiry
+TOKEN_REFRESH_RETRY = 60  # seconds between attempts after a failed renewal
+
+# Adaptive polling
+ADAPTIVE_FAST_INTERVAL = 30  # seconds between polls right after a weigh-in
+ADAPTIVE_FAST_WINDOW = 600  # seconds to keep polling fast after a weigh-in
+ACTIVE_HOUR_MIN_SAMPLES = 10  # weigh-ins needed before hours are learned
+ACTIVE_HOUR_MIN_SHARE = 0.1  # share of weigh-ins that makes an hour "usual"
+
+# Push updates from the Tuya message service
+PUSH_TOPIC = "event"
+PUSH_REFRESH_DELAY = 2  # seconds for the record to reach the history API
+PUSH_RETRY_DELAY = 15  # seconds before re-polling if a pushed weigh-in was not there yet
+PUSH_POLL_INTERVAL = 3600  # safety-net polling while the subscription is connected
+
+# Project-level batched polling of several scales
+BATCH_STATUS_PATH = "/v1.0/iot-03/devices/status"
+BATCH_STATUS_MAX_DEVICES = 20  # device ids per batched status request
+BATCH_DUE_SLACK = 0.25  # share of the tick interval a due poll may be brought forward
+
+# Local LAN transport (Tuya local protocol 3.3)
+LOCAL_PORT = 6668
+LOCAL_TIMEOUT = 5  # seconds to connect or get a heartbeat answer
+LOCAL_HEARTBEAT = 10  # seconds of silence before pinging the device
+LOCAL_USER_MATCH_TOLERANCE = 3.0  # kg from a user's last weight to attribute a weigh-in
+# Record field -> thing model DP codes that carry it
+LOCAL_DP_FIELDS = {
+    "wegith": ("weight", "body_weight", "wegith"),
+    "body_r": ("body_r", "resistance", "impedance"),
+    "height": ("height", "body_height"),
+    "user_id": ("user_id",),
+}
+
+# History paging
+HISTORY_PAGE_SIZE = 100
+HISTORY_MAX_PAGES = 5
+# Seconds between full history scans that drop users removed from the scale
+USER_RECONCILE_INTERVAL = 6 * 3600
+
+# Analysis report cache (entries kept in memory and in storage)
+ANALYSIS_CACHE_SIZE = 64
+# Analysis stage: concurrent analysis requests per project, records analysed per poll
+ANALYSIS_CONCURRENCY = 4
+ANALYSIS_MAX_RECORDS = 50
+
+# Request metrics: latency histogram bucket upper bounds (seconds)
+METRICS_LATENCY_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 15.0)
+# Config entry and record fields left out of diagnostics downloads
+DIAGNOSTICS_REDACT = {
+    CONF_ACCESS_ID,
+    CONF_ACCESS_KEY,
+    CONF_BIRTHDATE,
+    "local_key",
+    "nickname",
+    "nick_name",
+}
 
-# Region definitions
+# Numeric fields kept per measurement (local store and statistics backfill)
+MEASUREMENT_FIELDS = (
+    "weight",
+    "body_fat",
+    "bmi",
+    "body_r",
+    "muscle",
+    "water",
+    "bones",
+    "protein",
+    "ffm",
+    "visceral_fat",
+    "metabolism",
+)
+
+# History backfill into long-term statistics
+SERVICE_BACKFILL_HISTORY = "backfill_history"
+BACKFILL_EARLIEST = datetime(2015, 1, 1, tzinfo=timezone.utc)
+BACKFILL_BATCH_RECORDS = 500
+
+# Local measurement store (under .storage/) and history queries
+TIMESERIES_DIR = f"{DOMAIN}_timeseries"
+SERVICE_GET_MEASUREMENTS = "get_measurements"
+DEFAULT_MEASUREMENT_COUNT = 10
+
+# Body-composition analysis: Tuya cloud report, local BIA estimate, or local
+# first with the cloud report fetched in the background for reconciliation
+ANALYSIS_MODE_CLOUD = "cloud"
+ANALYSIS_MODE_LOCAL = "local"
+ANALYSIS_MODE_LOCAL_FIRST = "local_first"
+ANALYSIS_MODES = {
+    ANALYSIS_MODE_CLOUD: "Cloud only",
+    ANALYSIS_MODE_LOCAL: "Local only (unvalidated estimate)",
+    ANALYSIS_MODE_LOCAL_FIRST: "Local first, reconcile with cloud (unvalidated estimate)",
+}
+BIA_RECONCILE_TOLERANCE = 5.0  # body fat percentage points before warning
+
+# Trend sensors derived from the local measurement store
+TREND_SHORT_WINDOW_DAYS = 7
+TREND_LONG_WINDOW_DAYS = 30  # also the window for change-rate and body-fat trend
+TREND_EWMA_HALF_LIFE_DAYS = 7
+
+# Persistent storage (homeassistant.helpers.storage)
+STORAGE_VERSION = 1
+STORAGE_SAVE_DELAY = 10  # seconds
+
+# Region definitions. Every Tuya data center is its own region with its own
+# OpenAPI and message service endpoints, and projects are keyed by region.
 REGIONS = {
-    "us": {"name": "United States", "endpoint": "https://openapi.tuyaus.com"},
-    "eu": {"name": "Europe", "endpoint": "https://openapi.tuyaeu.com"},
-    "cn": {"name": "China", "endpoint": "https://openapi.tuyacn.com"},
-    "in": {"name": "India", "endpoint": "https://openapi.tuyain.com"},
+    "us": {
+        "name": "United States (West)",
+        "endpoint": "https://openapi.tuyaus.com",
+        "mq_endpoint": "wss://mqe.tuyaus.com:8285/",
+    },
+    "us-e": {
+        "name": "United States (East)",
+        "endpoint": "https://openapi-ueaz.tuyaus.com",
+        "mq_endpoint": "wss://mqe-ueaz.tuyaus.com:8285/",
+    },
+    "eu": {
+        "name": "Europe (Central)",
+        "endpoint": "https://openapi.tuyaeu.com",
+        "mq_endpoint": "wss://mqe.tuyaeu.com:8285/",
+    },
+    "eu-w": {
+        "name": "Europe (West)",
+        "endpoint": "https://openapi-weaz.tuyaeu.com",
+        "mq_endpoint": "wss://mqe-weaz.tuyaeu.com:8285/",
+    },
+    "cn": {
+        "name": "China",
+        "endpoint": "https://openapi.tuyacn.com",
+        "mq_endpoint": "wss://mqe.tuyacn.com:8285/",
+    },
+    "in": {
+        "name": "India",
+        "endpoint": "https://openapi.tuyain.com",
+        "mq_endpoint": "wss://mqe.tuyain.com:8285/",
+    },
 }
 
+# Region auto-detection in the config flow
+REGION_AUTO = "auto"
+REGION_PROBE_TIMEOUT = 5  # seconds per endpoint for a token and device lookup
+REGION_PROBE_GRACE = 1.0  # seconds other endpoints get to beat the first match
+
 # Sex options displayed in the UI (maps to API numeric values)
 SEX_OPTIONS = {
     1: "Male",
@@ -54,6 +229,16 @@ SENSOR_DISPLAY_NAMES = {
     "protein": "Protein",
     "water": "Body Water",
     "metabolism": "Basal Metabolic Rate",
+    "weight_avg_7d": "Weight 7-day Average",
+    "weight_avg_30d": "Weight 30-day Average",
+    "weight_change_rate": "Weight Change Rate",
+    "weight_smoothed": "Smoothed Weight",
+    "body_fat_trend": "Body Fat Trend",
+    "api_requests": "API Requests",
+    "api_errors": "API Errors",
+    "api_latency": "API Mean Latency",
+    "analysis_cache_hit_ratio": "Analysis Cache Hit Ratio",
+    "poll_duration": "Last Poll Duration",
 }
 
 # Sensor type definitions
@@ -179,3 +364,61 @@ SENSOR_TYPES = {
         "aliases": [],
     },
 }
+
+# Derived sensor types computed from each user's measurement history
+TREND_SENSOR_TYPES = {
+    "weight_avg_7d": {
+        "unit": "kg",
+        "device_class": SensorDeviceClass.WEIGHT,
+        "icon": "mdi:chart-line",
+    },
+    "weight_avg_30d": {
+        "unit": "kg",
+        "device_class": SensorDeviceClass.WEIGHT,
+        "icon": "mdi:chart-line",
+    },
+    "weight_change_rate": {
+        "unit": "kg/week",
+        "device_class": None,
+        "icon": "mdi:trending-up",
+    },
+    "weight_smoothed": {
+        "unit": "kg",
+        "device_class": SensorDeviceClass.WEIGHT,
+        "icon": "mdi:chart-bell-curve-cumulative",
+    },
+    "body_fat_trend": {
+        "unit": "%/week",
+        "device_class": None,
+        "icon": "mdi:trending-up",
+    },
+}
+
+# Optional per-scale diagnostic sensors fed by the client's request metrics
+DIAGNOSTIC_SENSOR_TYPES = {
+    "api_requests": {
+        "unit": None,
+        "device_class": None,
+        "icon": "mdi:swap-vertical",
+    },
+    "api_errors": {
+        "unit": None,
+        "device_class": None,
+        "icon": "mdi:alert-circle-outline",
+    },
+    "api_latency": {
+        "unit": "ms",
+        "device_class": SensorDeviceClass.DURATION,
+        "icon": "mdi:timer-outline",
+    },
+    "analysis_cache_hit_ratio": {
+        "unit": "%",
+        "device_class": None,
+        "icon": "mdi:cached",
+    },
+    "poll_duration": {
+        "unit": "s",
+        "device_class": SensorDeviceClass.DURATION,
+        "icon": "mdi:timer-sand",
+    },
+}
@@ -2,13 +2,38 @@
 from __future__ import annotations
 
 import logging
+import time
 from datetime import timedelta
+from typing import Any
 
-from homeassistant.core import HomeAssistant
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.event import async_call_later
+from homeassistant.helpers.storage import Store
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
+from homeassistant.util import dt as dt_util
 
-from .api import TuyaSmartScaleAPI
-from .const import DOMAIN, UPDATE_INTERVAL
+from .api import AsyncTuyaSmartScaleAPI
+from .const import (
+    DEFAULT_MAX_SCAN_INTERVAL,
+    DOMAIN,
+    ERROR_RETRY_INTERVAL,
+    LOCAL_USER_MATCH_TOLERANCE,
+    PUSH_POLL_INTERVAL,
+    PUSH_REFRESH_DELAY,
+    PUSH_RETRY_DELAY,
+    STORAGE_SAVE_DELAY,
+    STORAGE_VERSION,
+    UPDATE_INTERVAL,
+    USER_RECONCILE_INTERVAL,
+)
+from .exceptions import TuyaRateLimitError
+from .local import TuyaLocalDevice, dps_to_record
+from .poller import ProjectPoller
+from .push import TuyaMessageListener
+from .scheduler import AdaptivePollScheduler
+from .snapshot import normalise_record
+from .timeseries import MeasurementStore
+from .trends import TrendTracker
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -16,7 +41,13 @@ _LOGGER = logging.getLogger(__name__)
 class IntelarScaleDataCoordinator(DataUpdateCoordinator):
     """Manage fetching data from the Tuya Smart Scale API."""
 
-    def __init__(self, hass: HomeAssistant, api_client: TuyaSmartScaleAPI, update_seconds: int | None = None) -> None:
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        api_client: AsyncTuyaSmartScaleAPI,
+        update_seconds: int | None = None,
+        max_update_seconds: int | None = None,
+    ) -> None:
         super().__init__(
             hass,
             _LOGGER,
@@ -24,8 +55,59 @@ class IntelarScaleDataCoordinator(DataUpdateCoordinator):
             update_interval=timedelta(seconds=update_seconds or UPDATE_INTERVAL),
         )
         self.api = api_client
-        self.birthdate = api_client.birthdate
+        self.scheduler = AdaptivePollScheduler(
+            base_interval=update_seconds or UPDATE_INTERVAL,
+            max_interval=max_update_seconds or DEFAULT_MAX_SCAN_INTERVAL,
+        )
         self.data: dict[str, dict] = {}
+        # Per-user {sensor_type: value}, rebuilt once per refresh for O(1) sensor reads.
+        self.snapshots: dict[str, dict[str, Any]] = {}
+        # (user_id, sensor_type) pairs whose value changed in the last refresh.
+        self.changed: set[tuple[str, str]] = set()
+        self.suppressed_writes = 0
+        self._store: Store = Store(hass, STORAGE_VERSION, f"{DOMAIN}.{api_client.device_id}")
+        # Every measurement seen, per user, for local history queries.
+        self.timeseries = MeasurementStore(hass, api_client.device_id)
+        self.trends = TrendTracker(self.timeseries)
+        # Message service subscription (push mode) and a pending push-triggered refresh.
+        self.push: TuyaMessageListener | None = None
+        self.push_events = 0
+        self._push_pending = False
+        self._unsub_push_refresh: CALLBACK_TYPE | None = None
+        # LAN transport and its cloud-provided {"local_key", "dps"} config.
+        self.local: TuyaLocalDevice | None = None
+        self._local_config: dict[str, Any] = {}
+        # Project-level poller that runs this scale's polls when batched.
+        self.poller: ProjectPoller | None = None
+        # Seconds the last history/analysis poll took, for diagnostics.
+        self.poll_duration: float | None = None
+        # Whether the last refresh kept old data because the API was throttled.
+        self.throttled = False
+        # Re-check the restored records' reports against the current profiles.
+        self._reanalyse = False
+        # Monotonic time of the last full history scan; None until one ran.
+        self._last_full_scan: float | None = None
+
+    @callback
+    def _schedule_refresh(self) -> None:
+        if self.poller is None:
+            super()._schedule_refresh()
+            return
+        # The project poller owns the timer; tell it when this scale is next due.
+        self._async_unsub_refresh()
+        self.poller.async_schedule(self)
+
+    async def async_shutdown(self) -> None:
+        """Cancel the client's background reconciliations along with the refresh timer."""
+
+        self.api.cancel_background_tasks()
+        await super().async_shutdown()
+
+    @callback
+    def async_schedule_poll(self) -> None:
+        """(Re)schedule the next poll, through the project poller when batched."""
+
+        self._schedule_refresh()
 
     @property
     def device_ids(self) -> list[str]:
@@ -33,8 +115,297 @@ class IntelarScaleDataCoordinator(DataUpdateCoordinator):
             return []
         return list(self.data.keys())
 
+    async def async_load(self) -> None:
+        """Restore the high-water mark, caches and last known records from storage.
+
+        The restored records rebuild the per-user snapshots, so sensors can be
+        created and show their last values before the first cloud refresh.
+        """
+
+        await self.timeseries.async_load()
+        stored = await self._store.async_load()
+        if not stored:
+            return
+        self.api.high_water_mark = int(stored.get("high_water_mark") or 0)
+        self.api.analysis_cache.load(stored.get("analysis_cache") or {})
+        self.scheduler.load(stored.get("scheduler") or {})
+        self._local_config = stored.get("local") or {}
+        self.data = stored.get("users") or {}
+        self._reanalyse = bool(self.data)
+        self.trends.update(self.data)
+        self._build_snapshots(self.data)
+
+    def _build_snapshots(self, data: dict[str, dict]) -> None:
+        snapshots = {
+            user_id: {
+                **normalise_record(record, self.api.profile_for(user_id).age()),
+                **self.trends.values(user_id),
+            }
+            for user_id, record in data.items()
+        }
+        self.changed = {
+            (user_id, entity_type)
+            for user_id, snapshot in snapshots.items()
+            for entity_type, value in snapshot.items()
+            if entity_type not in self.snapshots.get(user_id, {})
+            or self.snapshots[user_id][entity_type] != value
+        }
+        self.snapshots = snapshots
+
+    def diagnostic_values(self) -> dict[str, Any]:
+        """Return the values of the optional diagnostic sensors."""
+
+        metrics = self.api.metrics
+        latency = metrics.latency_mean
+        hit_ratio = metrics.cache_hit_ratio
+        return {
+            "api_requests": metrics.requests,
+            "api_errors": metrics.errors,
+            "api_latency": round(latency * 1000, 1) if latency is not None else None,
+            "analysis_cache_hit_ratio": round(hit_ratio * 100, 1) if hit_ratio is not None else None,
+            "poll_duration": round(self.poll_duration, 3) if self.poll_duration is not None else None,
+        }
+
+    def value_changed(self, user_id: str, entity_type: str) -> bool:
+        """Return True if the sensor's value changed in the last refresh."""
+
+        return (user_id, entity_type) in self.changed
+
+    @callback
+    def async_enable_push(self, project: Any) -> CALLBACK_TYPE:
+        """Refresh on pushed device events from ``project``'s message subscription.
+
+        While the subscription is connected, regular polling only runs every
+        ``PUSH_POLL_INTERVAL`` seconds as a safety net.
+        """
+
+        unsubscribe = project.async_subscribe_push(self.api.device_id, self._async_handle_push)
+        self.push = project.push
+
+        @callback
+        def _disable() -> None:
+            unsubscribe()
+            self.push = None
+            if self._unsub_push_refresh is not None:
+                self._unsub_push_refresh()
+                self._unsub_push_refresh = None
+
+        return _disable
+
+    @callback
+    def _async_handle_push(self, event: dict[str, Any]) -> None:
+        if not event.get("status"):
+            return  # online/offline and other non-report events
+        self.push_events += 1
+        self._push_pending = True
+        _LOGGER.debug("Push event for %s: %s", self.api.device_id, event.get("status"))
+        if self._unsub_push_refresh is None:
+            # Give the cloud a moment to make the record visible in its history API.
+            self._unsub_push_refresh = async_call_later(
+                self.hass, PUSH_REFRESH_DELAY, self._async_push_refresh
+            )
+
+    async def _async_push_refresh(self, _now: Any) -> None:
+        self._unsub_push_refresh = None
+        await self.async_request_refresh()
+
+    @callback
+    def async_enable_local(self, host: str) -> CALLBACK_TYPE:
+        """Read weigh-ins from the scale over the LAN in the background; return a disabler.
+
+        The local key and DP map are fetched from the cloud once and kept in
+        storage. Local weigh-ins update the sensors immediately; the cloud
+        history still feeds the measurement store on the next poll.
+        """
+
+        task = self.hass.async_create_background_task(
+            self._async_run_local(host), f"{DOMAIN} local {host}"
+        )
+
+        @callback
+        def _disable() -> None:
+            task.cancel()
+            self.local = None
+
+        return _disable
+
+    async def _async_run_local(self, host: str) -> None:
+        if not self._local_config.get("local_key"):
+            try:
+                self._local_config = await self.api.get_local_config()
+            except Exception as err:  # pylint: disable=broad-except
+                _LOGGER.warning("Could not fetch the local key for %s: %s", self.api.device_id, err)
+                return
+            if not self._local_config.get("local_key"):
+                _LOGGER.warning("Tuya returned no local key for %s", self.api.device_id)
+                return
+            self._store.async_delay_save(self._data_to_store, STORAGE_SAVE_DELAY)
+
+        self.local = TuyaLocalDevice(host, self.api.device_id, self._local_config["local_key"])
+        await self.local.run(self._async_handle_local_dps)
+
+    @callback
+    def _async_handle_local_dps(self, dps: dict[str, Any], reported_at: int | None) -> None:
+        record = dps_to_record(
+            self.api.device_id, dps, self._local_config.get("dps") or {}, reported_at
+        )
+        if record is None:
+            return
+        user_id = record.get("user_id") or self._match_user(float(record["wegith"]))
+        if user_id is None or user_id not in (self.data or {}):
+            _LOGGER.debug("Local weigh-in of %s kg matches no known user", record["wegith"])
+            return
+        record["user_id"] = user_id
+        record["nickname"] = self.data[user_id].get("nickname")
+        self.hass.async_create_task(self._async_apply_local_record(record))
+
+    def _match_user(self, weight: float) -> str | None:
+        """Attribute a weigh-in to the user whose last weight is closest, like the app."""
+
+        best: tuple[float, str] | None = None
+        for user_id, snapshot in self.snapshots.items():
+            last_weight = snapshot.get("weight")
+            if isinstance(last_weight, float):
+                distance = abs(last_weight - weight)
+                if distance <= LOCAL_USER_MATCH_TOLERANCE and (best is None or distance < best[0]):
+                    best = (distance, user_id)
+        return best[1] if best else None
+
+    async def _async_apply_local_record(self, record: dict[str, Any]) -> None:
+        # Not every scale reports the height over the LAN; without it the
+        # weigh-in could not be analysed, so take it from the user's last record.
+        previous = (self.data or {}).get(record["user_id"]) or {}
+        if not float(record.get("height") or 0) and previous.get("height"):
+            record["height"] = previous["height"]
+        await self.api.analyse_records([record])
+        data = self._merge_new_data({record["user_id"]: record})
+        self._build_snapshots(data)
+        self.async_set_updated_data(data)
+
+    def _merge_new_data(self, new_data: dict[str, dict]) -> dict[str, dict]:
+        # Incremental polls only return users with new measurements; keep the rest.
+        data = dict(self.data or {})
+        for user_id, record in new_data.items():
+            previous = data.get(user_id) or {}
+            # Keep a report only for the same measurement; a new weight or
+            # resistance without its own report shows as unknown, not stale.
+            if (
+                "analysis_report" not in record
+                and "analysis_report" in previous
+                and _same_measurement(record, previous)
+            ):
+                record["analysis_report"] = previous["analysis_report"]
+            data[user_id] = record
+        return data
+
+    async def _async_remove_user(self, user_id: str) -> None:
+        """Drop the stored measurements of a user who no longer uses the scale."""
+
+        _LOGGER.debug("Scale user %s of %s is gone", user_id, self.api.device_id)
+        self.trends.remove(user_id)
+        await self.timeseries.async_remove_user(user_id)
+
+    def _next_interval(self, new_data: dict, new_activity: bool) -> float:
+        interval = self.scheduler.next_interval(dt_util.utcnow(), new_activity)
+        if self.push is None or not self.push.connected.is_set():
+            return interval
+        if self._push_pending and not new_data:
+            # The pushed weigh-in was not in the history yet; look again shortly.
+            self._push_pending = False
+            return PUSH_RETRY_DELAY
+        self._push_pending = False
+        return PUSH_POLL_INTERVAL
+
+    def _data_to_store(self) -> dict[str, Any]:
+        return {
+            "high_water_mark": self.api.high_water_mark,
+            "users": self.data,
+            "analysis_cache": self.api.analysis_cache.as_dict(),
+            "scheduler": self.scheduler.as_dict(),
+            "local": self._local_config,
+        }
+
     async def _async_update_data(self) -> dict:
+        initial_sync = not self.api.high_water_mark
+        previous_mark = self.api.high_water_mark
+        # Incremental polls never see a user disappear, so the user list is
+        # checked against the whole history at startup and every few hours.
+        full_scan = not initial_sync and (
+            self._last_full_scan is None
+            or time.monotonic() - self._last_full_scan >= USER_RECONCILE_INTERVAL
+        )
+        self.changed = set()
+        self.throttled = False
+        start = time.monotonic()
         try:
-            return await self.hass.async_add_executor_job(self.api.get_latest_data)
+            new_data = await self.api.get_latest_data(list(self.data or {}), full_scan)
+        except TuyaRateLimitError as err:
+            # Poll again once the circuit breaker closes rather than on the
+            # regular schedule, and keep showing the last known measurements.
+            self.update_interval = timedelta(seconds=max(err.retry_after, ERROR_RETRY_INTERVAL))
+            if self.data:
+                _LOGGER.debug("Tuya API throttled, keeping last data: %s", err)
+                self.throttled = True
+                return self.data
+            raise UpdateFailed(f"Tuya API is throttling requests: {err}") from err
         except Exception as err:  # pylint: disable=broad-except
-            raise UpdateFailed(f"Error communicating with Tuya API: {err}") from err
+            self.update_interval = timedelta(
+                seconds=min(ERROR_RETRY_INTERVAL, self.scheduler.base_interval)
+            )
+            raise UpdateFailed(
+                f"Error communicating with Tuya API ({type(err).__name__}): {err}"
+            ) from err
+        finally:
+            self.poll_duration = time.monotonic() - start
+
+        if initial_sync or full_scan:
+            self._last_full_scan = time.monotonic()
+        await self.timeseries.async_add_records(self.api.new_records)
+
+        if self._reanalyse:
+            # A profile may have changed since the snapshot was stored. Reports
+            # cached under the current profiles are reused without requests.
+            self._reanalyse = False
+            await self.api.analyse_records(
+                record for user_id, record in self.data.items() if user_id not in new_data
+            )
+
+        # The first sync lists every current user; later polls only add users,
+        # except that a full scan drops those it proved are gone.
+        if initial_sync:
+            data = new_data
+        else:
+            data = self._merge_new_data(new_data)
+            for user_id in self.api.gone_users:
+                data.pop(user_id, None)
+        for user_id in (self.data or {}).keys() - data.keys():
+            await self._async_remove_user(user_id)
+
+        # A full scan also returns old records; only newer ones are weigh-ins.
+        fresh = {
+            user_id: record
+            for user_id, record in new_data.items()
+            if int(record.get("create_time") or 0) > previous_mark
+        }
+        # The first sync returns old records, which is not fresh weigh-in activity.
+        new_activity = bool(fresh) and not initial_sync
+        self.scheduler.record_measurements(
+            int(record.get("create_time") or 0) for record in fresh.values()
+        )
+        self.update_interval = timedelta(seconds=self._next_interval(fresh, new_activity))
+
+        self.trends.update(data)
+        self._build_snapshots(data)
+        _LOGGER.debug(
+            "Refresh changed %d sensor values (%d state writes suppressed so far)",
+            len(self.changed),
+            self.suppressed_writes,
+        )
+        self._store.async_delay_save(self._data_to_store, STORAGE_SAVE_DELAY)
+        return data
+
+
+def _same_measurement(record: dict[str, Any], other: dict[str, Any]) -> bool:
+    """Return True if both records carry the same weight and body resistance."""
+
+    return all(str(record.get(field)) == str(other.get(field)) for field in ("wegith", "body_r"))
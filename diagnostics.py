@@ -0,0 +1,52 @@
+"""Diagnostics download for Intelar Smart Scale config entries."""
+from __future__ import annotations
+
+import time
+from typing import Any
+
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+
+from .const import DIAGNOSTICS_REDACT, DOMAIN
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> dict[str, Any]:
+    """Return request metrics and polling state for a config entry."""
+
+    coordinator = hass.data[DOMAIN][entry.entry_id]
+    api = coordinator.api
+    return {
+        "entry": {
+            "data": async_redact_data(dict(entry.data), DIAGNOSTICS_REDACT),
+            "options": async_redact_data(dict(entry.options), DIAGNOSTICS_REDACT),
+        },
+        "coordinator": {
+            "last_update_success": coordinator.last_update_success,
+            "last_exception": repr(coordinator.last_exception) if coordinator.last_exception else None,
+            "update_interval": (
+                coordinator.update_interval.total_seconds() if coordinator.update_interval else None
+            ),
+            "poll_duration": coordinator.poll_duration,
+            "users": len(coordinator.data or {}),
+            "suppressed_writes": coordinator.suppressed_writes,
+            "push_connected": coordinator.push is not None and coordinator.push.connected.is_set(),
+            "push_events": coordinator.push_events,
+            "local_connected": coordinator.local is not None and coordinator.local.connected.is_set(),
+            "batched": coordinator.poller is not None,
+        },
+        "client": {
+            "analysis_mode": api.analysis_mode,
+            "high_water_mark": api.high_water_mark,
+            "analysis_cache_size": len(api.analysis_cache),
+            "token_expires_in": round(api.token_expires - time.time(), 1),
+            "reconciled": api.reconciled,
+            "mean_deviations": api.mean_deviations(),
+        },
+        "metrics": api.metrics.as_dict(),
+        # Summed over every scale of the same Tuya cloud project.
+        "project_metrics": api.metrics.parent.as_dict() if api.metrics.parent else None,
+        "snapshots": async_redact_data(coordinator.snapshots, DIAGNOSTICS_REDACT),
+    }
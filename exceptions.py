@@ -0,0 +1,30 @@
+"""Exceptions raised by the Tuya Smart Scale API clients."""
+from __future__ import annotations
+
+
+class TuyaApiError(Exception):
+    """A Tuya OpenAPI request failed."""
+
+    def __init__(self, message: str, code: int | None = None) -> None:
+        super().__init__(message)
+        self.code = code
+
+
+class TuyaTransientError(TuyaApiError):
+    """A request failed in a way that is worth retrying (5xx, gateway errors)."""
+
+
+class TuyaTokenInvalidError(TuyaApiError):
+    """The access token was rejected; a new one must be requested."""
+
+
+class TuyaRateLimitError(TuyaApiError):
+    """The cloud is throttling this project."""
+
+    def __init__(self, message: str, code: int | None = None, retry_after: float = 0.0) -> None:
+        super().__init__(message, code)
+        self.retry_after = retry_after
+
+
+class TuyaCircuitOpenError(TuyaRateLimitError):
+    """Requests are paused because the cloud recently throttled this project."""
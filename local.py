@@ -0,0 +1,212 @@
+"""LAN transport for the scale using the Tuya local protocol (version 3.3)."""
+from __future__ import annotations
+
+import asyncio
+import binascii
+import json
+import logging
+import struct
+import time
+from typing import Any, Callable, Dict, Tuple
+
+from cryptography.hazmat.primitives import padding
+from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
+
+from .const import LOCAL_DP_FIELDS, LOCAL_HEARTBEAT, LOCAL_PORT, LOCAL_TIMEOUT
+from .ratelimit import backoff_delay
+
+_LOGGER = logging.getLogger(__name__)
+
+PREFIX = 0x000055AA
+SUFFIX = 0x0000AA55
+HEADER = struct.Struct(">4I")  # prefix, sequence number, command, length
+FOOTER = struct.Struct(">2I")  # crc32, suffix
+
+STATUS = 0x08
+HEART_BEAT = 0x09
+DP_QUERY = 0x0A
+
+VERSION = b"3.3"
+# 3.3 prefixes encrypted payloads with the version and 12 reserved bytes,
+# except for queries and heartbeats.
+VERSION_HEADER = VERSION + b"\0" * 12
+_NO_VERSION_HEADER = {DP_QUERY, HEART_BEAT}
+
+Message = Tuple[int, int, Dict[str, Any] | None]  # sequence number, command, payload
+
+
+class TuyaLocalCipher:
+    """AES-128-ECB with PKCS#7 padding, keyed by the device's local key."""
+
+    def __init__(self, local_key: str) -> None:
+        self._algorithm = algorithms.AES(local_key.encode("utf-8"))
+
+    def encrypt(self, data: bytes) -> bytes:
+        padder = padding.PKCS7(128).padder()
+        encryptor = Cipher(self._algorithm, modes.ECB()).encryptor()  # nosec - Tuya protocol
+        return encryptor.update(padder.update(data) + padder.finalize()) + encryptor.finalize()
+
+    def decrypt(self, data: bytes) -> bytes:
+        decryptor = Cipher(self._algorithm, modes.ECB()).decryptor()  # nosec - Tuya protocol
+        unpadder = padding.PKCS7(128).unpadder()
+        return unpadder.update(decryptor.update(data) + decryptor.finalize()) + unpadder.finalize()
+
+
+def pack_message(
+    cipher: TuyaLocalCipher,
+    seqno: int,
+    command: int,
+    payload: Dict[str, Any] | None,
+    retcode: int | None = None,
+) -> bytes:
+    """Return one framed, encrypted protocol 3.3 message."""
+
+    body = cipher.encrypt(json.dumps(payload or {}, separators=(",", ":")).encode("utf-8"))
+    if command not in _NO_VERSION_HEADER:
+        body = VERSION_HEADER + body
+    if retcode is not None:
+        body = struct.pack(">I", retcode) + body
+    header = HEADER.pack(PREFIX, seqno, command, len(body) + FOOTER.size)
+    crc = binascii.crc32(header + body) & 0xFFFFFFFF
+    return header + body + FOOTER.pack(crc, SUFFIX)
+
+
+async def read_message(reader: asyncio.StreamReader, cipher: TuyaLocalCipher) -> Message:
+    """Read and decrypt one framed message; the payload is None when empty."""
+
+    header = await reader.readexactly(HEADER.size)
+    prefix, seqno, command, length = HEADER.unpack(header)
+    if prefix != PREFIX or not FOOTER.size <= length <= 0xFFFF:
+        raise ValueError(f"Invalid Tuya local frame header {header.hex()}")
+    rest = await reader.readexactly(length)
+    body = rest[: -FOOTER.size]
+    crc, suffix = FOOTER.unpack(rest[-FOOTER.size :])
+    if suffix != SUFFIX or crc != binascii.crc32(header + body) & 0xFFFFFFFF:
+        raise ValueError("Invalid Tuya local frame checksum")
+
+    # Messages from the device start with a 4-byte return code.
+    if len(body) >= 4 and body[0] == 0 and body[1] == 0 and body[2] == 0:
+        body = body[4:]
+    if body.startswith(VERSION):
+        body = body[len(VERSION_HEADER) :]
+    if not body:
+        return seqno, command, None
+    return seqno, command, json.loads(cipher.decrypt(body))
+
+
+class TuyaLocalDevice:
+    """Persistent LAN connection to one Tuya device.
+
+    ``run`` keeps the connection open with heartbeats and passes the ``dps``
+    of every status report to the callback. The DP query sent on connect only
+    wakes the device up; its reply holds the previous measurement and is not
+    treated as a new one. It reconnects with jittered exponential back-off.
+    """
+
+    def __init__(self, host: str, device_id: str, local_key: str, port: int = LOCAL_PORT) -> None:
+        self.host = host
+        self.port = port
+        self.device_id = device_id
+        self.cipher = TuyaLocalCipher(local_key)
+        self.connected = asyncio.Event()
+        self.reports = 0
+        self._seqno = 0
+        self._writer: asyncio.StreamWriter | None = None
+
+    def _send(self, command: int, payload: Dict[str, Any]) -> None:
+        assert self._writer is not None
+        self._seqno += 1
+        self._writer.write(pack_message(self.cipher, self._seqno, command, payload))
+
+    def _query_payload(self) -> Dict[str, Any]:
+        return {
+            "gwId": self.device_id,
+            "devId": self.device_id,
+            "uid": self.device_id,
+            "t": str(int(time.time())),
+        }
+
+    async def run(self, on_dps: Callable[[Dict[str, Any], int | None], None]) -> None:
+        """Deliver status reports until cancelled."""
+
+        attempt = 0
+        while True:
+            try:
+                reader, self._writer = await asyncio.wait_for(
+                    asyncio.open_connection(self.host, self.port), LOCAL_TIMEOUT
+                )
+                try:
+                    self._send(DP_QUERY, self._query_payload())
+                    self.connected.set()
+                    attempt = 0
+                    await self._read_loop(reader, on_dps)
+                finally:
+                    self.connected.clear()
+                    self._writer.close()
+                    self._writer = None
+            except asyncio.CancelledError:
+                raise
+            except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError, ValueError) as err:
+                _LOGGER.debug("Local connection to %s failed: %s", self.host, err)
+            attempt += 1
+            await asyncio.sleep(max(backoff_delay(attempt), 1.0))
+
+    async def _read_loop(
+        self,
+        reader: asyncio.StreamReader,
+        on_dps: Callable[[Dict[str, Any], int | None], None],
+    ) -> None:
+        missed_heartbeats = 0
+        while True:
+            try:
+                _, command, payload = await asyncio.wait_for(
+                    read_message(reader, self.cipher), LOCAL_HEARTBEAT
+                )
+            except asyncio.TimeoutError:
+                # Quiet line: ping, and give up on the connection if pings go unanswered.
+                missed_heartbeats += 1
+                if missed_heartbeats > 2:
+                    raise
+                self._send(HEART_BEAT, {"gwId": self.device_id, "devId": self.device_id})
+                continue
+            missed_heartbeats = 0
+            if command == STATUS and payload and payload.get("dps"):
+                self.reports += 1
+                on_dps(payload["dps"], payload.get("t"))
+
+
+def dps_to_record(
+    device_id: str, dps: Dict[str, Any], dp_map: Dict[str, Dict[str, Any]], reported_at: int | None
+) -> Dict[str, Any] | None:
+    """Build a history-style record from a DP report, or None without a weight.
+
+    ``dp_map`` maps DP ids to ``{"code", "scale"}`` from the device's thing
+    model; numeric values are divided by ``10 ** scale`` and stored as strings
+    like the cloud history does.
+    """
+
+    record: dict[str, Any] = {}
+    for dp_id, value in dps.items():
+        spec = dp_map.get(str(dp_id))
+        if spec is None:
+            continue
+        field = next(
+            (name for name, codes in LOCAL_DP_FIELDS.items() if spec.get("code") in codes), None
+        )
+        if field is None:
+            continue
+        if spec.get("scale") and isinstance(value, (int, float)) and not isinstance(value, bool):
+            value = value / 10 ** spec["scale"]
+        record[field] = str(value)
+    if not record.get("wegith"):
+        return None
+    create_time = int(reported_at) * 1000 if reported_at else int(time.time() * 1000)
+    record.update(
+        {
+            "id": f"local-{device_id}-{create_time}",
+            "device_id": device_id,
+            "create_time": create_time,
+            "source": "local",
+        }
+    )
+    return record
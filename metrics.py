@@ -0,0 +1,161 @@
+"""Request metrics and stage timings for the Tuya client."""
+from __future__ import annotations
+
+import time
+from bisect import bisect_left
+from typing import Any, Dict
+
+from .const import METRICS_LATENCY_BUCKETS
+
+
+def endpoint_name(path: str) -> str:
+    """Return the metrics bucket for an OpenAPI path."""
+
+    if path.startswith("/v1.0/token"):
+        return "token"
+    if path.endswith("/datas/history"):
+        return "datas/history"
+    if path.endswith("/analysis-reports"):
+        return "analysis-reports"
+    return "devices"
+
+
+class EndpointStats:
+    """Counters and a latency histogram for one endpoint."""
+
+    __slots__ = ("requests", "errors", "retries", "bytes", "latency_sum", "latency_max", "buckets")
+
+    def __init__(self) -> None:
+        self.requests = 0
+        self.errors = 0
+        self.retries = 0
+        self.bytes = 0
+        self.latency_sum = 0.0
+        self.latency_max = 0.0
+        # One count per METRICS_LATENCY_BUCKETS upper bound, plus one for slower requests.
+        self.buckets = [0] * (len(METRICS_LATENCY_BUCKETS) + 1)
+
+    def observe(self, latency: float, size: int) -> None:
+        self.requests += 1
+        self.bytes += size
+        self.latency_sum += latency
+        self.latency_max = max(self.latency_max, latency)
+        self.buckets[bisect_left(METRICS_LATENCY_BUCKETS, latency)] += 1
+
+    def as_dict(self) -> Dict[str, Any]:
+        bounds = [f"le_{bound:g}s" for bound in METRICS_LATENCY_BUCKETS] + ["slower"]
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "retries": self.retries,
+            "bytes": self.bytes,
+            "latency_mean": round(self.latency_sum / self.requests, 4) if self.requests else None,
+            "latency_max": round(self.latency_max, 4),
+            "latency_histogram": dict(zip(bounds, self.buckets)),
+        }
+
+
+class ApiMetrics:
+    """Per-endpoint request metrics, cache counters and stage timings.
+
+    Every scale client counts its own requests in one instance whose
+    ``parent`` is the instance of its Tuya project, so each update is also
+    counted project-wide. Counting is a few integer updates per request; stage
+    timings are only recorded when a client's ``stage_hook`` points at
+    :meth:`record_stage`.
+    """
+
+    def __init__(self, parent: ApiMetrics | None = None) -> None:
+        self.parent = parent
+        self.endpoints: dict[str, EndpointStats] = {}
+        self.token_refreshes = 0
+        self.cache_hits = 0
+        self.cache_misses = 0
+        # stage -> {"count", "total", "last"} in seconds
+        self.stages: dict[str, dict[str, float]] = {}
+        self.last_error: dict[str, Any] | None = None
+
+    def endpoint(self, path: str) -> EndpointStats:
+        name = endpoint_name(path)
+        if (stats := self.endpoints.get(name)) is None:
+            stats = self.endpoints[name] = EndpointStats()
+        return stats
+
+    def record_request(self, path: str, latency: float, size: int) -> None:
+        self.endpoint(path).observe(latency, size)
+        if self.parent is not None:
+            self.parent.record_request(path, latency, size)
+
+    def record_retry(self, path: str) -> None:
+        self.endpoint(path).retries += 1
+        if self.parent is not None:
+            self.parent.record_retry(path)
+
+    def record_token_refresh(self) -> None:
+        self.token_refreshes += 1
+        if self.parent is not None:
+            self.parent.record_token_refresh()
+
+    def record_cache_lookup(self, hit: bool) -> None:
+        if hit:
+            self.cache_hits += 1
+        else:
+            self.cache_misses += 1
+        if self.parent is not None:
+            self.parent.record_cache_lookup(hit)
+
+    def record_error(self, method: str, path: str, err: BaseException) -> None:
+        self.endpoint(path).errors += 1
+        self.last_error = {
+            "endpoint": endpoint_name(path),
+            "method": method,
+            "type": type(err).__name__,
+            "message": str(err),
+            "time": time.time(),
+        }
+        if self.parent is not None:
+            self.parent.record_error(method, path, err)
+
+    def record_stage(self, stage: str, seconds: float) -> None:
+        stats = self.stages.setdefault(stage, {"count": 0, "total": 0.0, "last": 0.0})
+        stats["count"] += 1
+        stats["total"] += seconds
+        stats["last"] = seconds
+        if self.parent is not None:
+            self.parent.record_stage(stage, seconds)
+
+    @property
+    def requests(self) -> int:
+        return sum(stats.requests for stats in self.endpoints.values())
+
+    @property
+    def errors(self) -> int:
+        return sum(stats.errors for stats in self.endpoints.values())
+
+    @property
+    def latency_mean(self) -> float | None:
+        requests = self.requests
+        if not requests:
+            return None
+        return sum(stats.latency_sum for stats in self.endpoints.values()) / requests
+
+    @property
+    def cache_hit_ratio(self) -> float | None:
+        lookups = self.cache_hits + self.cache_misses
+        return self.cache_hits / lookups if lookups else None
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "endpoints": {name: stats.as_dict() for name, stats in self.endpoints.items()},
+            "token_refreshes": self.token_refreshes,
+            "analysis_cache": {
+                "hits": self.cache_hits,
+                "misses": self.cache_misses,
+                "hit_ratio": self.cache_hit_ratio,
+            },
+            "stages": {
+                stage: {key: round(value, 4) for key, value in stats.items()}
+                for stage, stats in self.stages.items()
+            },
+            "last_error": self.last_error,
+        }
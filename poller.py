@@ -0,0 +1,182 @@
+"""Project-level polling of every batched scale of a Tuya cloud project."""
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import time
+from datetime import datetime
+from typing import TYPE_CHECKING
+
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.event import async_call_later
+
+from .api import AsyncTuyaSmartScaleAPI
+from .const import BATCH_DUE_SLACK, BATCH_STATUS_MAX_DEVICES, UPDATE_INTERVAL
+
+if TYPE_CHECKING:
+    from .coordinator import IntelarScaleDataCoordinator
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class ProjectPoller:
+    """Poll all scales of a project from one timer aligned to the wall clock.
+
+    Every tick reads the status of all scales with one batched request per
+    ``BATCH_STATUS_MAX_DEVICES`` devices. A scale runs its history poll only
+    when its reported status changed since the previous tick (and once more on
+    the next tick if that poll found nothing new), or when its own poll is
+    due. While a scale is idle its own polls only run every
+    ``max_scan_interval`` as a safety net; intervals shorter than a tick (the
+    fast interval after a weigh-in, the re-check of a pushed one) and retry
+    intervals after errors or throttling are kept. Scales whose config entry has polling
+    disabled are only refreshed on request. Due polls are brought forward by
+    up to ``BATCH_DUE_SLACK`` of a tick so scales share wakeups. The per-scale
+    coordinators no longer run timers of their own.
+    """
+
+    def __init__(self, hass: HomeAssistant, client: AsyncTuyaSmartScaleAPI) -> None:
+        self.hass = hass
+        self.client = client
+        self.coordinators: dict[str, IntelarScaleDataCoordinator] = {}
+        self.ticks = 0
+        self.skipped_polls = 0
+        # device_id -> last reported status, and loop time its next own poll is due.
+        self._fingerprints: dict[str, str] = {}
+        self._due: dict[str, float] = {}
+        # Scales whose status changed but whose poll found nothing new yet.
+        self._recheck: set[str] = set()
+        self._unsub_timer: CALLBACK_TYPE | None = None
+        self._ticking = False
+
+    @property
+    def interval(self) -> float:
+        """Seconds between aligned ticks: the shortest scan interval of the scales."""
+
+        return min(
+            (coordinator.scheduler.base_interval for coordinator in self.coordinators.values()),
+            default=UPDATE_INTERVAL,
+        )
+
+    @callback
+    def async_add(self, coordinator: IntelarScaleDataCoordinator) -> CALLBACK_TYPE:
+        """Take over polling for ``coordinator``; return a remover."""
+
+        device_id = coordinator.api.device_id
+        self.coordinators[device_id] = coordinator
+        coordinator.poller = self
+        coordinator.async_schedule_poll()
+
+        @callback
+        def _remove() -> None:
+            if self.coordinators.get(device_id) is coordinator:
+                del self.coordinators[device_id]
+                self._due.pop(device_id, None)
+                self._fingerprints.pop(device_id, None)
+                self._recheck.discard(device_id)
+            coordinator.poller = None
+            if not self.coordinators:
+                self.async_stop()
+
+        return _remove
+
+    @callback
+    def async_schedule(self, coordinator: IntelarScaleDataCoordinator) -> None:
+        """Record when ``coordinator`` next wants to poll, after any refresh of it."""
+
+        device_id = coordinator.api.device_id
+        if _polling_disabled(coordinator):
+            self._due.pop(device_id, None)
+            return
+        interval = coordinator.update_interval
+        seconds = interval.total_seconds() if interval else self.interval
+        idle = coordinator.last_update_success and not coordinator.throttled
+        if idle and seconds >= self.interval:
+            # Status changes reveal new weigh-ins; while the scale is idle its
+            # own polls are only a safety net. Shorter intervals (right after a
+            # weigh-in, or re-checking a pushed one) are kept, and so is the
+            # breaker's cooldown after a throttled poll that kept the last data.
+            seconds = max(seconds, coordinator.scheduler.max_interval)
+        self._due[device_id] = self.hass.loop.time() + seconds
+        if not self._ticking:
+            self._schedule_tick()
+
+    @callback
+    def _schedule_tick(self) -> None:
+        if self._unsub_timer is not None:
+            self._unsub_timer()
+        if not self.coordinators:
+            self._unsub_timer = None
+            return
+        interval = self.interval
+        delay = interval - time.time() % interval
+        if self._due:
+            delay = min(delay, max(min(self._due.values()) - self.hass.loop.time(), 1.0))
+        self._unsub_timer = async_call_later(self.hass, delay, self._async_tick)
+
+    async def _async_tick(self, _now: datetime) -> None:
+        self._unsub_timer = None
+        self._ticking = True
+        try:
+            self.ticks += 1
+            reported = await self._changed_devices()
+            changed = reported | self._recheck
+            cutoff = self.hass.loop.time() + self.interval * BATCH_DUE_SLACK
+            poll = [
+                coordinator
+                for device_id, coordinator in self.coordinators.items()
+                if not _polling_disabled(coordinator)
+                and (device_id in changed or self._due.get(device_id, 0) <= cutoff)
+            ]
+            self.skipped_polls += len(self.coordinators) - len(poll)
+            _LOGGER.debug(
+                "Project poll of %d scales: %d changed, %d polled",
+                len(self.coordinators),
+                len(changed),
+                len(poll),
+            )
+            await asyncio.gather(*(coordinator.async_refresh() for coordinator in poll))
+            # A report can reach the history API after the status; look once more.
+            self._recheck = {
+                device_id
+                for device_id in reported
+                if device_id in self.coordinators and not self.coordinators[device_id].changed
+            }
+        finally:
+            self._ticking = False
+            self._schedule_tick()
+
+    async def _changed_devices(self) -> set[str]:
+        """Return the scales whose reported status differs from the previous tick."""
+
+        device_ids = list(self.coordinators)
+        changed: set[str] = set()
+        for start in range(0, len(device_ids), BATCH_STATUS_MAX_DEVICES):
+            chunk = device_ids[start : start + BATCH_STATUS_MAX_DEVICES]
+            try:
+                statuses = await self.client.get_devices_status(chunk)
+            except Exception as err:  # pylint: disable=broad-except
+                # Fall back to each scale's own schedule for this tick.
+                _LOGGER.debug("Batched status request failed: %s", err)
+                continue
+            for device_id, status in statuses.items():
+                fingerprint = json.dumps(status, sort_keys=True)
+                previous = self._fingerprints.get(device_id)
+                self._fingerprints[device_id] = fingerprint
+                if previous is not None and previous != fingerprint:
+                    changed.add(device_id)
+        return changed
+
+    @callback
+    def async_stop(self) -> None:
+        if self._unsub_timer is not None:
+            self._unsub_timer()
+            self._unsub_timer = None
+
+
+def _polling_disabled(coordinator: IntelarScaleDataCoordinator) -> bool:
+    """Return whether the user turned off polling for the scale's config entry."""
+
+    entry = coordinator.config_entry
+    return bool(entry and entry.pref_disable_polling)
@@ -0,0 +1,70 @@
+"""Per-user body profiles used for analysis requests and the physical age sensor."""
+from __future__ import annotations
+
+import logging
+from datetime import date, datetime
+from typing import Any, Dict, Mapping
+
+from .const import CONF_BIRTHDATE, CONF_HEIGHT, CONF_SEX, DEFAULT_BIRTHDATE, DEFAULT_SEX
+
+_LOGGER = logging.getLogger(__name__)
+
+DEFAULT_AGE = 30
+
+
+class UserProfile:
+    """Birthdate, sex and optional height override for one scale user.
+
+    The birthdate is parsed once and the age is memoised per calendar day, so
+    building analysis keys for every record of a poll costs no date parsing.
+    """
+
+    def __init__(
+        self,
+        birthdate: str = DEFAULT_BIRTHDATE,
+        sex: int = DEFAULT_SEX,
+        height: float | None = None,
+    ) -> None:
+        self.birthdate = birthdate
+        self.sex = int(sex)
+        self.height = float(height) if height else None
+        try:
+            self._birth_date: date | None = datetime.strptime(birthdate, "%Y-%m-%d").date()
+        except (ValueError, TypeError):
+            _LOGGER.warning(
+                "Invalid birthdate format: %s, using default age %d", birthdate, DEFAULT_AGE
+            )
+            self._birth_date = None
+        self._age_on: date | None = None
+        self._age = DEFAULT_AGE
+
+    def age(self) -> int:
+        today = date.today()
+        if today != self._age_on and self._birth_date is not None:
+            self._age = today.year - self._birth_date.year - (
+                (today.month, today.day) < (self._birth_date.month, self._birth_date.day)
+            )
+            self._age_on = today
+        return self._age
+
+    @property
+    def fingerprint(self) -> str:
+        """Identify the profile values an analysis report depends on, apart from the age."""
+
+        return f"{self.birthdate}/{self.sex}/{self.height or ''}"
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {CONF_BIRTHDATE: self.birthdate, CONF_SEX: self.sex, CONF_HEIGHT: self.height}
+
+
+def profiles_from_options(stored: Mapping[str, Mapping[str, Any]] | None) -> Dict[str, UserProfile]:
+    """Build ``{user_id: UserProfile}`` from the ``profiles`` entry option."""
+
+    return {
+        user_id: UserProfile(
+            profile.get(CONF_BIRTHDATE, DEFAULT_BIRTHDATE),
+            profile.get(CONF_SEX, DEFAULT_SEX),
+            profile.get(CONF_HEIGHT),
+        )
+        for user_id, profile in (stored or {}).items()
+    }
@@ -0,0 +1,264 @@
+"""Per-project state shared by all config entries using the same Tuya cloud project."""
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from datetime import datetime
+from typing import TYPE_CHECKING, Any, Callable, Dict
+
+import aiohttp
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import EVENT_HOMEASSISTANT_CLOSE
+from homeassistant.core import CALLBACK_TYPE, Event, HomeAssistant, callback
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
+from homeassistant.helpers.event import async_call_later
+from homeassistant.util import ssl as ssl_util
+
+from .api import AsyncTuyaSmartScaleAPI, TuyaToken
+from .const import (
+    ANALYSIS_CONCURRENCY,
+    ANALYSIS_MODE_CLOUD,
+    CONF_ACCESS_ID,
+    CONF_ACCESS_KEY,
+    CONF_ENDPOINT,
+    CONF_POOL_SIZE,
+    CONF_REGION,
+    DATA_PROJECTS,
+    DEFAULT_BIRTHDATE,
+    DEFAULT_POOL_SIZE,
+    DEFAULT_REGION,
+    DEFAULT_SEX,
+    DOMAIN,
+    TOKEN_REFRESH_LEAD,
+    TOKEN_REFRESH_RETRY,
+)
+from .metrics import ApiMetrics
+from .poller import ProjectPoller
+from .profiles import UserProfile
+from .push import TuyaMessageListener
+from .ratelimit import RateBudget
+
+if TYPE_CHECKING:
+    from .coordinator import IntelarScaleDataCoordinator
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class TuyaProject:
+    """Credentials, token, HTTP session and rate budget for one (access_id, region) pair.
+
+    Every scale client created through the project shares its token, so the
+    token endpoint is hit once per project rather than once per device. They
+    also share one request budget, so throttling pauses the whole project,
+    one analysis pool, so concurrent analysis requests stay bounded, and one
+    set of request metrics. Their requests go through the project's own
+    keep-alive connection pool of ``pool_size`` connections, which is closed
+    when the last entry unloads. The token is renewed in the background ahead of
+    expiry so polls never wait on a token round trip. Entries with push
+    enabled share one message service subscription, and entries with batched
+    polling share one poller.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        access_id: str,
+        access_key: str,
+        region: str,
+        endpoint: str | None = None,
+        pool_size: int = DEFAULT_POOL_SIZE,
+    ) -> None:
+        self.hass = hass
+        self.access_id = access_id
+        self.access_key = access_key
+        self.region = region
+        # OpenAPI endpoint picked by region auto-detection; the region default otherwise.
+        self.endpoint = endpoint
+        self.session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=pool_size, ssl=ssl_util.get_default_context())
+        )
+        self._unsub_close: CALLBACK_TYPE | None = hass.bus.async_listen_once(
+            EVENT_HOMEASSISTANT_CLOSE, self._async_close_session
+        )
+        self.token = TuyaToken()
+        self.budget = RateBudget()
+        self.metrics = ApiMetrics()
+        self.analysis_slots = asyncio.Semaphore(ANALYSIS_CONCURRENCY)
+        self.entry_ids: set[str] = set()
+        # Device-less client used only for background token renewal.
+        self._auth_client = self.create_client("", DEFAULT_BIRTHDATE, DEFAULT_SEX)
+        self._unsub_refresh: CALLBACK_TYPE | None = None
+        self._unsub_token = self.token.add_listener(self._schedule_refresh)
+        # Message service subscription, started by the first entry using push.
+        self.push: TuyaMessageListener | None = None
+        self._push_task: asyncio.Task | None = None
+        # Batched poller, created by the first entry that opts in.
+        self.poller: ProjectPoller | None = None
+
+    @property
+    def key(self) -> tuple[str, str]:
+        return (self.access_id, self.region)
+
+    def create_client(
+        self,
+        device_id: str,
+        birthdate: str,
+        sex: int,
+        analysis_mode: str = ANALYSIS_MODE_CLOUD,
+        profiles: Dict[str, UserProfile] | None = None,
+    ) -> AsyncTuyaSmartScaleAPI:
+        """Return a scale client bound to this project's token and session."""
+
+        client = AsyncTuyaSmartScaleAPI(
+            session=self.session,
+            access_id=self.access_id,
+            access_key=self.access_key,
+            device_id=device_id,
+            region=self.region,
+            birthdate=birthdate,
+            sex=sex,
+            token=self.token,
+            budget=self.budget,
+            analysis_slots=self.analysis_slots,
+            metrics=self.metrics,
+        )
+        if self.endpoint:
+            client.endpoint = self.endpoint
+        client.analysis_mode = analysis_mode
+        client.profiles = profiles or {}
+        return client
+
+    @callback
+    def _schedule_refresh(self, delay: float | None = None) -> None:
+        """(Re)arm the timer that renews the token shortly before it expires.
+
+        Tokens that live shorter than ``TOKEN_REFRESH_LEAD`` are renewed every
+        ``TOKEN_REFRESH_RETRY`` seconds rather than in a tight loop; requests
+        in between renew an expired token themselves.
+        """
+
+        if self._unsub_refresh is not None:
+            self._unsub_refresh()
+        if delay is None:
+            delay = max(self.token.expires - time.time() - TOKEN_REFRESH_LEAD, TOKEN_REFRESH_RETRY)
+        self._unsub_refresh = async_call_later(self.hass, delay, self._async_refresh_token)
+
+    async def _async_refresh_token(self, _now: datetime) -> None:
+        self._unsub_refresh = None
+        try:
+            await self._auth_client.async_refresh_token()
+        except Exception as err:  # pylint: disable=broad-except
+            _LOGGER.warning(
+                "Background token refresh for %s failed, retrying in %ss: %s",
+                self.access_id,
+                TOKEN_REFRESH_RETRY,
+                err,
+            )
+            self._schedule_refresh(TOKEN_REFRESH_RETRY)
+
+    @callback
+    def async_subscribe_push(
+        self, device_id: str, listener: Callable[[Dict[str, Any]], None]
+    ) -> CALLBACK_TYPE:
+        """Route pushed events for ``device_id`` to ``listener``; return an unsubscriber."""
+
+        if self.push is None:
+            # The subscription holds its connection open; keep it out of the pool.
+            self.push = TuyaMessageListener(
+                async_get_clientsession(self.hass), self.access_id, self.access_key, self.region
+            )
+            self._push_task = self.hass.async_create_background_task(
+                self.push.run(), f"{DOMAIN} messages {self.access_id}"
+            )
+        remove = self.push.add_listener(device_id, listener)
+
+        @callback
+        def _unsubscribe() -> None:
+            remove()
+            if self.push is not None and not self.push.has_listeners:
+                self._stop_push()
+
+        return _unsubscribe
+
+    @callback
+    def async_join_poller(self, coordinator: IntelarScaleDataCoordinator) -> CALLBACK_TYPE:
+        """Poll ``coordinator``'s scale with the project's batched poller; return a remover."""
+
+        if self.poller is None:
+            self.poller = ProjectPoller(self.hass, self._auth_client)
+        poller = self.poller
+        remove = poller.async_add(coordinator)
+
+        @callback
+        def _leave() -> None:
+            remove()
+            if self.poller is poller and not poller.coordinators:
+                self.poller = None
+
+        return _leave
+
+    @callback
+    def _stop_push(self) -> None:
+        if self._push_task is not None:
+            self._push_task.cancel()
+            self._push_task = None
+        self.push = None
+
+    @callback
+    def async_shutdown(self) -> None:
+        """Cancel background work once no entry uses the project."""
+
+        self._stop_push()
+        if self.poller is not None:
+            self.poller.async_stop()
+            self.poller = None
+        self._unsub_token()
+        if self._unsub_refresh is not None:
+            self._unsub_refresh()
+            self._unsub_refresh = None
+        if self._unsub_close is not None:
+            self._unsub_close()
+            self._unsub_close = None
+        self.hass.async_create_task(self.session.close())
+
+    async def _async_close_session(self, _event: Event) -> None:
+        self._unsub_close = None
+        await self.session.close()
+
+
+@callback
+def async_get_project(hass: HomeAssistant, entry: ConfigEntry) -> TuyaProject:
+    """Return the shared project for an entry, creating it on first use."""
+
+    projects: dict[tuple[str, str], TuyaProject] = hass.data.setdefault(DOMAIN, {}).setdefault(
+        DATA_PROJECTS, {}
+    )
+    key = (entry.data[CONF_ACCESS_ID], entry.data.get(CONF_REGION, DEFAULT_REGION))
+    if (project := projects.get(key)) is None:
+        project = TuyaProject(
+            hass,
+            key[0],
+            entry.data[CONF_ACCESS_KEY],
+            key[1],
+            entry.data.get(CONF_ENDPOINT),
+            entry.options.get(CONF_POOL_SIZE, DEFAULT_POOL_SIZE),
+        )
+        projects[key] = project
+        _LOGGER.debug("Created shared Tuya project for access_id %s in %s", *key)
+    project.entry_ids.add(entry.entry_id)
+    return project
+
+
+@callback
+def async_release_project(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Drop an entry's reference to its project, removing the project when unused."""
+
+    projects: dict[tuple[str, str], TuyaProject] = hass.data.get(DOMAIN, {}).get(DATA_PROJECTS, {})
+    key = (entry.data[CONF_ACCESS_ID], entry.data.get(CONF_REGION, DEFAULT_REGION))
+    if (project := projects.get(key)) is None:
+        return
+    project.entry_ids.discard(entry.entry_id)
+    if not project.entry_ids:
+        projects.pop(key).async_shutdown()
+
@@ -0,0 +1,137 @@
+"""Tuya message service (Pulsar over websocket) subscription for push updates."""
+from __future__ import annotations
+
+import asyncio
+import base64
+import hashlib
+import json
+import logging
+from typing import Any, Callable, Dict
+
+import aiohttp
+from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+
+from .const import PUSH_TOPIC, REGIONS
+from .ratelimit import backoff_delay
+
+_LOGGER = logging.getLogger(__name__)
+
+DeviceListener = Callable[[Dict[str, Any]], None]
+
+
+class TuyaMessageListener:
+    """Receive device events for a Tuya cloud project and route them by device id.
+
+    One websocket consumer per project: Tuya delivers every device of the
+    project on the same subscription. Each message is acknowledged, its
+    payload decrypted with the project access key, and the event passed to
+    the listener registered for its ``devId``. The connection is re-opened
+    with jittered exponential back-off when it drops.
+    """
+
+    def __init__(
+        self,
+        session: aiohttp.ClientSession,
+        access_id: str,
+        access_key: str,
+        region: str,
+        endpoint: str | None = None,
+        topic: str = PUSH_TOPIC,
+    ) -> None:
+        self._session = session
+        self.access_id = access_id
+        self.access_key = access_key
+        self.endpoint = endpoint or REGIONS.get(region, REGIONS["us"])["mq_endpoint"]
+        self.topic = topic
+        self.connected = asyncio.Event()
+        self.messages = 0
+        self._listeners: dict[str, DeviceListener] = {}
+
+    @property
+    def url(self) -> str:
+        return (
+            f"{self.endpoint.rstrip('/')}/ws/v2/consumer/persistent/{self.access_id}/out/"
+            f"{self.topic}/{self.access_id}-sub?ackTimeoutMillis=3000&subscriptionType=Failover"
+        )
+
+    def _password(self) -> str:
+        key_md5 = hashlib.md5(self.access_key.encode("utf-8")).hexdigest()
+        return hashlib.md5(f"{self.access_id}{key_md5}".encode("utf-8")).hexdigest()[8:24]
+
+    def add_listener(self, device_id: str, listener: DeviceListener) -> Callable[[], None]:
+        """Route events for ``device_id`` to ``listener``; return a remover."""
+
+        self._listeners[device_id] = listener
+        return lambda: self._listeners.pop(device_id, None)
+
+    @property
+    def has_listeners(self) -> bool:
+        return bool(self._listeners)
+
+    async def run(self) -> None:
+        """Consume messages until cancelled, reconnecting after failures."""
+
+        attempt = 0
+        while True:
+            try:
+                async with self._session.ws_connect(
+                    self.url,
+                    headers={"username": self.access_id, "password": self._password()},
+                    heartbeat=30,
+                ) as ws:
+                    _LOGGER.debug("Subscribed to Tuya messages for %s", self.access_id)
+                    self.connected.set()
+                    attempt = 0
+                    async for message in ws:
+                        if message.type == aiohttp.WSMsgType.TEXT:
+                            await self._handle(ws, message.data)
+                        elif message.type in (aiohttp.WSMsgType.CLOSED, aiohttp.WSMsgType.ERROR):
+                            break
+            except asyncio.CancelledError:
+                raise
+            except Exception as err:  # pylint: disable=broad-except
+                _LOGGER.debug("Tuya message subscription failed: %s", err)
+            self.connected.clear()
+            attempt += 1
+            delay = max(backoff_delay(attempt), 1.0)
+            _LOGGER.debug("Reconnecting to Tuya messages in %.1fs", delay)
+            await asyncio.sleep(delay)
+
+    async def _handle(self, ws: aiohttp.ClientWebSocketResponse, raw: str) -> None:
+        try:
+            message = json.loads(raw)
+        except ValueError:
+            return
+        if message_id := message.get("messageId"):
+            await ws.send_json({"messageId": message_id})
+        try:
+            event = self._decode(message)
+        except Exception as err:  # pylint: disable=broad-except
+            _LOGGER.debug("Could not decode Tuya message %s: %s", message.get("messageId"), err)
+            return
+        self.messages += 1
+        device_id = event.get("devId") or (event.get("bizData") or {}).get("devId")
+        if (listener := self._listeners.get(device_id)) is not None:
+            listener(event)
+
+    def _decode(self, message: Dict[str, Any]) -> Dict[str, Any]:
+        payload = json.loads(base64.b64decode(message["payload"]))
+        encryption = (message.get("properties") or {}).get("em")
+        return json.loads(decrypt_message(payload["data"], self.access_key, encryption))
+
+
+def decrypt_message(data: str, access_key: str, encryption: str | None = None) -> str:
+    """Decrypt a message ``data`` field with the key derived from the access key.
+
+    Tuya uses AES-128-ECB with PKCS#7 padding by default and AES-GCM
+    (12-byte nonce prefix, 16-byte tag suffix) when ``em`` is ``aes_gcm``.
+    """
+
+    key = access_key[8:24].encode("utf-8")
+    raw = base64.b64decode(data)
+    if encryption == "aes_gcm":
+        return AESGCM(key).decrypt(raw[:12], raw[12:], None).decode("utf-8")
+    decryptor = Cipher(algorithms.AES(key), modes.ECB()).decryptor()  # nosec - Tuya protocol
+    plain = decryptor.update(raw) + decryptor.finalize()
+    return plain[: -plain[-1]].decode("utf-8")
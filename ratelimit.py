@@ -0,0 +1,84 @@
+"""Per-project request budget for the Tuya OpenAPI."""
+from __future__ import annotations
+
+import asyncio
+import logging
+import random
+import time
+
+from .const import (
+    BREAKER_BASE_COOLDOWN,
+    BREAKER_MAX_COOLDOWN,
+    REQUEST_BURST,
+    REQUEST_RATE,
+    RETRY_BASE_DELAY,
+    RETRY_MAX_DELAY,
+)
+from .exceptions import TuyaCircuitOpenError
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class RateBudget:
+    """Token bucket plus circuit breaker shared by every client of one project.
+
+    ``acquire`` spaces requests out to ``rate`` per second with bursts of up to
+    ``burst``. When the cloud reports throttling the breaker opens and
+    ``acquire`` fails fast until the cool-down has passed; each consecutive
+    trip doubles the cool-down up to ``BREAKER_MAX_COOLDOWN``.
+    """
+
+    def __init__(self, rate: float = REQUEST_RATE, burst: int = REQUEST_BURST) -> None:
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+        self._open_until = 0.0
+        self._trips = 0
+
+    @property
+    def retry_in(self) -> float:
+        """Seconds until the breaker closes again (0 when closed)."""
+
+        return max(self._open_until - time.monotonic(), 0.0)
+
+    async def acquire(self) -> None:
+        """Wait for a request slot, or raise if the breaker is open."""
+
+        async with self._lock:
+            if (retry_in := self.retry_in) > 0:
+                raise TuyaCircuitOpenError(
+                    f"Tuya requests paused for {retry_in:.0f}s after throttling",
+                    retry_after=retry_in,
+                )
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            if self._tokens < 1:
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+                self._tokens = 1.0
+                self._updated = time.monotonic()
+            self._tokens -= 1
+
+    def throttled(self, retry_after: float = 0.0) -> float:
+        """Open the breaker after a rate-limit response; return the cool-down."""
+
+        cooldown = min(BREAKER_BASE_COOLDOWN * 2**self._trips, BREAKER_MAX_COOLDOWN)
+        cooldown = max(cooldown, retry_after)
+        self._trips += 1
+        self._open_until = time.monotonic() + cooldown
+        self._tokens = 0.0
+        _LOGGER.warning("Tuya API is throttling requests, pausing for %.0fs", cooldown)
+        return cooldown
+
+    def succeeded(self) -> None:
+        """Reset the breaker back-off after a successful request."""
+
+        self._trips = 0
+
+
+def backoff_delay(attempt: int) -> float:
+    """Return a full-jitter exponential back-off delay for retry ``attempt`` (1-based)."""
+
+    return random.uniform(0, min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * 2 ** (attempt - 1)))
@@ -0,0 +1,112 @@
+"""Detect which Tuya data center serves a device when setting up a scale."""
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from typing import Any, Dict, Iterable
+
+import aiohttp
+
+from .api import AsyncTuyaSmartScaleAPI
+from .const import REGION_PROBE_GRACE, REGION_PROBE_TIMEOUT, REGIONS
+
+_LOGGER = logging.getLogger(__name__)
+
+Candidate = tuple[str, str]  # region, endpoint
+
+
+def region_candidates() -> list[Candidate]:
+    """Return the (region, endpoint) pair of every data center in ``REGIONS``."""
+
+    return [(region, data["endpoint"]) for region, data in REGIONS.items()]
+
+
+def region_for_endpoint(endpoint: str) -> str | None:
+    """Return the region code whose OpenAPI endpoint is ``endpoint``, if any."""
+
+    return next(
+        (region for region, data in REGIONS.items() if data["endpoint"] == endpoint.rstrip("/")),
+        None,
+    )
+
+
+async def _probe(
+    session: aiohttp.ClientSession,
+    access_id: str,
+    access_key: str,
+    device_id: str,
+    candidate: Candidate,
+) -> Dict[str, Any] | None:
+    """Fetch a token and the device from one endpoint; return the result with its latency."""
+
+    region, endpoint = candidate
+    client = AsyncTuyaSmartScaleAPI(session, access_id, access_key, device_id, region=region)
+    client.endpoint = endpoint
+    start = time.monotonic()
+    try:
+        device = await asyncio.wait_for(client.get_device_info(), REGION_PROBE_TIMEOUT)
+    except Exception as err:  # pylint: disable=broad-except
+        _LOGGER.debug("Device %s not reachable through %s: %s", device_id, endpoint, err)
+        return None
+    if not device:
+        return None
+    return {
+        "region": region,
+        "endpoint": endpoint,
+        "latency": time.monotonic() - start,
+        "device": device,
+    }
+
+
+async def async_detect_region(
+    session: aiohttp.ClientSession,
+    access_id: str,
+    access_key: str,
+    device_id: str,
+    preferred: Iterable[Candidate] = (),
+) -> Dict[str, Any] | None:
+    """Return the fastest endpoint that can see ``device_id``, or None.
+
+    ``preferred`` endpoints (those of existing entries for the same project)
+    are tried first, one at a time, so adding another scale of a known
+    project costs a single round trip. Otherwise every candidate is probed
+    concurrently with a short timeout. Once one endpoint owns the device, the
+    others get ``REGION_PROBE_GRACE`` seconds to answer faster before they are
+    cancelled, so an unreachable data center does not hold up setup.
+    """
+
+    for candidate in dict.fromkeys(preferred):
+        if (result := await _probe(session, access_id, access_key, device_id, candidate)) is not None:
+            return result
+
+    pending = {
+        asyncio.create_task(_probe(session, access_id, access_key, device_id, candidate))
+        for candidate in region_candidates()
+    }
+    found: list[Dict[str, Any]] = []
+    deadline: float | None = None
+    try:
+        while pending:
+            timeout = None if deadline is None else max(deadline - time.monotonic(), 0)
+            done, pending = await asyncio.wait(
+                pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED
+            )
+            if not done:
+                break
+            found.extend(result for task in done if (result := task.result()) is not None)
+            if found and deadline is None:
+                deadline = time.monotonic() + REGION_PROBE_GRACE
+    finally:
+        for task in pending:
+            task.cancel()
+
+    if not found:
+        return None
+    best = min(found, key=lambda result: result["latency"])
+    _LOGGER.debug(
+        "Device %s found through %s",
+        device_id,
+        ", ".join(f"{result['endpoint']} ({result['latency'] * 1000:.0f} ms)" for result in found),
+    )
+    return best
@@ -0,0 +1,94 @@
+"""Adaptive polling schedule for the Intelar scale coordinator."""
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Any, Dict, Iterable
+
+from homeassistant.util import dt as dt_util
+
+from .const import (
+    ACTIVE_HOUR_MIN_SAMPLES,
+    ACTIVE_HOUR_MIN_SHARE,
+    ADAPTIVE_FAST_INTERVAL,
+    ADAPTIVE_FAST_WINDOW,
+)
+
+
+class AdaptivePollScheduler:
+    """Pick the next poll interval from recent and historical weigh-in activity.
+
+    A new measurement switches to ``fast_interval`` for ``fast_window`` seconds,
+    since household members tend to weigh in one after another. After that the
+    interval doubles on every idle poll up to a ceiling: ``base_interval``
+    during the household's usual weigh-in hours (learned from measurement
+    times), ``max_interval`` otherwise. Long idle intervals are cut short so
+    the first poll of a usual weigh-in hour happens on time.
+    """
+
+    def __init__(
+        self,
+        base_interval: float,
+        max_interval: float,
+        fast_interval: float = ADAPTIVE_FAST_INTERVAL,
+        fast_window: float = ADAPTIVE_FAST_WINDOW,
+    ) -> None:
+        self.base_interval = base_interval
+        self.max_interval = max(max_interval, base_interval)
+        self.fast_interval = min(fast_interval, base_interval)
+        self.fast_window = fast_window
+        self.hour_counts = [0] * 24
+        self._last_activity: datetime | None = None
+        self._idle_interval = self.fast_interval
+
+    def record_measurements(self, create_times: Iterable[int]) -> None:
+        """Add measurement times (ms since epoch) to the weigh-in hour histogram."""
+
+        for create_time in create_times:
+            if create_time:
+                hour = dt_util.as_local(dt_util.utc_from_timestamp(create_time / 1000)).hour
+                self.hour_counts[hour] += 1
+
+    def is_active_hour(self, hour: int) -> bool:
+        total = sum(self.hour_counts)
+        if total < ACTIVE_HOUR_MIN_SAMPLES:
+            return False
+        return self.hour_counts[hour] >= total * ACTIVE_HOUR_MIN_SHARE
+
+    def next_interval(self, now: datetime, new_activity: bool) -> float:
+        """Return the seconds until the next poll, given whether this poll found new data."""
+
+        if new_activity:
+            self._last_activity = now
+            self._idle_interval = self.fast_interval
+        if (
+            self._last_activity is not None
+            and (now - self._last_activity).total_seconds() < self.fast_window
+        ):
+            return self.fast_interval
+
+        local = dt_util.as_local(now)
+        ceiling = self.base_interval if self.is_active_hour(local.hour) else self.max_interval
+        self._idle_interval = min(self._idle_interval * 2, self.max_interval)
+        interval = min(self._idle_interval, ceiling)
+
+        until_active = self._seconds_until_active_hour(local)
+        if until_active is not None:
+            interval = min(interval, max(until_active, self.fast_interval))
+        return interval
+
+    def _seconds_until_active_hour(self, local: datetime) -> float | None:
+        """Return seconds until the next usual weigh-in hour starts, if one is known."""
+
+        start_of_hour = local.replace(minute=0, second=0, microsecond=0)
+        for offset in range(1, 25):
+            if self.is_active_hour((local.hour + offset) % 24):
+                return offset * 3600 - (local - start_of_hour).total_seconds()
+        return None
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {"hour_counts": list(self.hour_counts)}
+
+    def load(self, stored: Dict[str, Any]) -> None:
+        counts = stored.get("hour_counts")
+        if isinstance(counts, list) and len(counts) == 24:
+            self.hour_counts = [int(count) for count in counts]
@@ -1,17 +1,27 @@
 from __future__ import annotations
 
-import datetime
+import logging
 
 from homeassistant.components.sensor import SensorEntity
+from homeassistant.const import EntityCategory
+from homeassistant.core import callback
+from homeassistant.helpers import entity_registry as er
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
 from .const import (
     CONF_DEVICE_ID,
+    CONF_DIAGNOSTICS,
+    DIAGNOSTIC_SENSOR_TYPES,
     DOMAIN,
     SENSOR_DISPLAY_NAMES,
     SENSOR_TYPES,
+    TREND_SENSOR_TYPES,
 )
-from .utils import calculate_age_from_birthdate
+from .snapshot import CANONICAL_TYPES
+
+_LOGGER = logging.getLogger(__name__)
+
+ENTITY_TYPES = (*SENSOR_TYPES, *TREND_SENSOR_TYPES)
 
 
 class IntelarScaleSensor(CoordinatorEntity, SensorEntity):
@@ -28,82 +38,117 @@ class IntelarScaleSensor(CoordinatorEntity, SensorEntity):
         display_name = SENSOR_DISPLAY_NAMES.get(entity_type, entity_type.replace("_", " ").title())
         self._attr_name = f"{display_name} ({nickname or user_id})"
 
-        canonical_type = entity_type
-        for sensor_type, config in SENSOR_TYPES.items():
-            if entity_type == sensor_type or entity_type in config["aliases"]:
-                canonical_type = sensor_type
-                break
-
-        if canonical_type in SENSOR_TYPES:
-            config = SENSOR_TYPES[canonical_type]
+        canonical_type = CANONICAL_TYPES.get(entity_type, entity_type)
+        config = SENSOR_TYPES.get(canonical_type) or TREND_SENSOR_TYPES.get(entity_type)
+        if config is not None:
             self._attr_native_unit_of_measurement = config["unit"]
             self._attr_device_class = config["device_class"]
             self._attr_icon = config["icon"]
 
+        self._last_available: bool | None = None
+
+    async def async_added_to_hass(self) -> None:
+        await super().async_added_to_hass()
+        self._last_available = self.available
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Write state only when this sensor's value or availability changed."""
+
+        available = self.available
+        if available != self._last_available or self.coordinator.value_changed(
+            self.user_id, self.entity_type
+        ):
+            self._last_available = available
+            self.async_write_ha_state()
+        else:
+            self.coordinator.suppressed_writes += 1
+
     @property
     def native_value(self):
-        user_data = self.coordinator.data.get(self.user_id)
-        if not user_data:
+        snapshot = self.coordinator.snapshots.get(self.user_id)
+        if not snapshot:
             return None
+        return snapshot.get(self.entity_type)
 
-        if self.entity_type == "physical_age":
-            birthdate_str = getattr(self.coordinator, "birthdate", None)
-            if birthdate_str:
-                return calculate_age_from_birthdate(birthdate_str)
-            return None
 
-        config = SENSOR_TYPES.get(self.entity_type, {})
-        value = user_data.get(self.entity_type)
-
-        if value is None:
-            for alias in config.get("aliases", []):
-                value = user_data.get(alias)
-                if value is not None:
-                    break
-
-        if value is None and "analysis_report" in user_data:
-            value = user_data["analysis_report"].get(self.entity_type)
-            if value is None:
-                for alias in config.get("aliases", []):
-                    value = user_data["analysis_report"].get(alias)
-                    if value is not None:
-                        break
-
-        if value is not None:
-            if self.entity_type == "body_type":
-                body_type_map = {
-                    0: "Underweight",
-                    1: "Normal",
-                    2: "Overweight",
-                    3: "Obese",
-                    4: "Severely Obese",
-                }
-                try:
-                    return body_type_map.get(int(value), f"Unknown ({value})")
-                except (ValueError, TypeError):
-                    return value
-            if self.entity_type == "create_time":
-                try:
-                    return datetime.datetime.fromtimestamp(int(value) / 1000, datetime.timezone.utc)
-                except (ValueError, TypeError):
-                    return None
-
-        return value
+class IntelarScaleDiagnosticSensor(CoordinatorEntity, SensorEntity):
+    """Request metrics of the scale's Tuya client, refreshed with every poll."""
+
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+
+    def __init__(self, coordinator, device_id: str, entity_type: str) -> None:
+        super().__init__(coordinator)
+        self.entity_type = entity_type
+        self._attr_unique_id = f"{device_id}_{entity_type}"
+        self._attr_name = f"{SENSOR_DISPLAY_NAMES[entity_type]} ({device_id})"
+        config = DIAGNOSTIC_SENSOR_TYPES[entity_type]
+        self._attr_native_unit_of_measurement = config["unit"]
+        self._attr_device_class = config["device_class"]
+        self._attr_icon = config["icon"]
+
+    @property
+    def available(self) -> bool:
+        return True
+
+    @property
+    def native_value(self):
+        return self.coordinator.diagnostic_values().get(self.entity_type)
+
+
+def _user_of(device_id: str, unique_id: str) -> str | None:
+    """Return the user id encoded in one of this scale's sensor unique ids."""
+
+    prefix = f"{device_id}_"
+    if not unique_id.startswith(prefix):
+        return None
+    for sensor_type in sorted(ENTITY_TYPES, key=len, reverse=True):
+        if unique_id.endswith(f"_{sensor_type}") and len(unique_id) > len(prefix) + len(sensor_type) + 1:
+            return unique_id[len(prefix) : -len(sensor_type) - 1]
+    return None
 
 
 async def async_setup_entry(hass, entry, async_add_entities):
     coordinator = hass.data[DOMAIN][entry.entry_id]
-    entities = []
-    for user_id, user_data in coordinator.data.items():
-        nickname = user_data.get("nickname")
-        for sensor_type in SENSOR_TYPES.keys():
-            entities.append(
-                IntelarScaleSensor(
-                    coordinator,
-                    entry.data[CONF_DEVICE_ID],
-                    user_id,
-                    nickname,
-                    sensor_type,
-                )
-            )
-    async_add_entities(entities)
+    device_id = entry.data[CONF_DEVICE_ID]
+    registry = er.async_get(hass)
+    entities: dict[str, list[IntelarScaleSensor]] = {}
+
+    # Sensors of users that were removed while Home Assistant was not running.
+    for registry_entry in er.async_entries_for_config_entry(registry, entry.entry_id):
+        user_id = _user_of(device_id, registry_entry.unique_id)
+        if user_id is not None and user_id not in coordinator.data:
+            registry.async_remove(registry_entry.entity_id)
+
+    @callback
+    def _async_sync_users() -> None:
+        """Add sensors for new scale users and remove those of users that are gone."""
+
+        users = coordinator.data or {}
+        new_entities = []
+        for user_id in sorted(users.keys() - entities.keys()):
+            nickname = users[user_id].get("nickname")
+            entities[user_id] = [
+                IntelarScaleSensor(coordinator, device_id, user_id, nickname, sensor_type)
+                for sensor_type in ENTITY_TYPES
+            ]
+            new_entities.extend(entities[user_id])
+        if new_entities:
+            async_add_entities(new_entities)
+
+        for user_id in entities.keys() - users.keys():
+            _LOGGER.debug("Removing sensors of scale user %s", user_id)
+            for entity in entities.pop(user_id):
+                if entity.registry_entry is not None:
+                    registry.async_remove(entity.entity_id)
+                else:
+                    hass.async_create_task(entity.async_remove(force_remove=True))
+
+    _async_sync_users()
+    entry.async_on_unload(coordinator.async_add_listener(_async_sync_users))
+
+    if entry.options.get(CONF_DIAGNOSTICS):
+        async_add_entities(
+            IntelarScaleDiagnosticSensor(coordinator, device_id, sensor_type)
+            for sensor_type in DIAGNOSTIC_SENSOR_TYPES
+        )
@@ -0,0 +1,102 @@
+"""Services for the Intelar Smart Scale integration."""
+from __future__ import annotations
+
+import asyncio
+import logging
+from typing import Any, Dict, List
+
+import voluptuous as vol
+from homeassistant.core import HomeAssistant, ServiceCall, ServiceResponse, SupportsResponse, callback
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers import config_validation as cv
+from homeassistant.util import dt as dt_util
+
+from .backfill import HistoryBackfill
+from .const import (
+    DEFAULT_MEASUREMENT_COUNT,
+    DOMAIN,
+    SERVICE_BACKFILL_HISTORY,
+    SERVICE_GET_MEASUREMENTS,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+ATTR_CONFIG_ENTRY_ID = "config_entry_id"
+ATTR_RESTART = "restart"
+ATTR_USER_ID = "user_id"
+ATTR_COUNT = "count"
+
+BACKFILL_SCHEMA = vol.Schema(
+    {
+        vol.Optional(ATTR_CONFIG_ENTRY_ID): cv.string,
+        vol.Optional(ATTR_RESTART, default=False): cv.boolean,
+    }
+)
+
+GET_MEASUREMENTS_SCHEMA = vol.Schema(
+    {
+        vol.Required(ATTR_CONFIG_ENTRY_ID): cv.string,
+        vol.Optional(ATTR_USER_ID): cv.string,
+        vol.Optional(ATTR_COUNT, default=DEFAULT_MEASUREMENT_COUNT): vol.All(
+            vol.Coerce(int), vol.Range(min=1, max=1000)
+        ),
+    }
+)
+
+
+@callback
+def async_setup_services(hass: HomeAssistant) -> None:
+    """Register the integration's services."""
+
+    running: dict[str, asyncio.Task] = {}
+
+    async def _async_backfill(call: ServiceCall) -> None:
+        if "recorder" not in hass.config.components:
+            raise HomeAssistantError("The recorder integration is required for backfill")
+
+        entry_ids = [
+            entry.entry_id
+            for entry in hass.config_entries.async_entries(DOMAIN)
+            if call.data.get(ATTR_CONFIG_ENTRY_ID) in (None, entry.entry_id)
+        ]
+        for entry_id in entry_ids:
+            coordinator = hass.data.get(DOMAIN, {}).get(entry_id)
+            if coordinator is None:
+                continue
+            if (task := running.get(entry_id)) is not None and not task.done():
+                _LOGGER.info("History backfill for %s is already running", entry_id)
+                continue
+            backfill = HistoryBackfill(hass, coordinator)
+            running[entry_id] = hass.async_create_background_task(
+                backfill.async_run(call.data[ATTR_RESTART]),
+                f"{DOMAIN} history backfill {entry_id}",
+            )
+
+    @callback
+    def _async_get_measurements(call: ServiceCall) -> ServiceResponse:
+        """Answer "last N weigh-ins" from the local store, without cloud calls."""
+
+        coordinator = hass.data.get(DOMAIN, {}).get(call.data[ATTR_CONFIG_ENTRY_ID])
+        if coordinator is None:
+            raise HomeAssistantError("Unknown or not loaded Intelar scale config entry")
+
+        user_ids = [call.data[ATTR_USER_ID]] if ATTR_USER_ID in call.data else list(coordinator.data)
+        users: Dict[str, List[Dict[str, Any]]] = {}
+        for user_id in user_ids:
+            series = coordinator.timeseries.get(user_id)
+            rows = series.last(call.data[ATTR_COUNT]) if series is not None else []
+            for row in rows:
+                row["create_time"] = dt_util.utc_from_timestamp(row["create_time"] / 1000).isoformat()
+            users[user_id] = rows
+        return {"users": users}
+
+    hass.services.async_register(
+        DOMAIN, SERVICE_BACKFILL_HISTORY, _async_backfill, schema=BACKFILL_SCHEMA
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_GET_MEASUREMENTS,
+        _async_get_measurements,
+        schema=GET_MEASUREMENTS_SCHEMA,
+        supports_response=SupportsResponse.ONLY,
+    )
@@ -0,0 +1,97 @@
+"""Normalise raw scale records into flat, typed per-user snapshots."""
+from __future__ import annotations
+
+import datetime
+from typing import Any, Callable, Dict
+
+from .const import SENSOR_TYPES
+
+BODY_TYPES = {
+    0: "Underweight",
+    1: "Normal",
+    2: "Overweight",
+    3: "Obese",
+    4: "Severely Obese",
+}
+
+# Sensor types whose value is an identifier or label rather than a number.
+_TEXT_TYPES = {"device_id", "user_id", "nickname"}
+
+Accessor = Callable[[Dict[str, Any]], Any]
+
+
+def _to_number(value: Any) -> Any:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return value
+
+
+def _to_text(value: Any) -> Any:
+    return value
+
+
+def _to_body_type(value: Any) -> Any:
+    try:
+        return BODY_TYPES.get(int(value), f"Unknown ({value})")
+    except (ValueError, TypeError):
+        return value
+
+
+def _to_timestamp(value: Any) -> datetime.datetime | None:
+    try:
+        return datetime.datetime.fromtimestamp(int(value) / 1000, datetime.timezone.utc)
+    except (ValueError, TypeError, OverflowError, OSError):
+        return None
+
+
+def _converter(entity_type: str) -> Callable[[Any], Any]:
+    if entity_type == "body_type":
+        return _to_body_type
+    if entity_type == "create_time":
+        return _to_timestamp
+    if entity_type in _TEXT_TYPES:
+        return _to_text
+    return _to_number
+
+
+def _make_accessor(keys: tuple[str, ...], convert: Callable[[Any], Any]) -> Accessor:
+    """Return a function reading the first present key from the record, then its analysis report."""
+
+    def accessor(record: Dict[str, Any]) -> Any:
+        for source in (record, record.get("analysis_report") or {}):
+            for key in keys:
+                value = source.get(key)
+                if value is not None:
+                    return convert(value)
+        return None
+
+    return accessor
+
+
+# physical_age comes from the configured birthdate, not from the record.
+FIELD_RESOLVERS: Dict[str, Accessor] = {
+    entity_type: _make_accessor(
+        (entity_type, *config["aliases"]), _converter(entity_type)
+    )
+    for entity_type, config in SENSOR_TYPES.items()
+    if entity_type != "physical_age"
+}
+
+# Maps every sensor type and alias to its canonical SENSOR_TYPES key.
+CANONICAL_TYPES: Dict[str, str] = {
+    **{
+        alias: entity_type
+        for entity_type, config in SENSOR_TYPES.items()
+        for alias in config["aliases"]
+    },
+    **{entity_type: entity_type for entity_type in SENSOR_TYPES},
+}
+
+
+def normalise_record(record: Dict[str, Any], physical_age: int | None) -> Dict[str, Any]:
+    """Return ``{sensor_type: value}`` for one user's latest record."""
+
+    snapshot = {entity_type: resolve(record) for entity_type, resolve in FIELD_RESOLVERS.items()}
+    snapshot["physical_age"] = physical_age
+    return snapshot
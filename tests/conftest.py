@@ -0,0 +1,11 @@
+"""Import the integration as the ``intelar_scale`` package for the tests."""
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "tools"))
+
+from _integration import load_integration  # noqa: E402
+
+load_integration()
@@ -0,0 +1,84 @@
+"""Resumable history backfill into external statistics."""
+from __future__ import annotations
+
+import asyncio
+import time
+from collections import Counter
+from pathlib import Path
+from types import SimpleNamespace
+
+import aiohttp
+from homeassistant.components.persistent_notification import (
+    _async_get_or_create_notifications,
+)
+from homeassistant.core import HomeAssistant
+
+from fake_tuya import ACCESS_ID, ACCESS_KEY, FakeTuyaCloud, make_history
+
+from intelar_scale import backfill as backfill_module
+from intelar_scale.api import AsyncTuyaSmartScaleAPI
+from intelar_scale.backfill import HOUR_MS, HistoryBackfill
+from intelar_scale.exceptions import TuyaTransientError
+from intelar_scale.timeseries import MeasurementStore
+
+DEVICE_ID = "device0"
+DAYS = 40
+
+
+def test_interrupted_backfill_resumes_from_its_checkpoint(tmp_path: Path, monkeypatch) -> None:
+    monkeypatch.setattr(backfill_module, "BACKFILL_BATCH_RECORDS", 10)
+    imported: Counter[int] = Counter()
+
+    def fake_import(_self, series):
+        for (user_id, field), statistics in series.items():
+            if (user_id, field) == ("user0", "weight"):
+                imported.update(int(row["start"].timestamp() * 1000) for row in statistics)
+
+    monkeypatch.setattr(HistoryBackfill, "_import", fake_import)
+
+    async def run() -> None:
+        # Half past an hour, an hour ago: both users of a day share one hour.
+        now_ms = int(time.time() * 1000)
+        now_ms -= now_ms % HOUR_MS + HOUR_MS // 2
+        cloud = FakeTuyaCloud([make_history(DEVICE_ID, users=2, records_per_user=DAYS, now_ms=now_ms)])
+        url = await cloud.start()
+        hass = HomeAssistant(str(tmp_path))
+        try:
+            async with aiohttp.ClientSession() as session:
+                api = AsyncTuyaSmartScaleAPI(session, ACCESS_ID, ACCESS_KEY, DEVICE_ID)
+                api.endpoint = url
+                coordinator = SimpleNamespace(api=api, timeseries=MeasurementStore(hass, DEVICE_ID))
+                iter_records = api.iter_history_records
+
+                async def failing_records(*args, **kwargs):
+                    count = 0
+                    async for record in iter_records(*args, **kwargs):
+                        if (count := count + 1) > 25:
+                            raise TuyaTransientError("connection reset")
+                        yield record
+
+                api.iter_history_records = failing_records
+                await HistoryBackfill(hass, coordinator).async_run()
+                checkpoint = await HistoryBackfill(hass, coordinator)._store.async_load()
+                assert checkpoint["done"] is False
+                # The hour the run stopped in is left for the resumed run.
+                stopped_hour = now_ms - now_ms % HOUR_MS - 12 * 86_400_000
+                assert checkpoint["cursor"] == stopped_hour + HOUR_MS - 1
+                assert stopped_hour not in imported
+                assert f"intelar_scale_backfill_{DEVICE_ID}" in _async_get_or_create_notifications(hass)
+
+                api.iter_history_records = iter_records
+                await HistoryBackfill(hass, coordinator).async_run()
+                # Every day's hour was imported exactly once across both runs.
+                assert len(imported) == DAYS and set(imported.values()) == {1}
+                assert len(coordinator.timeseries.get("user0")) == DAYS
+                assert not _async_get_or_create_notifications(hass)
+
+                cloud.reset_counters()
+                await HistoryBackfill(hass, coordinator).async_run()
+                assert not cloud.requests
+        finally:
+            await cloud.stop()
+            await hass.async_stop(force=True)
+
+    asyncio.run(run())
@@ -0,0 +1,71 @@
+"""Check the local BIA engine against the reports in ``fixtures/bia_reports.json``.
+
+Cases tagged ``"source": "equations"`` hold values worked out from the
+published equations the engine implements (Sun 2003, Janssen 2000,
+Katch-McArdle) and must match to report rounding. Cases tagged
+``"source": "cloud"`` are anonymised Tuya analysis reports exported with
+``tools/validate_bia.py --export`` and must agree within ``CLOUD_TOLERANCES``.
+"""
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+import pytest
+
+from intelar_scale.bia import compute_body_composition, report_differences
+
+CASES = json.loads((Path(__file__).parent / "fixtures" / "bia_reports.json").read_text())
+
+# Largest accepted |cloud - local| per field: percentage points for body_fat and
+# water, kg for ffm, muscle and bones, kcal for metabolism, rating steps for
+# visceral_fat and kg/m² for BMI (which does not depend on the BIA equations).
+CLOUD_TOLERANCES = {
+    "body_fat": 5.0,
+    "ffm": 4.0,
+    "water": 5.0,
+    "muscle": 5.0,
+    "bones": 1.0,
+    "metabolism": 150.0,
+    "visceral_fat": 5.0,
+    "bmi": 0.2,
+}
+# Reports round to 0.1 (and metabolism to 1 kcal); allow one rounding step.
+ROUNDING_TOLERANCE = {"metabolism": 1.0}
+
+
+def _cases(source: str) -> list:
+    return [
+        pytest.param(case, id="-".join(str(value) for value in case["request"].values()))
+        for case in CASES
+        if case["source"] == source
+    ]
+
+
+def _local(case: dict) -> dict:
+    request = case["request"]
+    return compute_body_composition(
+        request["height"], request["weight"], request["age"], request["sex"], request["resistance"]
+    )
+
+
+CLOUD_CASES = _cases("cloud")
+
+
+@pytest.mark.parametrize("case", _cases("equations"))
+def test_matches_published_equations(case: dict) -> None:
+    differences = report_differences(_local(case), case["response"])
+    assert differences.keys() == case["response"].keys()
+    for field, difference in differences.items():
+        assert abs(difference) <= ROUNDING_TOLERANCE.get(field, 0.1) + 1e-9, (field, difference)
+
+
+@pytest.mark.skipif(
+    not CLOUD_CASES, reason="no cloud reports recorded yet; add them with tools/validate_bia.py --export"
+)
+@pytest.mark.parametrize("case", CLOUD_CASES)
+def test_within_tolerance_of_cloud_reports(case: dict) -> None:
+    differences = report_differences(_local(case), case["response"])
+    assert differences
+    for field, difference in differences.items():
+        assert abs(difference) <= CLOUD_TOLERANCES[field], (field, difference)
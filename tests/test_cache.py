@@ -0,0 +1,88 @@
+"""Analysis report cache and the POSTs it saves."""
+from __future__ import annotations
+
+import asyncio
+import json
+
+import aiohttp
+
+from fake_tuya import ACCESS_ID, ACCESS_KEY, FakeTuyaCloud, make_history
+
+from intelar_scale.api import AsyncTuyaSmartScaleAPI
+from intelar_scale.cache import AnalysisReportCache
+from intelar_scale.profiles import UserProfile
+
+DEVICE_ID = "device0"
+
+
+def test_cache_is_bounded_and_round_trips_through_json() -> None:
+    cache = AnalysisReportCache(max_size=2)
+    keys = [(170.0, 70.0 + index, 30, 1, "500") for index in range(3)]
+    for index, key in enumerate(keys):
+        cache.put(key, {"body_fat": index}, record_key=f"record{index}")
+    assert len(cache) == 2
+    assert cache.get(keys[0]) is None
+    assert cache.get_for_record("record0") is None
+
+    restored = AnalysisReportCache(max_size=2)
+    restored.load(json.loads(json.dumps(cache.as_dict())))
+    assert restored.get(keys[2]) == {"body_fat": 2}
+    assert restored.get_for_record("record1") == {"body_fat": 1}
+
+
+async def _poll_twice(cloud: FakeTuyaCloud, url: str, stored: dict | None) -> tuple[int, int, dict]:
+    """Return the analysis POSTs of a cold and a repeated full poll, and the cache."""
+
+    async with aiohttp.ClientSession() as session:
+        api = AsyncTuyaSmartScaleAPI(session, ACCESS_ID, ACCESS_KEY, DEVICE_ID)
+        api.endpoint = url
+        if stored:
+            api.analysis_cache.load(stored)
+        cloud.reset_counters()
+        await api.get_latest_data()
+        first = cloud.requests["analysis-reports"]
+        cloud.reset_counters()
+        await api.get_latest_data(full_scan=True)
+        return first, cloud.requests["analysis-reports"], api.analysis_cache.as_dict()
+
+
+def test_unchanged_measurements_are_not_analysed_again() -> None:
+    async def run() -> None:
+        cloud = FakeTuyaCloud([make_history(DEVICE_ID, users=3, records_per_user=2)])
+        url = await cloud.start()
+        try:
+            first, repeated, stored = await _poll_twice(cloud, url, None)
+            assert (first, repeated) == (3, 0)
+            # After a restart the stored cache answers the cold poll as well.
+            first, repeated, _ = await _poll_twice(cloud, url, json.loads(json.dumps(stored)))
+            assert (first, repeated) == (0, 0)
+        finally:
+            await cloud.stop()
+
+    asyncio.run(run())
+
+
+def test_profile_change_reanalyses_only_that_user() -> None:
+    async def run() -> None:
+        cloud = FakeTuyaCloud([make_history(DEVICE_ID, users=2, records_per_user=2)])
+        url = await cloud.start()
+        try:
+            async with aiohttp.ClientSession() as session:
+                api = AsyncTuyaSmartScaleAPI(session, ACCESS_ID, ACCESS_KEY, DEVICE_ID)
+                api.endpoint = url
+                before = await api.get_latest_data()
+
+                api.profiles["user0"] = UserProfile("1960-06-01", 2)
+                cloud.reset_counters()
+                after = await api.get_latest_data(full_scan=True)
+                assert cloud.requests["analysis-reports"] == 1
+                assert after["user0"]["analysis_report"] != before["user0"]["analysis_report"]
+                assert after["user1"]["analysis_report"] == before["user1"]["analysis_report"]
+
+                cloud.reset_counters()
+                await api.get_latest_data(full_scan=True)
+                assert cloud.requests["analysis-reports"] == 0
+        finally:
+            await cloud.stop()
+
+    asyncio.run(run())
@@ -0,0 +1,149 @@
+"""Coordinator refreshes against the offline fake cloud."""
+from __future__ import annotations
+
+import asyncio
+from pathlib import Path
+
+import aiohttp
+import pytest
+from homeassistant.core import HomeAssistant
+
+from fake_tuya import ACCESS_ID, ACCESS_KEY, FakeTuyaCloud, make_history
+
+from intelar_scale import coordinator as coordinator_module
+from intelar_scale.api import AsyncTuyaSmartScaleAPI
+from intelar_scale.const import HISTORY_MAX_PAGES, HISTORY_PAGE_SIZE
+from intelar_scale.coordinator import IntelarScaleDataCoordinator
+from intelar_scale.ratelimit import RateBudget
+
+DEVICE_ID = "device0"
+
+
+async def _run(config_dir: Path, scenario) -> None:
+    hass = HomeAssistant(str(config_dir))
+    cloud = FakeTuyaCloud([make_history(DEVICE_ID, users=2, records_per_user=3)])
+    url = await cloud.start()
+    try:
+        async with aiohttp.ClientSession() as session:
+            api = AsyncTuyaSmartScaleAPI(session, ACCESS_ID, ACCESS_KEY, DEVICE_ID)
+            api.endpoint = url
+            coordinator = IntelarScaleDataCoordinator(hass, api)
+            await scenario(coordinator, cloud.devices[DEVICE_ID])
+    finally:
+        await cloud.stop()
+        await hass.async_stop(force=True)
+
+
+def _add_weigh_in(device, user_id: str, create_time: int) -> None:
+    record = dict(next(rec for rec in device.records if rec["user_id"] == user_id))
+    record.update(id=f"{user_id}-{create_time}", create_time=create_time)
+    device.records.insert(0, record)
+
+
+def test_removed_user_dropped_after_high_water_mark(tmp_path: Path, monkeypatch) -> None:
+    async def scenario(coordinator: IntelarScaleDataCoordinator, device) -> None:
+        await coordinator.async_refresh()
+        assert sorted(coordinator.data) == ["user0", "user1"]
+        mark = coordinator.api.high_water_mark
+        assert mark
+
+        # An incremental poll keeps users it does not see.
+        _add_weigh_in(device, "user1", mark + 1)
+        device.records = [rec for rec in device.records if rec["user_id"] != "user0"]
+        await coordinator.async_refresh()
+        assert coordinator.last_update_success
+        assert sorted(coordinator.data) == ["user0", "user1"]
+
+        # The periodic full scan reads the whole history and drops user0.
+        monkeypatch.setattr(coordinator_module, "USER_RECONCILE_INTERVAL", 0)
+        await coordinator.async_refresh()
+        assert coordinator.last_update_success
+        assert coordinator.api.high_water_mark == mark + 1
+        assert sorted(coordinator.data) == ["user1"]
+        assert "user0" not in coordinator.snapshots
+        assert coordinator.timeseries.get("user0") is None
+
+    asyncio.run(_run(tmp_path, scenario))
+
+
+def test_full_scan_keeps_users_beyond_the_pages_read(tmp_path: Path, monkeypatch) -> None:
+    async def scenario(coordinator: IntelarScaleDataCoordinator, device) -> None:
+        await coordinator.async_refresh()
+        mark = coordinator.api.high_water_mark
+
+        # user1 weighs in so often that user0's records fall past the pages a
+        # scan reads; without having read the whole history user0 is kept.
+        monkeypatch.setattr(coordinator_module, "USER_RECONCILE_INTERVAL", 0)
+        for offset in range(1, HISTORY_MAX_PAGES * HISTORY_PAGE_SIZE + 1):
+            _add_weigh_in(device, "user1", mark + offset)
+        await coordinator.async_refresh()
+        assert coordinator.last_update_success
+        assert sorted(coordinator.data) == ["user0", "user1"]
+
+    asyncio.run(_run(tmp_path, scenario))
+
+
+
+def test_full_scan_of_exactly_one_full_page_drops_a_gone_user(tmp_path: Path, monkeypatch) -> None:
+    async def scenario(coordinator: IntelarScaleDataCoordinator, device) -> None:
+        await coordinator.async_refresh()
+        mark = coordinator.api.high_water_mark
+
+        # The history is now exactly one full page, all user1, marked as the last.
+        device.records = [rec for rec in device.records if rec["user_id"] == "user1"]
+        for offset in range(1, HISTORY_PAGE_SIZE - len(device.records) + 1):
+            _add_weigh_in(device, "user1", mark + offset)
+        assert len(device.records) == HISTORY_PAGE_SIZE
+        monkeypatch.setattr(coordinator_module, "USER_RECONCILE_INTERVAL", 0)
+        await coordinator.async_refresh()
+        assert coordinator.last_update_success
+        assert sorted(coordinator.data) == ["user1"]
+
+    asyncio.run(_run(tmp_path, scenario))
+
+def test_throttled_poll_keeps_data_and_waits_for_the_breaker(tmp_path: Path) -> None:
+    async def scenario(coordinator: IntelarScaleDataCoordinator, device) -> None:
+        await coordinator.async_refresh()
+        data = coordinator.data
+        coordinator.api.budget = RateBudget()
+        cooldown = coordinator.api.budget.throttled(retry_after=600)
+
+        await coordinator.async_refresh()
+        assert coordinator.last_update_success and coordinator.throttled
+        assert coordinator.data == data
+        assert coordinator.update_interval.total_seconds() == pytest.approx(cooldown, abs=1)
+
+        # The cool-down is over.
+        coordinator.api.budget = RateBudget()
+        await coordinator.async_refresh()
+        assert not coordinator.throttled
+
+    asyncio.run(_run(tmp_path, scenario))
+
+def test_stored_snapshot_is_restored_without_the_cloud(tmp_path: Path) -> None:
+    async def run() -> None:
+        cloud = FakeTuyaCloud([make_history(DEVICE_ID, users=2, records_per_user=3)])
+        url = await cloud.start()
+        async with aiohttp.ClientSession() as session:
+            hass = HomeAssistant(str(tmp_path))
+            api = AsyncTuyaSmartScaleAPI(session, ACCESS_ID, ACCESS_KEY, DEVICE_ID)
+            api.endpoint = url
+            coordinator = IntelarScaleDataCoordinator(hass, api)
+            await coordinator.async_refresh()
+            snapshots = coordinator.snapshots
+            await hass.async_stop(force=True)
+            # The cloud is unreachable at the next start.
+            await cloud.stop()
+
+            hass = HomeAssistant(str(tmp_path))
+            api = AsyncTuyaSmartScaleAPI(session, ACCESS_ID, ACCESS_KEY, DEVICE_ID)
+            api.endpoint = url
+            coordinator = IntelarScaleDataCoordinator(hass, api)
+            await coordinator.async_load()
+            assert coordinator.snapshots == snapshots
+            await coordinator.async_refresh()
+            assert not coordinator.last_update_success
+            assert coordinator.snapshots == snapshots
+            await hass.async_stop(force=True)
+
+    asyncio.run(run())
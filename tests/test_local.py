@@ -0,0 +1,124 @@
+"""LAN weigh-ins, driven through the simulated local scale."""
+from __future__ import annotations
+
+import asyncio
+import functools
+import time
+from pathlib import Path
+
+import aiohttp
+from homeassistant.core import HomeAssistant
+
+from fake_tuya import ACCESS_ID, ACCESS_KEY, LOCAL_KEY, SCALE_DPS, FakeTuyaCloud, make_history
+from fake_tuya_local import FakeLocalScale
+
+from intelar_scale import coordinator as coordinator_module
+from intelar_scale.api import AsyncTuyaSmartScaleAPI
+from intelar_scale.coordinator import IntelarScaleDataCoordinator
+from intelar_scale.local import STATUS, TuyaLocalCipher, dps_to_record, pack_message, read_message
+
+DEVICE_ID = "device0"
+DP_MAP = {str(dp_id): {"code": code, "scale": scale} for dp_id, code, scale in SCALE_DPS}
+
+
+async def _until(condition, timeout: float = 5.0) -> None:
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        await asyncio.sleep(0.01)
+
+
+def test_frames_round_trip_through_the_cipher() -> None:
+    async def run() -> None:
+        cipher = TuyaLocalCipher(LOCAL_KEY)
+        reader = asyncio.StreamReader()
+        payload = {"dps": {"1": 613}, "t": 1_700_000_000}
+        reader.feed_data(pack_message(cipher, 7, STATUS, payload, retcode=0))
+        assert await read_message(reader, cipher) == (7, STATUS, payload)
+
+    asyncio.run(run())
+
+
+def test_dps_are_scaled_into_a_history_record() -> None:
+    record = dps_to_record(DEVICE_ID, {"1": 613, "2": 455, "99": True}, DP_MAP, 1_700_000_000)
+    assert record["wegith"] == "61.3"
+    assert record["body_r"] == "455"
+    assert "height" not in record
+    assert record["create_time"] == 1_700_000_000_000
+    assert record["source"] == "local"
+    # A report without a weight, such as a battery update, is not a weigh-in.
+    assert dps_to_record(DEVICE_ID, {"2": 455}, DP_MAP, None) is None
+
+
+async def _local_coordinator(hass: HomeAssistant, session, url: str, scale: FakeLocalScale):
+    api = AsyncTuyaSmartScaleAPI(session, ACCESS_ID, ACCESS_KEY, DEVICE_ID)
+    api.endpoint = url
+    coordinator = IntelarScaleDataCoordinator(hass, api)
+    await coordinator.async_refresh()
+    disable = coordinator.async_enable_local("127.0.0.1")
+    await _until(lambda: coordinator.local is not None and coordinator.local.connected.is_set())
+    await _until(lambda: scale.queries == 1)
+    return coordinator, disable
+
+
+def test_local_weigh_in_updates_the_matching_user(tmp_path: Path, monkeypatch) -> None:
+    async def run() -> None:
+        cloud = FakeTuyaCloud([make_history(DEVICE_ID, users=2, records_per_user=3)])
+        scale = FakeLocalScale(DEVICE_ID)
+        hass = HomeAssistant(str(tmp_path))
+        try:
+            url = await cloud.start()
+            device = functools.partial(coordinator_module.TuyaLocalDevice, port=await scale.start())
+            monkeypatch.setattr(coordinator_module, "TuyaLocalDevice", device)
+            async with aiohttp.ClientSession() as session:
+                coordinator, disable = await _local_coordinator(hass, session, url, scale)
+                before = coordinator.data["user0"]
+
+                # The scale leaves out the height; the user's last one is used.
+                await scale.weigh_in(60.4, 452, 0)
+                await _until(lambda: coordinator.data["user0"].get("source") == "local")
+                record = coordinator.data["user0"]
+                assert record["wegith"] == "60.4" and record["height"] == before["height"]
+                assert record["analysis_report"] != before["analysis_report"]
+                assert coordinator.snapshots["user0"]["weight"] == 60.4
+                assert coordinator.data["user1"] is not None
+
+                disable()
+        finally:
+            await scale.stop()
+            await cloud.stop()
+            await hass.async_stop(force=True)
+
+    asyncio.run(run())
+
+
+def test_new_weight_without_a_report_does_not_keep_the_old_one(tmp_path: Path) -> None:
+    async def run() -> None:
+        now_ms = int(time.time() * 1000) - 3_600_000
+        device = make_history(DEVICE_ID, users=2, records_per_user=3, now_ms=now_ms)
+        cloud = FakeTuyaCloud([device])
+        hass = HomeAssistant(str(tmp_path))
+        try:
+            url = await cloud.start()
+            async with aiohttp.ClientSession() as session:
+                api = AsyncTuyaSmartScaleAPI(session, ACCESS_ID, ACCESS_KEY, DEVICE_ID)
+                api.endpoint = url
+                coordinator = IntelarScaleDataCoordinator(hass, api)
+                await coordinator.async_refresh()
+                assert coordinator.snapshots["user0"]["body_fat"] is not None
+
+                # Weighed in with socks on: a weight, but no resistance to analyse.
+                record = dict(
+                    device.records[0], id="socks", wegith="60.8", body_r="0", create_time=now_ms + 1000
+                )
+                device.records.insert(0, record)
+                await coordinator.async_refresh()
+                assert coordinator.data["user0"]["id"] == "socks"
+                assert "analysis_report" not in coordinator.data["user0"]
+                assert coordinator.snapshots["user0"]["weight"] == 60.8
+                assert coordinator.snapshots["user0"]["body_fat"] is None
+        finally:
+            await cloud.stop()
+            await hass.async_stop(force=True)
+
+    asyncio.run(run())
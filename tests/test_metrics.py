@@ -0,0 +1,49 @@
+"""Per-scale and project-wide request metrics."""
+from __future__ import annotations
+
+import asyncio
+
+import aiohttp
+
+from fake_tuya import ACCESS_ID, ACCESS_KEY, FakeTuyaCloud, make_history
+
+from intelar_scale.api import AsyncTuyaSmartScaleAPI, TuyaToken
+from intelar_scale.metrics import ApiMetrics
+
+
+def test_scale_metrics_count_own_requests() -> None:
+    async def run() -> None:
+        cloud = FakeTuyaCloud(
+            [
+                make_history("device0", users=1, records_per_user=2),
+                make_history("device1", users=3, records_per_user=2),
+            ]
+        )
+        url = await cloud.start()
+        project = ApiMetrics()
+        token = TuyaToken()
+        try:
+            async with aiohttp.ClientSession() as session:
+                clients = []
+                for device_id in ("device0", "device1"):
+                    client = AsyncTuyaSmartScaleAPI(
+                        session, ACCESS_ID, ACCESS_KEY, device_id, token=token, metrics=project
+                    )
+                    client.endpoint = url
+                    await client.get_latest_data()
+                    clients.append(client)
+        finally:
+            await cloud.stop()
+
+        first, second = clients
+        # device0 also fetched the shared token; each scale posts one analysis per user.
+        assert first.metrics.endpoints["token"].requests == 1
+        assert "token" not in second.metrics.endpoints
+        assert first.metrics.endpoints["analysis-reports"].requests == 1
+        assert second.metrics.endpoints["analysis-reports"].requests == 3
+        assert second.metrics.cache_misses == 3
+        assert project.requests == first.metrics.requests + second.metrics.requests
+        assert project.cache_misses == first.metrics.cache_misses + second.metrics.cache_misses
+        assert project.token_refreshes == 1
+
+    asyncio.run(run())
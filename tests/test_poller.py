@@ -0,0 +1,69 @@
+"""Scheduling of per-scale polls by the project poller."""
+from __future__ import annotations
+
+import asyncio
+from datetime import timedelta
+from pathlib import Path
+from types import SimpleNamespace
+
+from homeassistant.core import HomeAssistant
+
+from intelar_scale.const import PUSH_RETRY_DELAY
+from intelar_scale.poller import ProjectPoller
+from intelar_scale.scheduler import AdaptivePollScheduler
+
+BASE_INTERVAL = 300
+MAX_INTERVAL = 3600
+
+
+def _coordinator(
+    seconds: float, *, success: bool = True, throttled: bool = False, disable_polling: bool = False
+):
+    return SimpleNamespace(
+        api=SimpleNamespace(device_id="device0"),
+        scheduler=AdaptivePollScheduler(BASE_INTERVAL, MAX_INTERVAL),
+        update_interval=timedelta(seconds=seconds),
+        last_update_success=success,
+        throttled=throttled,
+        config_entry=SimpleNamespace(pref_disable_polling=disable_polling),
+    )
+
+
+def _due_in(config_dir: Path, coordinator) -> float | None:
+    async def run() -> float | None:
+        hass = HomeAssistant(str(config_dir))
+        poller = ProjectPoller(hass, client=None)
+        poller.coordinators["device0"] = coordinator
+        try:
+            poller.async_schedule(coordinator)
+            due = poller._due.get("device0")  # pylint: disable=protected-access
+            return None if due is None else round(due - hass.loop.time())
+        finally:
+            poller.async_stop()
+            await hass.async_stop(force=True)
+
+    return asyncio.run(run())
+
+
+def test_idle_scale_polls_at_max_interval(tmp_path: Path) -> None:
+    assert _due_in(tmp_path, _coordinator(BASE_INTERVAL * 2)) == MAX_INTERVAL
+
+
+def test_short_intervals_are_kept(tmp_path: Path) -> None:
+    # The fast interval after a weigh-in and the re-check of a pushed one.
+    assert _due_in(tmp_path, _coordinator(60)) == 60
+    assert _due_in(tmp_path, _coordinator(PUSH_RETRY_DELAY)) == PUSH_RETRY_DELAY
+
+
+def test_retry_interval_kept_after_errors(tmp_path: Path) -> None:
+    assert _due_in(tmp_path, _coordinator(BASE_INTERVAL * 2, success=False)) == BASE_INTERVAL * 2
+
+
+def test_breaker_cooldown_kept_after_a_throttled_poll(tmp_path: Path) -> None:
+    # A throttled poll keeps the last data, so it still counts as a success.
+    cooldown = BASE_INTERVAL * 2
+    assert _due_in(tmp_path, _coordinator(cooldown, throttled=True)) == cooldown
+
+
+def test_disabled_polling_is_not_scheduled(tmp_path: Path) -> None:
+    assert _due_in(tmp_path, _coordinator(60, disable_polling=True)) is None
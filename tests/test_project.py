@@ -0,0 +1,58 @@
+"""Shared per-project state of Tuya cloud projects."""
+from __future__ import annotations
+
+import asyncio
+from pathlib import Path
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+
+from intelar_scale.const import (
+    CONF_ACCESS_ID,
+    CONF_ACCESS_KEY,
+    CONF_DEVICE_ID,
+    CONF_POOL_SIZE,
+    CONF_REGION,
+    DOMAIN,
+)
+from intelar_scale.project import async_get_project, async_release_project
+
+
+def _entry(device_id: str, pool_size: int) -> ConfigEntry:
+    return ConfigEntry(
+        version=1,
+        minor_version=2,
+        domain=DOMAIN,
+        title=device_id,
+        data={
+            CONF_ACCESS_ID: "access",
+            CONF_ACCESS_KEY: "secret",
+            CONF_DEVICE_ID: device_id,
+            CONF_REGION: "eu",
+        },
+        source="user",
+        options={CONF_POOL_SIZE: pool_size},
+    )
+
+
+def test_pool_is_sized_by_option_and_closed_with_the_last_entry(tmp_path: Path) -> None:
+    async def run() -> None:
+        hass = HomeAssistant(str(tmp_path))
+        try:
+            first, second = _entry("device0", 2), _entry("device1", 8)
+            project = async_get_project(hass, first)
+            assert async_get_project(hass, second) is project
+            assert project.session.connector.limit == 2
+            client = project.create_client("device0", "1990-01-01", 1)
+            assert client._session is project.session  # pylint: disable=protected-access
+
+            async_release_project(hass, first)
+            await hass.async_block_till_done()
+            assert not project.session.closed
+            async_release_project(hass, second)
+            await hass.async_block_till_done()
+            assert project.session.closed
+        finally:
+            await hass.async_stop(force=True)
+
+    asyncio.run(run())
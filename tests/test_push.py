@@ -0,0 +1,114 @@
+"""Message service push updates, driven through the fake Pulsar broker."""
+from __future__ import annotations
+
+import asyncio
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+import aiohttp
+from homeassistant.core import HomeAssistant
+
+from fake_pulsar import FakePulsarBroker, weigh_in
+from fake_tuya import ACCESS_ID, ACCESS_KEY, FakeTuyaCloud, make_history
+
+from intelar_scale import coordinator as coordinator_module
+from intelar_scale.api import AsyncTuyaSmartScaleAPI
+from intelar_scale.const import PUSH_POLL_INTERVAL
+from intelar_scale.coordinator import IntelarScaleDataCoordinator
+from intelar_scale.push import TuyaMessageListener
+
+DEVICE_ID = "device0"
+
+
+async def _until(condition, timeout: float = 5.0) -> None:
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        await asyncio.sleep(0.01)
+
+
+def test_events_are_decrypted_acknowledged_and_routed_by_device() -> None:
+    async def run() -> None:
+        broker = FakePulsarBroker()
+        url = await broker.start()
+        try:
+            async with aiohttp.ClientSession() as session:
+                listener = TuyaMessageListener(session, ACCESS_ID, ACCESS_KEY, "us", url)
+                events: list[dict] = []
+                listener.add_listener(DEVICE_ID, events.append)
+                task = asyncio.create_task(listener.run())
+                await asyncio.wait_for(listener.connected.wait(), 5)
+
+                status = [{"code": "weight", "value": "70.5"}]
+                first = await broker.publish(DEVICE_ID, status)
+                second = await broker.publish(DEVICE_ID, status, encryption="aes_gcm")
+                other = await broker.publish("device1", status)
+                await _until(lambda: listener.messages == 3)
+                assert [event["status"] for event in events] == [status, status]
+                assert all(event["devId"] == DEVICE_ID for event in events)
+                await _until(lambda: len(broker.acks) == 3)
+                assert set(broker.acks) == {first, second, other}
+                task.cancel()
+        finally:
+            await broker.stop()
+
+    asyncio.run(run())
+
+
+def test_wrong_credentials_are_rejected() -> None:
+    async def run() -> None:
+        broker = FakePulsarBroker()
+        url = await broker.start()
+        try:
+            async with aiohttp.ClientSession() as session:
+                listener = TuyaMessageListener(session, ACCESS_ID, "x" * 32, "us", url)
+                task = asyncio.create_task(listener.run())
+                await _until(lambda: broker.rejected)
+                assert not listener.connected.is_set()
+                task.cancel()
+        finally:
+            await broker.stop()
+
+    asyncio.run(run())
+
+
+def test_pushed_weigh_in_refreshes_the_coordinator(tmp_path: Path, monkeypatch) -> None:
+    monkeypatch.setattr(coordinator_module, "PUSH_REFRESH_DELAY", 0)
+
+    async def run() -> None:
+        now_ms = int(time.time() * 1000) - 3_600_000
+        device = make_history(DEVICE_ID, users=2, records_per_user=3, now_ms=now_ms)
+        cloud = FakeTuyaCloud([device])
+        broker = FakePulsarBroker()
+        hass = HomeAssistant(str(tmp_path))
+        try:
+            api_url, broker_url = await cloud.start(), await broker.start()
+            async with aiohttp.ClientSession() as session:
+                api = AsyncTuyaSmartScaleAPI(session, ACCESS_ID, ACCESS_KEY, DEVICE_ID)
+                api.endpoint = api_url
+                coordinator = IntelarScaleDataCoordinator(hass, api)
+                await coordinator.async_refresh()
+
+                listener = TuyaMessageListener(session, ACCESS_ID, ACCESS_KEY, "us", broker_url)
+                project = SimpleNamespace(push=listener, async_subscribe_push=listener.add_listener)
+                disable = coordinator.async_enable_push(project)
+                task = asyncio.create_task(listener.run())
+                await asyncio.wait_for(listener.connected.wait(), 5)
+
+                record = dict(device.records[0], id="pushed", wegith="61.3", create_time=now_ms + 1000)
+                await weigh_in(cloud, broker, DEVICE_ID, record)
+                await _until(lambda: coordinator.data["user0"]["create_time"] == now_ms + 1000)
+                assert coordinator.push_events == 1
+                assert coordinator.snapshots["user0"]["weight"] == 61.3
+                # Connected push slows polling down to the safety net.
+                assert coordinator.update_interval.total_seconds() == PUSH_POLL_INTERVAL
+
+                disable()
+                task.cancel()
+        finally:
+            await broker.stop()
+            await cloud.stop()
+            await hass.async_stop(force=True)
+
+    asyncio.run(run())
@@ -0,0 +1,137 @@
+"""Project request budget, circuit breaker and request retries."""
+from __future__ import annotations
+
+import asyncio
+import time
+
+import aiohttp
+import pytest
+
+from fake_tuya import ACCESS_ID, ACCESS_KEY, FakeTuyaCloud, FakeTuyaConfig, make_history
+
+from intelar_scale import api as api_module
+from intelar_scale.api import AsyncTuyaSmartScaleAPI, TuyaToken
+from intelar_scale.const import BREAKER_BASE_COOLDOWN, REQUEST_MAX_ATTEMPTS
+from intelar_scale.exceptions import (
+    TuyaCircuitOpenError,
+    TuyaRateLimitError,
+    TuyaTokenInvalidError,
+    TuyaTransientError,
+)
+from intelar_scale.ratelimit import RateBudget
+
+DEVICE_ID = "device0"
+
+
+def test_token_bucket_spaces_requests_after_the_burst() -> None:
+    async def run() -> float:
+        budget = RateBudget(rate=20, burst=2)
+        start = time.monotonic()
+        for _ in range(4):
+            await budget.acquire()
+        return time.monotonic() - start
+
+    # Two requests go out at once, the next two wait 1/rate each.
+    assert 0.08 <= asyncio.run(run()) < 0.5
+
+
+def test_breaker_fails_fast_and_backs_off_until_a_success() -> None:
+    async def run() -> None:
+        budget = RateBudget()
+        assert budget.throttled() == BREAKER_BASE_COOLDOWN
+        with pytest.raises(TuyaCircuitOpenError) as err:
+            await budget.acquire()
+        assert 0 < err.value.retry_after <= BREAKER_BASE_COOLDOWN
+        assert budget.throttled() == 2 * BREAKER_BASE_COOLDOWN
+        # A Retry-After longer than the back-off wins.
+        assert budget.throttled(retry_after=10_000) == 10_000
+        budget.succeeded()
+        assert budget.throttled() == BREAKER_BASE_COOLDOWN
+
+    asyncio.run(run())
+
+
+async def _client(session: aiohttp.ClientSession, url: str, **kwargs) -> AsyncTuyaSmartScaleAPI:
+    api = AsyncTuyaSmartScaleAPI(session, ACCESS_ID, ACCESS_KEY, DEVICE_ID, **kwargs)
+    api.endpoint = url
+    return api
+
+
+def test_throttled_project_stops_sending_requests() -> None:
+    async def run() -> None:
+        cloud = FakeTuyaCloud(
+            [make_history(DEVICE_ID, users=1, records_per_user=1)],
+            FakeTuyaConfig(rate_limit=0.01, rate_burst=2),
+        )
+        url = await cloud.start()
+        try:
+            async with aiohttp.ClientSession() as session:
+                budget = RateBudget()
+                api = await _client(session, url, budget=budget)
+                await api.get_access_token()
+                await api.get_device_info()
+                with pytest.raises(TuyaRateLimitError):
+                    await api.get_device_info()
+                sent = sum(cloud.requests.values())
+                # Every client of the project now fails fast without a request.
+                other = await _client(session, url, budget=budget, token=api.token)
+                with pytest.raises(TuyaCircuitOpenError):
+                    await other.get_device_info()
+                assert sum(cloud.requests.values()) == sent
+        finally:
+            await cloud.stop()
+
+    asyncio.run(run())
+
+
+def test_rejected_token_does_not_discard_a_newer_one() -> None:
+    async def run() -> None:
+        cloud = FakeTuyaCloud([make_history(DEVICE_ID, users=1, records_per_user=1)])
+        url = await cloud.start()
+        try:
+            async with aiohttp.ClientSession() as session:
+                token = TuyaToken()
+                api = await _client(session, url, token=token)
+                other = await _client(session, url, token=token)
+                stale = await api.get_access_token()
+                cloud.tokens.pop(stale)
+                send = api._send  # pylint: disable=protected-access
+
+                async def racing_send(*args):
+                    try:
+                        return await send(*args)
+                    except TuyaTokenInvalidError:
+                        # Another scale renews the token while this request fails.
+                        await other.async_refresh_token()
+                        raise
+
+                api._send = racing_send  # pylint: disable=protected-access
+                cloud.reset_counters()
+                await api.get_device_info()
+                # Only the other scale's renewal; the retry reuses its token.
+                assert cloud.requests["token"] == 1
+                assert cloud.requests["devices"] == 2
+        finally:
+            await cloud.stop()
+
+    asyncio.run(run())
+
+
+def test_token_grants_are_not_retried_inside_request_retries(monkeypatch) -> None:
+    monkeypatch.setattr(api_module, "backoff_delay", lambda attempt: 0)
+
+    async def run() -> None:
+        cloud = FakeTuyaCloud(
+            [make_history(DEVICE_ID, users=1, records_per_user=1)], FakeTuyaConfig(error_rate=1.0)
+        )
+        url = await cloud.start()
+        try:
+            async with aiohttp.ClientSession() as session:
+                api = await _client(session, url)
+                with pytest.raises(TuyaTransientError):
+                    await api.get_device_info()
+                assert cloud.requests == {"token": REQUEST_MAX_ATTEMPTS}
+        finally:
+            await cloud.stop()
+
+    asyncio.run(run())
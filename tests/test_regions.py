@@ -0,0 +1,65 @@
+"""Tuya data centers and the projects keyed by them."""
+from __future__ import annotations
+
+import asyncio
+from pathlib import Path
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+
+from intelar_scale.const import (
+    CONF_ACCESS_ID,
+    CONF_ACCESS_KEY,
+    CONF_DEVICE_ID,
+    CONF_ENDPOINT,
+    CONF_REGION,
+    DOMAIN,
+    REGIONS,
+)
+from intelar_scale.project import async_get_project
+from intelar_scale.push import TuyaMessageListener
+from intelar_scale.regions import region_candidates, region_for_endpoint
+
+
+def test_every_data_center_has_its_own_region() -> None:
+    endpoints = [endpoint for _, endpoint in region_candidates()]
+    assert len(endpoints) == len(set(endpoints)) == len(REGIONS)
+    assert len({data["mq_endpoint"] for data in REGIONS.values()}) == len(REGIONS)
+    assert region_for_endpoint("https://openapi-ueaz.tuyaus.com/") == "us-e"
+    assert region_for_endpoint("https://openapi.example.com") is None
+
+
+def _entry(device_id: str, region: str) -> ConfigEntry:
+    return ConfigEntry(
+        version=1,
+        minor_version=2,
+        domain=DOMAIN,
+        title=device_id,
+        data={
+            CONF_ACCESS_ID: "access",
+            CONF_ACCESS_KEY: "secret",
+            CONF_DEVICE_ID: device_id,
+            CONF_REGION: region,
+            CONF_ENDPOINT: REGIONS[region]["endpoint"],
+        },
+        source="user",
+    )
+
+
+def test_data_centers_of_one_access_id_are_separate_projects(tmp_path: Path) -> None:
+    async def run() -> None:
+        hass = HomeAssistant(str(tmp_path))
+        try:
+            west = async_get_project(hass, _entry("device0", "us"))
+            east = async_get_project(hass, _entry("device1", "us-e"))
+            assert west is not east
+            assert async_get_project(hass, _entry("device2", "us-e")) is east
+            assert east.create_client("device1", "1990-01-01", 1).endpoint == REGIONS["us-e"]["endpoint"]
+            listener = TuyaMessageListener(east.session, "access", "secret", east.region)
+            assert listener.endpoint == REGIONS["us-e"]["mq_endpoint"]
+            for project in (west, east):
+                project.async_shutdown()
+        finally:
+            await hass.async_stop(force=True)
+
+    asyncio.run(run())
@@ -0,0 +1,80 @@
+"""Incremental history sync from the persisted high-water mark."""
+from __future__ import annotations
+
+import asyncio
+import time
+from pathlib import Path
+
+import aiohttp
+from homeassistant.core import HomeAssistant
+
+from fake_tuya import ACCESS_ID, ACCESS_KEY, FakeTuyaCloud, make_history
+
+from intelar_scale.api import AsyncTuyaSmartScaleAPI
+from intelar_scale.coordinator import IntelarScaleDataCoordinator
+
+DEVICE_ID = "device0"
+
+
+def test_polls_only_ask_for_records_after_the_mark() -> None:
+    async def run() -> None:
+        # The newest weigh-in was an hour ago, so a later one is still in the past.
+        device = make_history(
+            DEVICE_ID, users=2, records_per_user=3, now_ms=int(time.time() * 1000) - 3_600_000
+        )
+        cloud = FakeTuyaCloud([device])
+        url = await cloud.start()
+        try:
+            async with aiohttp.ClientSession() as session:
+                api = AsyncTuyaSmartScaleAPI(session, ACCESS_ID, ACCESS_KEY, DEVICE_ID)
+                api.endpoint = url
+                assert sorted(await api.get_latest_data()) == ["user0", "user1"]
+                mark = api.high_water_mark
+                assert mark == device.records[0]["create_time"]
+
+                # Nothing newer: one history request, no analyses, no users.
+                cloud.reset_counters()
+                assert await api.get_latest_data(["user0", "user1"]) == {}
+                assert cloud.requests == {"datas/history": 1}
+                assert api.high_water_mark == mark
+
+                record = dict(device.records[0], id="new", create_time=mark + 1000)
+                device.records.insert(0, record)
+                cloud.reset_counters()
+                assert list(await api.get_latest_data(["user0", "user1"])) == [record["user_id"]]
+                assert api.high_water_mark == mark + 1000
+                assert cloud.requests["datas/history"] == 1
+        finally:
+            await cloud.stop()
+
+    asyncio.run(run())
+
+
+def test_mark_survives_a_restart(tmp_path: Path) -> None:
+    async def run() -> None:
+        cloud = FakeTuyaCloud([make_history(DEVICE_ID, users=2, records_per_user=3)])
+        url = await cloud.start()
+        try:
+            async with aiohttp.ClientSession() as session:
+                hass = HomeAssistant(str(tmp_path))
+                api = AsyncTuyaSmartScaleAPI(session, ACCESS_ID, ACCESS_KEY, DEVICE_ID)
+                api.endpoint = url
+                coordinator = IntelarScaleDataCoordinator(hass, api)
+                await coordinator.async_load()
+                await coordinator.async_refresh()
+                mark = api.high_water_mark
+                # Stopping flushes the delayed save of the coordinator's store.
+                await hass.async_stop(force=True)
+
+                hass = HomeAssistant(str(tmp_path))
+                api = AsyncTuyaSmartScaleAPI(session, ACCESS_ID, ACCESS_KEY, DEVICE_ID)
+                api.endpoint = url
+                coordinator = IntelarScaleDataCoordinator(hass, api)
+                await coordinator.async_load()
+                assert api.high_water_mark == mark
+                assert sorted(coordinator.data) == ["user0", "user1"]
+                await hass.async_stop(force=True)
+        finally:
+            await cloud.stop()
+
+    asyncio.run(run())
@@ -0,0 +1,65 @@
+"""On-disk measurement rows and their in-memory columns."""
+from __future__ import annotations
+
+import asyncio
+from pathlib import Path
+
+from homeassistant.core import HomeAssistant
+
+from intelar_scale.const import MEASUREMENT_FIELDS
+from intelar_scale.timeseries import ROW, MeasurementStore, UserSeries
+
+DEVICE_ID = "device0"
+
+
+def _record(create_time: int, weight: str, user_id: str = "user0") -> dict:
+    return {"user_id": user_id, "create_time": create_time, "wegith": weight, "body_r": "500"}
+
+
+def test_rows_are_sorted_and_the_first_per_time_wins() -> None:
+    nan = float("nan")
+    padding = (nan,) * (len(MEASUREMENT_FIELDS) - 1)
+    series = UserSeries.from_rows([(3, 3.0, *padding), (1, 1.0, *padding), (3, 9.0, *padding)])
+    assert list(series.times) == [1, 3]
+    assert list(series.column("weight")) == [1.0, 3.0]
+    assert not series.insert(3, (9.0, *padding))
+    assert series.insert(2, (2.0, *padding))
+    assert series.index_since(2) == 1
+    assert [row["weight"] for row in series.last(2)] == [2.0, 3.0]
+
+
+def test_store_appends_rows_and_reloads_them(tmp_path: Path) -> None:
+    async def run() -> None:
+        hass = HomeAssistant(str(tmp_path))
+        try:
+            store = MeasurementStore(hass, DEVICE_ID)
+            await store.async_load()
+            added = await store.async_add_records(
+                [_record(2000, "70.1"), _record(1000, "70.4"), _record(2000, "99.0")]
+            )
+            assert added == 2
+            assert await store.async_add_records([_record(1000, "70.4"), {"user_id": "user0"}]) == 0
+            await store.async_add_records([_record(1500, "65.2", "user1")])
+
+            path = next(Path(hass.config.path(".storage")).rglob("device0.user0.bin"))
+            assert path.stat().st_size == 2 * ROW.size
+            # A write cut short leaves a partial row, which loading ignores.
+            with open(path, "ab") as file:
+                file.write(b"\0" * (ROW.size // 2))
+
+            reloaded = MeasurementStore(hass, DEVICE_ID)
+            await reloaded.async_load()
+            rows = reloaded.get("user0").last(5)
+            assert [(row["create_time"], row["weight"]) for row in rows] == [
+                (1000, 70.4),
+                (2000, 70.1),
+            ]
+            assert rows[0]["body_fat"] is None
+
+            await reloaded.async_remove_user("user0")
+            assert reloaded.get("user0") is None and not path.exists()
+            assert len(reloaded.get("user1")) == 1
+        finally:
+            await hass.async_stop(force=True)
+
+    asyncio.run(run())
@@ -0,0 +1,60 @@
+"""Shared token storage and its background renewal."""
+from __future__ import annotations
+
+import asyncio
+from pathlib import Path
+
+import pytest
+from homeassistant.core import HomeAssistant
+
+import fake_tuya
+from fake_tuya import ACCESS_ID, ACCESS_KEY, FakeTuyaCloud, make_history
+
+from intelar_scale import project as project_module
+from intelar_scale.api import _TuyaSmartScaleBase
+from intelar_scale.const import TOKEN_REFRESH_LEAD, TOKEN_REFRESH_RETRY
+from intelar_scale.exceptions import TuyaApiError
+from intelar_scale.project import TuyaProject
+
+
+@pytest.mark.parametrize("expire_time", [None, 0, "7200"])
+def test_token_without_a_lifetime_is_rejected(expire_time) -> None:
+    base = _TuyaSmartScaleBase(ACCESS_ID, ACCESS_KEY, "device0")
+    result = {"access_token": "token", "refresh_token": "refresh"}
+    if expire_time is not None:
+        result["expire_time"] = expire_time
+    with pytest.raises(TuyaApiError):
+        base._store_token({"result": result})  # pylint: disable=protected-access
+    assert base.access_token is None
+
+
+@pytest.mark.parametrize(
+    ("ttl", "expected"),
+    [(7200, 7200 - TOKEN_REFRESH_LEAD), (TOKEN_REFRESH_LEAD // 2, TOKEN_REFRESH_RETRY)],
+)
+def test_renewal_is_scheduled_no_sooner_than_the_retry_delay(
+    tmp_path: Path, monkeypatch, ttl: int, expected: int
+) -> None:
+    delays: list[float] = []
+
+    def fake_call_later(_hass, delay, _action):
+        delays.append(delay)
+        return lambda: None
+
+    monkeypatch.setattr(project_module, "async_call_later", fake_call_later)
+    monkeypatch.setattr(fake_tuya, "TOKEN_TTL", ttl)
+
+    async def run() -> None:
+        hass = HomeAssistant(str(tmp_path))
+        cloud = FakeTuyaCloud([make_history("device0", users=1, records_per_user=1)])
+        url = await cloud.start()
+        project = TuyaProject(hass, ACCESS_ID, ACCESS_KEY, "us", url)
+        try:
+            await project.create_client("device0", "1990-01-01", 1).get_access_token()
+        finally:
+            project.async_shutdown()
+            await cloud.stop()
+            await hass.async_stop(force=True)
+
+    asyncio.run(run())
+    assert delays and delays[-1] == pytest.approx(expected, abs=2)
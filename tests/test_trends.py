@@ -0,0 +1,45 @@
+"""Rolling trend windows over the measurement store."""
+from __future__ import annotations
+
+import math
+
+from intelar_scale.trends import DAY_MS, WEEK_MS, RollingWindow, UserTrends
+
+NOW = 1_700_000_000_000
+
+
+def test_window_mean_and_slope_follow_the_samples() -> None:
+    window = RollingWindow(7 * DAY_MS)
+    for day in range(10):
+        window.add(NOW + day * DAY_MS, 70.0 + day * 0.1)
+    # Only days 3..9 are within seven days of the newest sample.
+    assert len(window.samples) == 7
+    assert math.isclose(window.mean(), 70.6)
+    assert math.isclose(window.slope() * WEEK_MS, 0.7)
+
+
+def test_windows_end_now_rather_than_at_the_last_weigh_in() -> None:
+    trends = UserTrends()
+    for day in range(5):
+        trends.add(NOW + day * DAY_MS, 80.0 - day * 0.2, 25.0)
+    last = NOW + 4 * DAY_MS
+
+    values = trends.values(last)
+    assert values["weight_avg_7d"] == 79.6
+    assert values["weight_change_rate"] == -1.4
+
+    # Ten days later the 7-day window is empty; the 30-day one is not.
+    values = trends.values(last + 10 * DAY_MS)
+    assert values["weight_avg_7d"] is None
+    assert values["weight_avg_30d"] == 79.6
+    assert values["weight_smoothed"] is not None
+
+    values = trends.values(last + 40 * DAY_MS)
+    assert values["weight_avg_30d"] is None
+    assert values["weight_change_rate"] is None
+    assert values["body_fat_trend"] is None
+
+    # A new weigh-in refills the windows from scratch.
+    trends.add(last + 41 * DAY_MS, 78.0, 24.0)
+    values = trends.values(last + 41 * DAY_MS)
+    assert values["weight_avg_7d"] == values["weight_avg_30d"] == 78.0
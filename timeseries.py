@@ -0,0 +1,180 @@
+"""Compact local time-series store of scale measurements."""
+from __future__ import annotations
+
+import asyncio
+import logging
+import math
+import os
+import struct
+from array import array
+from bisect import bisect_left
+from pathlib import Path
+from typing import Any, Dict, Iterable, List
+
+from homeassistant.core import HomeAssistant
+from homeassistant.util import slugify
+
+from .const import MEASUREMENT_FIELDS, TIMESERIES_DIR
+from .snapshot import FIELD_RESOLVERS
+
+_LOGGER = logging.getLogger(__name__)
+
+# One fixed-width little-endian row per measurement: create_time (ms), then a
+# float32 per field with NaN for "not measured".
+ROW = struct.Struct("<q" + "f" * len(MEASUREMENT_FIELDS))
+
+
+class UserSeries:
+    """Column arrays for one (device, user), sorted and unique by create_time."""
+
+    def __init__(self) -> None:
+        self.times = array("q")
+        self.columns: Dict[str, array] = {field: array("f") for field in MEASUREMENT_FIELDS}
+
+    def __len__(self) -> int:
+        return len(self.times)
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[tuple]) -> UserSeries:
+        """Build a series from ``(create_time, *values)`` rows in any order.
+
+        Rows are sorted once; like :meth:`insert`, the first row read for a
+        create_time wins.
+        """
+
+        series = cls()
+        previous = None
+        for create_time, *values in sorted(rows, key=lambda row: row[0]):
+            if create_time == previous:
+                continue
+            previous = create_time
+            series.times.append(create_time)
+            for column, value in zip(series.columns.values(), values):
+                column.append(value)
+        return series
+
+    def insert(self, create_time: int, values: Iterable[float]) -> bool:
+        """Insert a row; return False if a row with this create_time already exists."""
+
+        index = bisect_left(self.times, create_time)
+        if index < len(self.times) and self.times[index] == create_time:
+            return False
+        self.times.insert(index, create_time)
+        for column, value in zip(self.columns.values(), values):
+            column.insert(index, value)
+        return True
+
+    def index_since(self, start_time: int) -> int:
+        """Return the index of the first row at or after ``start_time``."""
+
+        return bisect_left(self.times, start_time)
+
+    def column(self, field: str, start: int = 0) -> array:
+        return self.columns[field][start:]
+
+    def last(self, count: int) -> List[Dict[str, Any]]:
+        """Return the newest ``count`` rows as dicts, oldest first; NaN is None.
+
+        Values are float32 on disk, so they are rounded back to 6 significant
+        digits instead of exposing artefacts like 65.0999984741211.
+        """
+
+        rows = []
+        for index in range(max(len(self.times) - count, 0), len(self.times)):
+            row: Dict[str, Any] = {"create_time": self.times[index]}
+            for field, column in self.columns.items():
+                value = column[index]
+                row[field] = None if math.isnan(value) else float(f"{value:.6g}")
+            rows.append(row)
+        return rows
+
+
+class MeasurementStore:
+    """Append-only on-disk rows plus in-memory columns for every user of a device.
+
+    Each user's rows live in ``.storage/intelar_scale_timeseries/<device>.<user>.bin``
+    as fixed-width records, so loading is a single read and appending a
+    weigh-in is a single write of ``ROW.size`` bytes. Appends and removals
+    run on the executor one at a time, so concurrent polls and backfills
+    never interleave rows in a file.
+    """
+
+    def __init__(self, hass: HomeAssistant, device_id: str) -> None:
+        self.hass = hass
+        self.device_id = device_id
+        self.series: Dict[str, UserSeries] = {}
+        self._directory = Path(hass.config.path(".storage", TIMESERIES_DIR))
+        self._prefix = f"{slugify(device_id)}."
+        self._write_lock = asyncio.Lock()
+
+    def _path(self, user_id: str) -> Path:
+        return self._directory / f"{self._prefix}{slugify(user_id)}.bin"
+
+    async def async_load(self) -> None:
+        self.series = await self.hass.async_add_executor_job(self._load)
+
+    def _load(self) -> Dict[str, UserSeries]:
+        series: Dict[str, UserSeries] = {}
+        if not self._directory.is_dir():
+            return series
+        for path in self._directory.glob(f"{self._prefix}*.bin"):
+            user_id = path.name[len(self._prefix) : -len(".bin")]
+            data = path.read_bytes()
+            usable = len(data) - len(data) % ROW.size
+            series[user_id] = UserSeries.from_rows(ROW.iter_unpack(data[:usable]))
+        return series
+
+    def get(self, user_id: str) -> UserSeries | None:
+        return self.series.get(slugify(user_id))
+
+    async def async_add_records(self, records: Iterable[Dict[str, Any]]) -> int:
+        """Add new measurements, skipping duplicates; return how many were added."""
+
+        pending: Dict[str, bytearray] = {}
+        for record in records:
+            user_id = record.get("user_id")
+            try:
+                create_time = int(record.get("create_time") or 0)
+            except (TypeError, ValueError):
+                continue
+            if not user_id or not create_time:
+                continue
+            values = [_as_float(FIELD_RESOLVERS[field](record)) for field in MEASUREMENT_FIELDS]
+            key = slugify(user_id)
+            if self.series.setdefault(key, UserSeries()).insert(create_time, values):
+                pending.setdefault(user_id, bytearray()).extend(ROW.pack(create_time, *values))
+
+        if pending:
+            async with self._write_lock:
+                await self.hass.async_add_executor_job(self._append, pending)
+        return sum(len(rows) // ROW.size for rows in pending.values())
+
+    def _append(self, pending: Dict[str, bytearray]) -> None:
+        os.makedirs(self._directory, exist_ok=True)
+        for user_id, rows in pending.items():
+            with open(self._path(user_id), "ab") as file:
+                file.write(rows)
+
+    async def async_remove_user(self, user_id: str) -> None:
+        """Forget a user's measurements and delete their file."""
+
+        self.series.pop(slugify(user_id), None)
+        async with self._write_lock:
+            await self.hass.async_add_executor_job(self._path(user_id).unlink, True)
+
+    async def async_remove(self) -> None:
+        """Delete the files of every user of the device."""
+
+        self.series = {}
+        async with self._write_lock:
+            await self.hass.async_add_executor_job(self._remove_files)
+
+    def _remove_files(self) -> None:
+        if not self._directory.is_dir():
+            return
+        for path in self._directory.glob(f"{self._prefix}*.bin"):
+            path.unlink(missing_ok=True)
+
+
+def _as_float(value: Any) -> float:
+    return value if isinstance(value, float) else math.nan
@@ -0,0 +1,22 @@
+"""Import the integration as the ``intelar_scale`` package from a source checkout."""
+from __future__ import annotations
+
+import importlib.util
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+PACKAGE = "intelar_scale"
+
+
+def load_integration() -> None:
+    """Register the repository root as the ``intelar_scale`` package."""
+
+    if PACKAGE in sys.modules:
+        return
+    spec = importlib.util.spec_from_file_location(
+        PACKAGE, ROOT / "__init__.py", submodule_search_locations=[str(ROOT)]
+    )
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[PACKAGE] = module
+    spec.loader.exec_module(module)
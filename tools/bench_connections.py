@@ -0,0 +1,145 @@
+"""Count the new TCP connections each poll opens against the offline fake cloud.
+
+Every poll forces a token grant, reads one history page and requests an
+analysis report for each user with a cold cache, so it makes ``users + 2``
+requests. The fake cloud records the client connections those requests
+arrived on; connections not seen in an earlier poll are new ones. Three
+transports are compared:
+
+* ``per-call``  module-level ``requests.get``/``requests.post``, a new
+  connection (and, against the real cloud, a TLS handshake) per request
+* ``session``   one ``requests.Session`` with a sized keep-alive pool
+* ``aiohttp``   the integration's ``AsyncTuyaSmartScaleAPI`` on an
+  ``aiohttp.ClientSession`` with a ``DEFAULT_POOL_SIZE`` connector, like the
+  session a Tuya project owns
+
+Example: ``python tools/bench_connections.py --users 5 --polls 3``
+
+Needs ``requests`` in addition to the integration's dependencies.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import sys
+from pathlib import Path
+from typing import Any, Callable
+
+import aiohttp
+import requests
+from requests.adapters import HTTPAdapter
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from _integration import load_integration  # noqa: E402
+from fake_tuya import ACCESS_ID, ACCESS_KEY, FakeTuyaCloud, make_history  # noqa: E402
+
+load_integration()
+
+from intelar_scale.api import (  # noqa: E402
+    AsyncTuyaSmartScaleAPI,
+    _TuyaSmartScaleBase,
+)
+from intelar_scale.cache import AnalysisReportCache  # noqa: E402
+from intelar_scale.const import (  # noqa: E402
+    ANALYSIS_CACHE_SIZE,
+    DEFAULT_POOL_SIZE,
+    HISTORY_PAGE_SIZE,
+    REQUEST_TIMEOUT,
+)
+
+DEVICE_ID = "device0"
+
+
+def _blocking_poll(base: _TuyaSmartScaleBase, send: Callable[..., requests.Response]) -> None:
+    """Run the requests of one cold poll through ``send``, a ``request(method, url)`` callable."""
+
+    def call(method: str, url: str, headers: dict[str, str], body: str | None = None) -> Any:
+        response = send(method, url, headers=headers, data=body, timeout=REQUEST_TIMEOUT)
+        return base._check_response(method, url, response.json())  # pylint: disable=protected-access
+
+    url, headers = base._token_request()  # pylint: disable=protected-access
+    token = base._store_token(call("GET", url, headers))  # pylint: disable=protected-access
+
+    path = base._history_path()  # pylint: disable=protected-access
+    params = base._history_params(1, HISTORY_PAGE_SIZE, None, None)  # pylint: disable=protected-access
+    url, headers = base._signed_request("GET", path, token, params=params)  # pylint: disable=protected-access
+    latest: dict[str, dict[str, Any]] = {}
+    for record in call("GET", url, headers)["result"]["records"]:
+        latest.setdefault(record["user_id"], record)
+
+    path = base._analysis_path()  # pylint: disable=protected-access
+    for record in latest.values():
+        key = (float(record["height"]), float(record["wegith"]), 30, 1, record["body_r"])
+        body = json.dumps(base._analysis_body(key), separators=(",", ":"))  # pylint: disable=protected-access
+        url, headers = base._signed_request("POST", path, token, body=body)  # pylint: disable=protected-access
+        call("POST", url, headers, body)
+
+
+async def _measure(cloud: FakeTuyaCloud, polls: int, poll: Callable[[], Any]) -> list[tuple[int, int]]:
+    rows = []
+    seen: set[tuple[str, int]] = set()
+    for _ in range(polls):
+        cloud.reset_counters()
+        await poll()
+        rows.append((sum(cloud.requests.values()), len(cloud.connections - seen)))
+        seen |= cloud.connections
+    return rows
+
+
+async def _main(args: argparse.Namespace) -> None:
+    cloud = FakeTuyaCloud([make_history(DEVICE_ID, args.users, args.records)])
+    url = await cloud.start()
+    results: dict[str, list[tuple[int, int]]] = {}
+    try:
+        base = _TuyaSmartScaleBase(ACCESS_ID, ACCESS_KEY, DEVICE_ID)
+        base.endpoint = url
+
+        async def per_call() -> None:
+            base.token.invalidate(base.access_token)
+            await asyncio.to_thread(_blocking_poll, base, requests.request)
+
+        results["per-call"] = await _measure(cloud, args.polls, per_call)
+
+        with requests.Session() as session:
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=DEFAULT_POOL_SIZE)
+            session.mount("http://", adapter)
+
+            async def pooled() -> None:
+                base.token.invalidate(base.access_token)
+                await asyncio.to_thread(_blocking_poll, base, session.request)
+
+            results["session"] = await _measure(cloud, args.polls, pooled)
+
+        connector = aiohttp.TCPConnector(limit=DEFAULT_POOL_SIZE)
+        async with aiohttp.ClientSession(connector=connector) as client_session:
+            client = AsyncTuyaSmartScaleAPI(client_session, ACCESS_ID, ACCESS_KEY, DEVICE_ID)
+            client.endpoint = url
+
+            async def shared() -> None:
+                client.token.invalidate(client.access_token)
+                client.high_water_mark = 0
+                client.analysis_cache = AnalysisReportCache(ANALYSIS_CACHE_SIZE)
+                await client.get_latest_data()
+
+            results["aiohttp"] = await _measure(cloud, args.polls, shared)
+    finally:
+        await cloud.stop()
+
+    print(f"{'transport':<10} {'poll':>4} {'reqs':>5} {'new conns':>9}")
+    for transport, rows in results.items():
+        for index, (request_count, connections) in enumerate(rows, 1):
+            print(f"{transport:<10} {index:>4} {request_count:>5} {connections:>9}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=5)
+    parser.add_argument("--records", type=int, default=3, help="history records per user")
+    parser.add_argument("--polls", type=int, default=3)
+    asyncio.run(_main(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
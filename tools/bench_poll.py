@@ -0,0 +1,137 @@
+"""Measure requests, bytes and wall time per poll against the offline fake cloud.
+
+Each scenario polls M scales with N users each, concurrently like separate
+coordinators would, through one shared token and rate budget:
+
+* ``cold``  first poll: token grant, full history scan, analysis reports
+* ``idle``  next poll with no new weigh-ins (incremental, usually empty)
+* ``new``   poll after every user weighed in once more
+
+Example: ``python tools/bench_poll.py --users 1 5 10 --devices 1 10 --latency 0.05``
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+import aiohttp
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from _integration import load_integration  # noqa: E402
+from fake_tuya import (  # noqa: E402
+    ACCESS_ID,
+    ACCESS_KEY,
+    FakeTuyaCloud,
+    FakeTuyaConfig,
+    make_history,
+)
+
+load_integration()
+
+from intelar_scale.api import AsyncTuyaSmartScaleAPI, TuyaToken  # noqa: E402
+from intelar_scale.ratelimit import RateBudget  # noqa: E402
+
+ENDPOINTS = ("token", "devices", "datas/history", "analysis-reports")
+
+
+def _add_weigh_ins(cloud: FakeTuyaCloud, users: int) -> None:
+    now_ms = int(time.time() * 1000)
+    for device in cloud.devices.values():
+        fresh = make_history(device.device_id, users, 1, now_ms=now_ms).records
+        for index, rec in enumerate(fresh):
+            rec["id"] += f"-{now_ms}"
+            rec["create_time"] = now_ms - index
+            rec["wegith"] = f"{float(rec['wegith']) + 0.3:.1f}"
+        device.records[:0] = fresh
+
+
+async def _poll(cloud: FakeTuyaCloud, clients: list[AsyncTuyaSmartScaleAPI], known: list[dict]) -> dict:
+    cloud.reset_counters()
+    start = time.perf_counter()
+    results = await asyncio.gather(
+        *(client.get_latest_data(list(users)) for client, users in zip(clients, known))
+    )
+    elapsed = time.perf_counter() - start
+    for users, result in zip(known, results):
+        users.update(result)
+    return {
+        "requests": sum(cloud.requests.values()),
+        "bytes": sum(cloud.bytes.values()),
+        "ms": elapsed * 1000,
+        "errors": sum(cloud.errors.values()),
+        **{name: cloud.requests[name] for name in ENDPOINTS},
+    }
+
+
+async def run_scenario(args: argparse.Namespace, users: int, devices: int) -> list[tuple[str, dict]]:
+    cloud = FakeTuyaCloud(
+        [make_history(f"device{index}", users, args.records) for index in range(devices)],
+        FakeTuyaConfig(latency=args.latency, error_rate=args.error_rate, rate_limit=args.rate_limit),
+    )
+    url = await cloud.start()
+    token = TuyaToken()
+    budget = RateBudget() if args.budget else None
+    rows: list[tuple[str, dict]] = []
+    try:
+        async with aiohttp.ClientSession() as session:
+            clients = []
+            for device_id in cloud.devices:
+                client = AsyncTuyaSmartScaleAPI(
+                    session, ACCESS_ID, ACCESS_KEY, device_id, token=token, budget=budget
+                )
+                client.endpoint = url
+                clients.append(client)
+            known: list[dict] = [{} for _ in clients]
+
+            rows.append(("cold", await _poll(cloud, clients, known)))
+            rows.append(("idle", await _poll(cloud, clients, known)))
+            _add_weigh_ins(cloud, users)
+            rows.append(("new", await _poll(cloud, clients, known)))
+    finally:
+        await cloud.stop()
+    return rows
+
+
+def _print_header() -> None:
+    print(
+        f"{'users':>5} {'devs':>4} {'poll':<5} {'reqs':>5} {'token':>5} {'hist':>5} "
+        f"{'anal':>5} {'errs':>5} {'bytes':>9} {'wall ms':>9}"
+    )
+
+
+def _print_row(users: int, devices: int, name: str, row: dict) -> None:
+    print(
+        f"{users:>5} {devices:>4} {name:<5} {row['requests']:>5} {row['token']:>5} "
+        f"{row['datas/history']:>5} {row['analysis-reports']:>5} {row['errors']:>5} "
+        f"{row['bytes']:>9} {row['ms']:>9.1f}"
+    )
+
+
+async def _main(args: argparse.Namespace) -> None:
+    _print_header()
+    for devices in args.devices:
+        for users in args.users:
+            for name, row in await run_scenario(args, users, devices):
+                _print_row(users, devices, name, row)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, nargs="+", default=[1, 5, 10])
+    parser.add_argument("--devices", type=int, nargs="+", default=[1, 5])
+    parser.add_argument("--records", type=int, default=30, help="history records per user")
+    parser.add_argument("--latency", type=float, default=0.02, help="seconds per response")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--rate-limit", type=float, default=None, help="fake cloud requests/s")
+    parser.add_argument(
+        "--budget", action="store_true", help="apply the integration's per-project rate budget"
+    )
+    asyncio.run(_main(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
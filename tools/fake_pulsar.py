@@ -0,0 +1,192 @@
+"""Offline stand-in for the Tuya message service (Pulsar over websocket).
+
+Accepts consumers on ``/ws/v2/consumer/persistent/{access_id}/out/{topic}/{subscription}``,
+checks the ``username``/``password`` headers like Tuya does, and publishes
+device events encrypted with the project access key (AES-ECB, or AES-GCM
+with ``encryption="aes_gcm"``). Acknowledgements are counted.
+
+``weigh_in`` adds a record to a ``FakeTuyaCloud`` device and publishes the
+matching report event, which is what a real scale does through the cloud.
+
+Run standalone with ``python tools/fake_pulsar.py --port 8766 --every 20``
+to serve a fake cloud and broker pair that weighs someone in periodically.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import base64
+import hashlib
+import json
+import os
+import time
+import uuid
+from collections import Counter
+from typing import Any
+
+from aiohttp import WSMsgType, web
+from cryptography.hazmat.primitives import padding
+from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+
+from fake_tuya import ACCESS_ID, ACCESS_KEY, FakeTuyaCloud, make_history
+
+
+def encrypt_message(data: str, access_key: str, encryption: str | None = None) -> str:
+    key = access_key[8:24].encode("utf-8")
+    if encryption == "aes_gcm":
+        nonce = os.urandom(12)
+        return base64.b64encode(nonce + AESGCM(key).encrypt(nonce, data.encode("utf-8"), None)).decode()
+    padder = padding.PKCS7(128).padder()
+    plain = padder.update(data.encode("utf-8")) + padder.finalize()
+    encryptor = Cipher(algorithms.AES(key), modes.ECB()).encryptor()  # nosec - Tuya protocol
+    return base64.b64encode(encryptor.update(plain) + encryptor.finalize()).decode()
+
+
+class FakePulsarBroker:
+    """aiohttp websocket server emulating the Tuya message service for one project."""
+
+    def __init__(self, access_id: str = ACCESS_ID, access_key: str = ACCESS_KEY) -> None:
+        self.access_id = access_id
+        self.access_key = access_key
+        self.consumers: list[web.WebSocketResponse] = []
+        self.published: Counter[str] = Counter()
+        self.acks: Counter[str] = Counter()
+        self.rejected = 0
+        self._runner: web.AppRunner | None = None
+        self.url = ""
+
+        self.app = web.Application()
+        self.app.router.add_get(
+            "/ws/v2/consumer/persistent/{access_id}/out/{topic}/{subscription}", self._consume
+        )
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> str:
+        """Start serving and return the base URL to use as the message endpoint."""
+
+        self._runner = web.AppRunner(self.app)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, host, port)
+        await site.start()
+        sockets = site._server.sockets  # pylint: disable=protected-access
+        self.url = f"ws://{host}:{sockets[0].getsockname()[1]}/"
+        return self.url
+
+    async def stop(self) -> None:
+        for ws in list(self.consumers):
+            await ws.close()
+        if self._runner is not None:
+            await self._runner.cleanup()
+
+    def _expected_password(self) -> str:
+        key_md5 = hashlib.md5(self.access_key.encode("utf-8")).hexdigest()
+        return hashlib.md5(f"{self.access_id}{key_md5}".encode("utf-8")).hexdigest()[8:24]
+
+    async def _consume(self, request: web.Request) -> web.StreamResponse:
+        if (
+            request.match_info["access_id"] != self.access_id
+            or request.headers.get("username") != self.access_id
+            or request.headers.get("password") != self._expected_password()
+        ):
+            self.rejected += 1
+            return web.Response(status=401, text="unauthorized")
+
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        self.consumers.append(ws)
+        try:
+            async for message in ws:
+                if message.type == WSMsgType.TEXT:
+                    if message_id := json.loads(message.data).get("messageId"):
+                        self.acks[message_id] += 1
+        finally:
+            self.consumers.remove(ws)
+        return ws
+
+    async def publish(
+        self, device_id: str, status: list[dict[str, Any]], encryption: str | None = None
+    ) -> str:
+        """Send a device status report to every consumer; return the message id."""
+
+        now = int(time.time() * 1000)
+        event = {
+            "dataId": uuid.uuid4().hex,
+            "devId": device_id,
+            "productKey": "fake-scale",
+            "status": status,
+        }
+        payload = {
+            "data": encrypt_message(json.dumps(event), self.access_key, encryption),
+            "protocol": 4,
+            "pv": "2.0",
+            "t": now,
+        }
+        message_id = uuid.uuid4().hex
+        message = {
+            "messageId": message_id,
+            "payload": base64.b64encode(json.dumps(payload).encode("utf-8")).decode(),
+            "properties": {"em": encryption} if encryption else {},
+            "publishTime": now,
+        }
+        for ws in list(self.consumers):
+            await ws.send_json(message)
+        self.published[device_id] += 1
+        return message_id
+
+
+async def weigh_in(
+    cloud: FakeTuyaCloud, broker: FakePulsarBroker, device_id: str, record: dict[str, Any]
+) -> None:
+    """Store ``record`` as the device's newest measurement and push its report event."""
+
+    cloud.devices[device_id].records.insert(0, record)
+    status = [
+        {"code": "weight", "value": record.get("wegith"), "t": record["create_time"]},
+        {"code": "body_r", "value": record.get("body_r"), "t": record["create_time"]},
+    ]
+    await broker.publish(device_id, status)
+
+
+async def _serve(args: argparse.Namespace) -> None:
+    device = make_history("device0", args.users, 30)
+    cloud = FakeTuyaCloud([device])
+    broker = FakePulsarBroker()
+    print(f"Fake Tuya OpenAPI on {await cloud.start(port=args.port - 1)}")
+    print(f"Fake Tuya message service on {await broker.start(port=args.port)}")
+    index = 0
+    while True:
+        await asyncio.sleep(args.every)
+        now = int(time.time() * 1000)
+        user = index % args.users
+        await weigh_in(
+            cloud,
+            broker,
+            device.device_id,
+            {
+                "id": f"push-{index}",
+                "device_id": device.device_id,
+                "user_id": f"user{user}",
+                "nick_name": f"User {user}",
+                "wegith": f"{60 + user * 5 + index % 3 * 0.1:.1f}",
+                "height": str(160 + user * 3),
+                "body_r": str(450 + user * 10),
+                "create_time": now,
+            },
+        )
+        print(f"Published weigh-in {index} for user{user}")
+        index += 1
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--port", type=int, default=8766, help="broker port; the cloud uses port - 1")
+    parser.add_argument("--users", type=int, default=3)
+    parser.add_argument("--every", type=float, default=20.0, help="seconds between weigh-ins")
+    try:
+        asyncio.run(_serve(parser.parse_args()))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,388 @@
+"""Offline stand-in for the parts of the Tuya OpenAPI used by the integration.
+
+The server checks every request signature with the same v2.0 scheme as
+``_sign_request`` and serves:
+
+* ``GET  /v1.0/token?grant_type=1`` and ``GET /v1.0/token/{refresh_token}``
+* ``GET  /v1.0/devices/{device_id}`` (including the LAN ``local_key``)
+* ``GET  /v1.0/iot-03/devices/status?device_ids=...`` (batched status, newest weigh-in DPs)
+* ``GET  /v2.0/cloud/thing/{device_id}/model`` (DP ids, codes and scales)
+* ``GET  /v1.0/scales/{device_id}/datas/history`` (paged, start/end filtered)
+* ``POST /v1.0/scales/{device_id}/analysis-reports``
+
+Latency, transient 5xx errors and a per-project rate limit can be injected,
+and per-endpoint request and byte counts, plus the client connections
+seen, are kept for benchmarks.
+
+Run standalone with ``python tools/fake_tuya.py --port 8765``.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import hashlib
+import hmac
+import json
+import random
+import secrets
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Any
+
+from aiohttp import web
+
+ACCESS_ID = "fake-access-id"
+ACCESS_KEY = "fake0access0key0fake0access0key0"  # 32 chars like a real key
+TOKEN_TTL = 7200
+RATE_LIMIT_CODE = 40000309
+LOCAL_KEY = "0123456789abcdef"
+# Thing model properties of the fake scale: (dp id, code, scale)
+SCALE_DPS = ((1, "weight", 1), (2, "body_r", 0), (3, "height", 0))
+
+
+@dataclass
+class FakeTuyaConfig:
+    """Knobs for the fake cloud."""
+
+    latency: float = 0.0  # seconds added to every response
+    error_rate: float = 0.0  # share of requests answered with HTTP 500
+    rate_limit: float | None = None  # sustained requests/second per project
+    rate_burst: int = 10
+    seed: int = 0
+
+
+@dataclass
+class FakeDevice:
+    device_id: str
+    records: list[dict[str, Any]] = field(default_factory=list)  # newest first
+
+
+def make_history(
+    device_id: str, users: int, records_per_user: int, now_ms: int | None = None
+) -> FakeDevice:
+    """Return a device whose users weighed in once a day, newest record first."""
+
+    now_ms = now_ms or int(time.time() * 1000)
+    records = []
+    for day in range(records_per_user):
+        for index in range(users):
+            records.append(
+                {
+                    "id": f"{device_id}-{day}-{index}",
+                    "device_id": device_id,
+                    "user_id": f"user{index}",
+                    "nick_name": f"User {index}",
+                    "wegith": f"{60 + index * 5 + (day % 7) * 0.1:.1f}",
+                    "height": str(160 + index * 3),
+                    "body_r": str(450 + index * 10 + day % 5),
+                    "create_time": now_ms - day * 86_400_000 - index * 60_000,
+                }
+            )
+    return FakeDevice(device_id, records)
+
+
+def analysis_for(body: dict[str, Any]) -> dict[str, Any]:
+    """Return a deterministic analysis report for an analysis-reports request."""
+
+    height_m = float(body["height"]) / 100
+    weight = float(body["weight"])
+    body_fat = round(10 + float(body["resistance"]) / 50 + int(body["age"]) / 10, 1)
+    return {
+        "bmi": round(weight / (height_m * height_m), 1),
+        "body_fat": body_fat,
+        "ffm": round(weight * (1 - body_fat / 100), 1),
+        "water": round(55 - body_fat / 4, 1),
+        "muscle": round(weight * 0.4, 1),
+        "bones": round(weight * 0.04, 1),
+        "protein": 18.0,
+        "metabolism": int(10 * weight + 6.25 * float(body["height"]) - 5 * int(body["age"])),
+        "visceral_fat": 8,
+        "body_age": int(body["age"]),
+        "body_score": 80,
+        "body_type": 1,
+    }
+
+
+class FakeTuyaCloud:
+    """aiohttp application emulating the Tuya OpenAPI for a single project."""
+
+    def __init__(
+        self,
+        devices: list[FakeDevice],
+        config: FakeTuyaConfig | None = None,
+        access_id: str = ACCESS_ID,
+        access_key: str = ACCESS_KEY,
+    ) -> None:
+        self.devices = {device.device_id: device for device in devices}
+        self.config = config or FakeTuyaConfig()
+        self.access_id = access_id
+        self.access_key = access_key
+        self.tokens: dict[str, float] = {}
+        self.refresh_tokens: set[str] = set()
+        self.requests: Counter[str] = Counter()
+        self.bytes: Counter[str] = Counter()
+        self.errors: Counter[str] = Counter()
+        # (host, port) of every client connection that sent a request.
+        self.connections: set[tuple[str, int]] = set()
+        self._random = random.Random(self.config.seed)
+        self._bucket = float(self.config.rate_burst)
+        self._bucket_updated = time.monotonic()
+        self._runner: web.AppRunner | None = None
+        self.url = ""
+
+        self.app = web.Application(middlewares=[self._middleware])
+        self.app.router.add_get("/v1.0/token", self._token)
+        self.app.router.add_get("/v1.0/token/{refresh_token}", self._refresh)
+        self.app.router.add_get("/v1.0/devices/{device_id}", self._device)
+        self.app.router.add_get("/v1.0/iot-03/devices/status", self._devices_status)
+        self.app.router.add_get("/v2.0/cloud/thing/{device_id}/model", self._model)
+        self.app.router.add_get("/v1.0/scales/{device_id}/datas/history", self._history)
+        self.app.router.add_post("/v1.0/scales/{device_id}/analysis-reports", self._analysis)
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> str:
+        """Start serving and return the base URL to use as the client endpoint."""
+
+        self._runner = web.AppRunner(self.app)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, host, port)
+        await site.start()
+        sockets = site._server.sockets  # pylint: disable=protected-access
+        self.url = f"http://{host}:{sockets[0].getsockname()[1]}"
+        return self.url
+
+    async def stop(self) -> None:
+        if self._runner is not None:
+            await self._runner.cleanup()
+
+    def reset_counters(self) -> None:
+        self.requests.clear()
+        self.bytes.clear()
+        self.errors.clear()
+        self.connections.clear()
+
+    @staticmethod
+    def endpoint_name(path: str) -> str:
+        if path.startswith("/v1.0/token"):
+            return "token"
+        if path.endswith("/datas/history"):
+            return "datas/history"
+        if path.endswith("/analysis-reports"):
+            return "analysis-reports"
+        if path.endswith("/model"):
+            return "model"
+        if path.endswith("/devices/status"):
+            return "devices/status"
+        return "devices"
+
+    @web.middleware
+    async def _middleware(self, request: web.Request, handler: Any) -> web.StreamResponse:
+        name = self.endpoint_name(request.path)
+        self.requests[name] += 1
+        self.connections.add(request.transport.get_extra_info("peername"))
+        if self.config.latency:
+            await asyncio.sleep(self.config.latency)
+
+        if self.config.error_rate and self._random.random() < self.config.error_rate:
+            self.errors[name] += 1
+            response: web.StreamResponse = web.Response(status=500, text="injected failure")
+        elif not self._take_rate_slot():
+            self.errors[name] += 1
+            response = self._fail(RATE_LIMIT_CODE, "request frequency exceeds limit")
+        elif (error := await self._verify_signature(request)) is not None:
+            self.errors[name] += 1
+            response = error
+        else:
+            response = await handler(request)
+
+        if isinstance(response, web.Response) and response.body is not None:
+            self.bytes[name] += len(response.body)
+        return response
+
+    def _take_rate_slot(self) -> bool:
+        if self.config.rate_limit is None:
+            return True
+        now = time.monotonic()
+        self._bucket = min(
+            self.config.rate_burst,
+            self._bucket + (now - self._bucket_updated) * self.config.rate_limit,
+        )
+        self._bucket_updated = now
+        if self._bucket < 1:
+            return False
+        self._bucket -= 1
+        return True
+
+    async def _verify_signature(self, request: web.Request) -> web.Response | None:
+        if request.headers.get("client_id") != self.access_id:
+            return self._fail(1005, "clientId is invalid")
+
+        body = await request.read()
+        canonical_path = request.path
+        if request.query:
+            params = "&".join(f"{k}={v}" for k, v in sorted(request.query.items()))
+            canonical_path = f"{request.path}?{params}"
+        str_to_sign = (
+            f"{request.method}\n{hashlib.sha256(body).hexdigest()}\n\n{canonical_path}"
+        )
+        access_token = request.headers.get("access_token", "")
+        if not request.path.startswith("/v1.0/token"):
+            if self.tokens.get(access_token, 0) < time.time():
+                return self._fail(1010, "token invalid")
+        message = self.access_id + access_token + request.headers.get("t", "") + str_to_sign
+        expected = hmac.new(
+            self.access_key.encode("utf-8"), msg=message.encode("utf-8"), digestmod=hashlib.sha256
+        ).hexdigest().upper()
+        if not hmac.compare_digest(expected, request.headers.get("sign", "")):
+            return self._fail(1004, "sign invalid")
+        return None
+
+    @staticmethod
+    def _ok(result: Any) -> web.Response:
+        return web.json_response(
+            {"success": True, "t": int(time.time() * 1000), "result": result},
+            dumps=lambda obj: json.dumps(obj, separators=(",", ":")),
+        )
+
+    @staticmethod
+    def _fail(code: int, msg: str) -> web.Response:
+        return web.json_response(
+            {"success": False, "code": code, "msg": msg, "t": int(time.time() * 1000)}
+        )
+
+    def _issue_token(self) -> web.Response:
+        access_token = secrets.token_hex(16)
+        refresh_token = secrets.token_hex(16)
+        self.tokens[access_token] = time.time() + TOKEN_TTL
+        self.refresh_tokens.add(refresh_token)
+        return self._ok(
+            {
+                "access_token": access_token,
+                "refresh_token": refresh_token,
+                "expire_time": TOKEN_TTL,
+                "uid": "fake-uid",
+            }
+        )
+
+    async def _token(self, request: web.Request) -> web.Response:
+        if request.query.get("grant_type") != "1":
+            return self._fail(1100, "param is illegal")
+        return self._issue_token()
+
+    async def _refresh(self, request: web.Request) -> web.Response:
+        refresh_token = request.match_info["refresh_token"]
+        if refresh_token not in self.refresh_tokens:
+            return self._fail(1012, "refresh token invalid")
+        self.refresh_tokens.discard(refresh_token)
+        return self._issue_token()
+
+    def _get_device(self, request: web.Request) -> FakeDevice | None:
+        return self.devices.get(request.match_info["device_id"])
+
+    async def _device(self, request: web.Request) -> web.Response:
+        if (device := self._get_device(request)) is None:
+            return self._fail(1106, "permission deny")
+        return self._ok(
+            {
+                "id": device.device_id,
+                "name": f"Scale {device.device_id}",
+                "category": "tzc",
+                "local_key": LOCAL_KEY,
+            }
+        )
+
+    async def _devices_status(self, request: web.Request) -> web.Response:
+        device_ids = request.query.get("device_ids", "").split(",")
+        if not 0 < len(device_ids) <= 20:
+            return self._fail(1100, "param is illegal")
+        result = []
+        for device_id in device_ids:
+            if (device := self.devices.get(device_id)) is None:
+                continue
+            newest = device.records[0] if device.records else {}
+            values = {
+                "weight": newest.get("wegith"),
+                "body_r": newest.get("body_r"),
+                "height": newest.get("height"),
+            }
+            result.append(
+                {
+                    "id": device_id,
+                    "status": [
+                        {"code": code, "value": round(float(values[code] or 0) * 10**scale)}
+                        for _, code, scale in SCALE_DPS
+                    ],
+                }
+            )
+        return self._ok(result)
+
+    async def _model(self, request: web.Request) -> web.Response:
+        if self._get_device(request) is None:
+            return self._fail(1106, "permission deny")
+        properties = [
+            {"abilityId": dp_id, "code": code, "typeSpec": {"type": "value", "scale": scale}}
+            for dp_id, code, scale in SCALE_DPS
+        ]
+        model = {"modelId": "fake-scale", "services": [{"code": "", "properties": properties}]}
+        return self._ok({"model": json.dumps(model)})
+
+    async def _history(self, request: web.Request) -> web.Response:
+        if (device := self._get_device(request)) is None:
+            return self._fail(1106, "permission deny")
+        page_size = int(request.query.get("page_size", 10))
+        page_no = int(request.query.get("page_no", 1))
+        start_time = int(request.query.get("start_time", 0))
+        end_time = int(request.query.get("end_time", 0)) or None
+        records = [
+            rec
+            for rec in device.records
+            if rec["create_time"] >= start_time
+            and (end_time is None or rec["create_time"] <= end_time)
+        ]
+        page = records[(page_no - 1) * page_size : page_no * page_size]
+        return self._ok(
+            {
+                "total": len(records),
+                "has_next": page_no * page_size < len(records),
+                "records": page,
+            }
+        )
+
+    async def _analysis(self, request: web.Request) -> web.Response:
+        if self._get_device(request) is None:
+            return self._fail(1106, "permission deny")
+        body = await request.json()
+        if not all(key in body for key in ("height", "weight", "age", "sex", "resistance")):
+            return self._fail(1100, "param is empty")
+        return self._ok(analysis_for(body))
+
+
+async def _serve(args: argparse.Namespace) -> None:
+    devices = [make_history(f"device{index}", args.users, args.records) for index in range(args.devices)]
+    cloud = FakeTuyaCloud(
+        devices,
+        FakeTuyaConfig(latency=args.latency, error_rate=args.error_rate, rate_limit=args.rate_limit),
+    )
+    url = await cloud.start(port=args.port)
+    print(f"Fake Tuya OpenAPI on {url} (access_id={ACCESS_ID}, access_key={ACCESS_KEY})")
+    print("Devices:", ", ".join(cloud.devices))
+    await asyncio.Event().wait()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--devices", type=int, default=1)
+    parser.add_argument("--users", type=int, default=3)
+    parser.add_argument("--records", type=int, default=30, help="records per user")
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--rate-limit", type=float, default=None)
+    try:
+        asyncio.run(_serve(parser.parse_args()))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""Simulated Tuya scale speaking the local LAN protocol 3.3.
+
+Listens on TCP like a real device (port 6668 by default), answers DP queries
+with its current DPs and heartbeats with an empty frame, and pushes a status
+report to every connected client when ``weigh_in`` is called. Frames use the
+integration's own ``local`` module, keyed by ``fake_tuya.LOCAL_KEY``.
+
+Run standalone with ``python tools/fake_tuya_local.py --port 6668 --every 15``.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+from typing import Any
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from _integration import load_integration  # noqa: E402
+from fake_tuya import LOCAL_KEY, SCALE_DPS  # noqa: E402
+
+load_integration()
+
+from intelar_scale.local import (  # noqa: E402
+    DP_QUERY,
+    HEART_BEAT,
+    STATUS,
+    TuyaLocalCipher,
+    pack_message,
+    read_message,
+)
+
+DP_IDS = {code: str(dp_id) for dp_id, code, _ in SCALE_DPS}
+DP_SCALES = {code: scale for _, code, scale in SCALE_DPS}
+
+
+class FakeLocalScale:
+    """asyncio TCP server emulating one scale on the LAN."""
+
+    def __init__(self, device_id: str, local_key: str = LOCAL_KEY) -> None:
+        self.device_id = device_id
+        self.cipher = TuyaLocalCipher(local_key)
+        self.dps: dict[str, Any] = {}
+        self.clients: list[asyncio.StreamWriter] = []
+        self.queries = 0
+        self.heartbeats = 0
+        self._seqno = 0
+        self._server: asyncio.AbstractServer | None = None
+        self.port = 0
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> int:
+        self._server = await asyncio.start_server(self._client, host, port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self.port
+
+    async def stop(self) -> None:
+        for writer in list(self.clients):
+            writer.close()
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+
+    def _frame(self, command: int, payload: dict[str, Any] | None) -> bytes:
+        self._seqno += 1
+        return pack_message(self.cipher, self._seqno, command, payload, retcode=0)
+
+    async def _client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self.clients.append(writer)
+        try:
+            while True:
+                _, command, _payload = await read_message(reader, self.cipher)
+                if command == DP_QUERY:
+                    self.queries += 1
+                    writer.write(self._frame(DP_QUERY, {"devId": self.device_id, "dps": self.dps}))
+                elif command == HEART_BEAT:
+                    self.heartbeats += 1
+                    writer.write(self._frame(HEART_BEAT, None))
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError, ValueError):
+            pass
+        finally:
+            self.clients.remove(writer)
+            writer.close()
+
+    async def weigh_in(self, weight: float, resistance: int, height: int) -> None:
+        """Report a measurement to every connected client, as raw scaled DP values."""
+
+        values = {"weight": weight, "body_r": resistance, "height": height}
+        dps = {DP_IDS[code]: round(value * 10 ** DP_SCALES[code]) for code, value in values.items()}
+        self.dps.update(dps)
+        frame = self._frame(STATUS, {"devId": self.device_id, "dps": dps, "t": int(time.time())})
+        for writer in list(self.clients):
+            writer.write(frame)
+            await writer.drain()
+
+
+async def _serve(args: argparse.Namespace) -> None:
+    scale = FakeLocalScale(args.device_id)
+    port = await scale.start(port=args.port)
+    print(f"Fake local scale {args.device_id} on 127.0.0.1:{port} (local_key={LOCAL_KEY})")
+    index = 0
+    while True:
+        await asyncio.sleep(args.every)
+        await scale.weigh_in(70 + index % 5 * 0.1, 480 + index % 3, 175)
+        print(f"Reported weigh-in {index} to {len(scale.clients)} client(s)")
+        index += 1
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--port", type=int, default=6668)
+    parser.add_argument("--device-id", default="device0")
+    parser.add_argument("--every", type=float, default=15.0, help="seconds between weigh-ins")
+    try:
+        asyncio.run(_serve(parser.parse_args()))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
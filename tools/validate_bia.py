@@ -0,0 +1,146 @@
+"""Compare the local BIA engine with recorded Tuya analysis reports.
+
+Recorded reports come from either:
+
+* the integration's storage file ``.storage/intelar_scale.<device_id>``, whose
+  analysis cache holds the cloud reports keyed by their inputs, or
+* a JSON list of ``{"request": {height, weight, age, sex, resistance},
+  "response": {...analysis report...}}`` objects.
+
+For every reconciled field the mean absolute error, mean bias (cloud - local)
+and worst case against the cloud reports are printed, plus the local
+computation time per report. Fixture cases tagged ``"source": "equations"``
+were worked out from the engine's own formulas, so they are reported
+separately as a self-check and never count as validation.
+
+With ``--export`` the recorded reports are also appended, reduced to the
+analysis inputs and the reconciled fields, to a fixture file in the same JSON
+list format, tagged ``"source": "cloud"``. ``tests/test_bia.py`` checks the
+local engine against every cloud case in ``tests/fixtures/bia_reports.json``.
+
+Example: ``python tools/validate_bia.py config/.storage/intelar_scale.bf123``
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+from typing import Any, Iterator
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from _integration import load_integration  # noqa: E402
+
+load_integration()
+
+from intelar_scale.bia import (  # noqa: E402
+    RECONCILED_FIELDS,
+    compute_body_composition,
+    report_differences,
+)
+
+# (source, inputs, report); storage files only hold cloud reports.
+Sample = tuple[str, tuple[float, float, int, int, float], dict[str, Any]]
+
+
+def iter_samples(path: Path) -> Iterator[Sample]:
+    data = json.loads(path.read_text())
+    if isinstance(data, dict):
+        # Home Assistant storage file: {"data": {"analysis_cache": {"reports": [[key, report]]}}}
+        reports = ((data.get("data") or {}).get("analysis_cache") or {}).get("reports", [])
+        for (height, weight, age, sex, resistance), report in reports:
+            inputs = (float(height), float(weight), int(age), int(sex), float(resistance))
+            yield "cloud", inputs, report
+        return
+    for sample in data:
+        request = sample["request"]
+        inputs = (
+            float(request["height"]),
+            float(request["weight"]),
+            int(request["age"]),
+            int(request["sex"]),
+            float(request["resistance"]),
+        )
+        yield sample.get("source", "cloud"), inputs, sample["response"]
+
+
+def export_samples(samples: list[Sample], path: Path) -> int:
+    """Append anonymised cloud cases to the fixture at ``path``; return how many were new."""
+
+    cases = json.loads(path.read_text()) if path.exists() else []
+    known = {
+        json.dumps(case["request"], sort_keys=True) for case in cases if case.get("source") == "cloud"
+    }
+    added = 0
+    for source, (height, weight, age, sex, resistance), report in samples:
+        if source != "cloud":
+            continue
+        request = {"height": height, "weight": weight, "age": age, "sex": sex, "resistance": resistance}
+        if json.dumps(request, sort_keys=True) in known:
+            continue
+        known.add(json.dumps(request, sort_keys=True))
+        response = {field: report[field] for field in RECONCILED_FIELDS if field in report}
+        cases.append({"source": "cloud", "request": request, "response": response})
+        added += 1
+    path.write_text(json.dumps(cases, indent=2) + "\n")
+    return added
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("paths", nargs="+", type=Path)
+    parser.add_argument("--export", type=Path, help="append the reports to this fixture file")
+    args = parser.parse_args()
+
+    samples = [sample for path in args.paths for sample in iter_samples(path)]
+    if not samples:
+        sys.exit("No recorded analysis reports found")
+    if args.export:
+        print(f"Exported {export_samples(samples, args.export)} new cases to {args.export}")
+
+    cloud = [sample for sample in samples if sample[0] == "cloud"]
+    equations = [sample for sample in samples if sample[0] != "cloud"]
+    if equations:
+        print(
+            f"{len(equations)} equations cases: a self-check of bia.py against its own "
+            "formulas, not a validation against Tuya"
+        )
+        print_differences(equations)
+    if not cloud:
+        print(
+            "No recorded cloud reports: the local engine (and the local_only and "
+            "local_first analysis modes) is NOT validated against Tuya's analysis"
+        )
+        return
+    print(f"{len(cloud)} recorded cloud reports")
+    print_differences(cloud)
+
+
+def print_differences(samples: list[Sample]) -> None:
+    differences: dict[str, list[float]] = {field: [] for field in RECONCILED_FIELDS}
+    elapsed = 0.0
+    for _, inputs, reference in samples:
+        started = time.perf_counter()
+        local = compute_body_composition(*inputs)
+        elapsed += time.perf_counter() - started
+        for field, difference in report_differences(local, reference).items():
+            differences[field].append(difference)
+
+    print(f"{elapsed / len(samples) * 1e6:.1f} µs per local report")
+    print(f"{'field':<14}{'n':>5}{'MAE':>9}{'bias':>9}{'worst':>9}")
+    for field, values in differences.items():
+        if not values:
+            continue
+        mae = sum(abs(value) for value in values) / len(values)
+        bias = sum(values) / len(values)
+        worst = max(values, key=abs)
+        print(f"{field:<14}{len(values):>5}{mae:>9.2f}{bias:>9.2f}{worst:>9.2f}")
+    unchecked = [field for field, values in differences.items() if not values]
+    if unchecked:
+        print(f"Not compared: {', '.join(unchecked)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,172 @@
+"""Trend and derived metrics computed incrementally over the local measurement store."""
+from __future__ import annotations
+
+import math
+import time
+from collections import deque
+from typing import Any, Dict, Iterable
+
+from .const import (
+    TREND_EWMA_HALF_LIFE_DAYS,
+    TREND_LONG_WINDOW_DAYS,
+    TREND_SHORT_WINDOW_DAYS,
+)
+from .timeseries import MeasurementStore, UserSeries
+
+DAY_MS = 86_400_000
+WEEK_MS = 7 * DAY_MS
+
+
+class RollingWindow:
+    """Running sums over the samples of the last ``span_ms`` milliseconds.
+
+    Adding a sample and evicting the ones that fell out of the window are
+    O(1) per sample, so the mean and least-squares slope never rescan history.
+    Times are kept relative to the first sample to keep the sums precise.
+    The window ends at the newest sample until :meth:`expire` moves its end
+    to the current time.
+    """
+
+    def __init__(self, span_ms: int) -> None:
+        self.span_ms = span_ms
+        self.samples: deque[tuple[float, float]] = deque()
+        self._origin: int | None = None
+        self._sum_t = self._sum_v = self._sum_tt = self._sum_tv = 0.0
+
+    def add(self, create_time: int, value: float) -> None:
+        if self._origin is None:
+            self._origin = create_time
+        t = float(create_time - self._origin)
+        self.samples.append((t, value))
+        self._apply(t, value, 1)
+        self._evict(t)
+
+    def expire(self, now_ms: int) -> None:
+        """Drop the samples that are older than ``span_ms`` at ``now_ms``."""
+
+        if self._origin is not None:
+            self._evict(float(now_ms - self._origin))
+
+    def _evict(self, t: float) -> None:
+        while self.samples and self.samples[0][0] <= t - self.span_ms:
+            self._apply(*self.samples.popleft(), -1)
+        if not self.samples:
+            # Start afresh so rounding left in the sums cannot leak into later samples.
+            self._origin = None
+            self._sum_t = self._sum_v = self._sum_tt = self._sum_tv = 0.0
+
+    def _apply(self, t: float, value: float, sign: int) -> None:
+        self._sum_t += sign * t
+        self._sum_v += sign * value
+        self._sum_tt += sign * t * t
+        self._sum_tv += sign * t * value
+
+    def mean(self) -> float | None:
+        if not self.samples:
+            return None
+        return self._sum_v / len(self.samples)
+
+    def slope(self) -> float | None:
+        """Least-squares slope in value units per millisecond."""
+
+        count = len(self.samples)
+        if count < 2:
+            return None
+        denominator = count * self._sum_tt - self._sum_t * self._sum_t
+        # A time variance under 1 ms² means the samples share an instant.
+        if denominator <= count * count * 1.0:
+            return None
+        return (count * self._sum_tv - self._sum_t * self._sum_v) / denominator
+
+
+class UserTrends:
+    """Derived metrics for one user, advanced one measurement at a time."""
+
+    def __init__(self) -> None:
+        self.last_time = 0
+        self.processed = 0
+        self.weight_short = RollingWindow(TREND_SHORT_WINDOW_DAYS * DAY_MS)
+        self.weight_long = RollingWindow(TREND_LONG_WINDOW_DAYS * DAY_MS)
+        self.body_fat_long = RollingWindow(TREND_LONG_WINDOW_DAYS * DAY_MS)
+        self.smoothed_weight: float | None = None
+        self._tau_ms = TREND_EWMA_HALF_LIFE_DAYS * DAY_MS / math.log(2)
+        self._smoothed_time = 0
+
+    def add(self, create_time: int, weight: float, body_fat: float) -> None:
+        self.processed += 1
+        self.last_time = create_time
+        if not math.isnan(weight):
+            self.weight_short.add(create_time, weight)
+            self.weight_long.add(create_time, weight)
+            if self.smoothed_weight is None:
+                self.smoothed_weight = weight
+            else:
+                # Time-aware EWMA: a gap of one half-life halves the old estimate's weight.
+                alpha = 1 - math.exp(-(create_time - self._smoothed_time) / self._tau_ms)
+                self.smoothed_weight += alpha * (weight - self.smoothed_weight)
+            self._smoothed_time = create_time
+        if not math.isnan(body_fat):
+            self.body_fat_long.add(create_time, body_fat)
+
+    def values(self, now_ms: int) -> Dict[str, Any]:
+        """Return the metrics with every window ending at ``now_ms``.
+
+        A window without samples, such as the 7-day average of a user who has
+        not weighed in for a week, is reported as None.
+        """
+
+        for window in (self.weight_short, self.weight_long, self.body_fat_long):
+            window.expire(now_ms)
+        weight_slope = self.weight_long.slope()
+        body_fat_slope = self.body_fat_long.slope()
+        return {
+            "weight_avg_7d": _round(self.weight_short.mean()),
+            "weight_avg_30d": _round(self.weight_long.mean()),
+            "weight_change_rate": _round(weight_slope * WEEK_MS if weight_slope is not None else None),
+            "weight_smoothed": _round(self.smoothed_weight),
+            "body_fat_trend": _round(body_fat_slope * WEEK_MS if body_fat_slope is not None else None),
+        }
+
+
+class TrendTracker:
+    """Keep ``UserTrends`` in step with a ``MeasurementStore``.
+
+    New measurements newer than everything seen are fed incrementally. If rows
+    were inserted into the past (e.g. by a history backfill) the user's
+    trends are rebuilt from the stored columns once.
+    """
+
+    def __init__(self, store: MeasurementStore) -> None:
+        self.store = store
+        self.users: Dict[str, UserTrends] = {}
+
+    def update(self, user_ids: Iterable[str]) -> None:
+        for user_id in user_ids:
+            series = self.store.get(user_id)
+            if series is None:
+                continue
+            trends = self.users.get(user_id)
+            if trends is None or series.index_since(trends.last_time + 1) != trends.processed:
+                trends = self.users[user_id] = UserTrends()
+            self._feed(trends, series)
+
+    @staticmethod
+    def _feed(trends: UserTrends, series: UserSeries) -> None:
+        start = trends.processed
+        weights = series.column("weight", start)
+        body_fats = series.column("body_fat", start)
+        for create_time, weight, body_fat in zip(series.times[start:], weights, body_fats):
+            trends.add(create_time, weight, body_fat)
+
+    def remove(self, user_id: str) -> None:
+        self.users.pop(user_id, None)
+
+    def values(self, user_id: str, now_ms: int | None = None) -> Dict[str, Any]:
+        trends = self.users.get(user_id)
+        if trends is None:
+            return {}
+        return trends.values(now_ms if now_ms is not None else int(time.time() * 1000))
+
+
+def _round(value: float | None) -> float | None:
+    return round(value, 2) if value is not None else None